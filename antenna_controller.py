@@ -10,18 +10,75 @@ rzeczywistym oraz kompleksową obsługę błędów i limitów bezpieczeństwa.
 Autor: Aleks Czarnecki
 """
 
+import array
+import copy
 import logging
+import mmap
 import threading
 import time
 import json
 import os
+import shutil
 import subprocess
+import tempfile
 import re
+import select
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, asdict
+from collections import OrderedDict
+from functools import lru_cache
+from dataclasses import dataclass
 from enum import Enum
 from typing import Optional, Tuple, Dict, Any, Callable
 
+try:  # ioctl portu szeregowego dostępne tylko na Linuksie
+    import fcntl
+    import termios
+except ImportError:
+    fcntl = None
+    termios = None
+
+try:  # Opcjonalny szybszy (C) parser JSON dla plików kalibracji (pip install orjson)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # Opcjonalny parser strumieniowy dużych plików kalibracji (pip install ijson)
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Parsuje JSON z bajtów (błędy orjson dziedziczą po json.JSONDecodeError)"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_loads_mapped(f) -> Any:
+    """Parsuje plik przez orjson bezpośrednio ze stron zmapowanych przez mmap"""
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _json_scalar_fields_streaming(f, names: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Czyta strumieniowo (ijson) tylko skalarne pola najwyższego poziomu z `names`.
+
+    Duże tablice/obiekty w pliku są pomijane bez budowania ich w pamięci.
+    Plik jest parsowany do końca, więc uszkodzony lub ucięty JSON zgłasza
+    błąd tak samo jak przy json.loads.
+    """
+    data: Dict[str, Any] = {}
+    try:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix in names and event in ("number", "string", "boolean"):
+                data[prefix] = value
+    except ijson.JSONError as e:
+        raise json.JSONDecodeError(str(e), "", 0) from e
+    return data
+
 
 # Konfiguracja logowania
 logging.basicConfig(
@@ -39,41 +96,168 @@ DEFAULT_TIMEOUT = 5
 
 # Domyślna ścieżka do pliku konfiguracji kalibracji
 DEFAULT_CALIBRATION_FILE = "calibrations/antenna_calibration.json"
+# Pliki kalibracji większe niż 1 MiB (np. z wieloma zestawami ustawień)
+# są parsowane strumieniowo, jeśli ijson jest dostępny
+CALIBRATION_STREAMING_THRESHOLD = 1024 * 1024
+# Pliki od 64 KiB są mapowane (mmap) i parsowane przez orjson bez kopii
+CALIBRATION_MMAP_THRESHOLD = 64 * 1024
+
+# Stałe komendy rotctl (bez formatowania przy każdym wywołaniu)
+ROTCTL_SET_POS_FMT = "P %.1f %.1f\n"
+ROTCTL_GET_POS_CMD = "p\n"
+ROTCTL_STOP_CMD = "S\n"
+
+# Gotowe bajty komend dla RotctlSession (tryb odpowiedzi rozszerzonej '+')
+ROTCTL_SESSION_PAYLOADS = {
+    ROTCTL_GET_POS_CMD: b"+p\n",
+    ROTCTL_STOP_CMD: b"+S\n",
+}
+ROTCTL_QUIT_PAYLOAD = b"q\n"
+
+# Okres odczytu pozycji w wątku monitorowania i najkrótszy odstęp przy końcu ruchu
+MONITOR_INTERVAL = 0.5
+MIN_MONITOR_INTERVAL = 0.05
+# Stały narzut rozpoczęcia ruchu doliczany do szacowanego czasu obrotu (s)
+SLEW_START_OVERHEAD = 0.1
+# Odchyłka odczytanej pozycji od ostatniego celu (°), po której move_to
+# ponownie wysyła ten sam cel (np. antena przestawiona ręcznie z pilota)
+TARGET_DRIFT_TOLERANCE = 0.5
+
+# select() na potokach działa tylko poza Windows (tam odczyt pilnuje wątek watchdog)
+SELECT_ON_PIPES = os.name != "nt"
+
+# Flaga jądra Linux wyłączająca 16 ms timer opóźnienia adapterów USB-serial (FTDI)
+ASYNC_LOW_LATENCY = 0x2000
+
+
+@lru_cache(maxsize=None)
+def rotctl_argv(port: str, speed: int) -> Tuple[str, ...]:
+    """Zwraca argumenty wywołania rotctl dla danego portu i prędkości (budowane raz)."""
+    return ("rotctl", "-m", DEFAULT_ROTCTL_MODEL, "-r", port, "-s", str(speed), "-")
+
+
+# Liczby w odpowiedzi rotctl (parsowanie awaryjne)
+_ROTCTL_NUMBER_RE = re.compile(r"[-+]?\d*\.?\d+")
+
+
+def parse_rotctl_position(output: str) -> Optional[Tuple[float, float]]:
+    """
+    Parsuje odpowiedź rotctl na komendę 'p' do (azymut, elewacja).
+
+    Obsługuje odpowiedź zwykłą (dwie liczby) i rozszerzoną ('Azimuth: ...').
+    Zwraca None, jeśli odpowiedź nie zawiera dwóch wartości.
+    """
+    values = []
+    for line in output.splitlines():
+        # Wartość po etykiecie w trybie rozszerzonym ('Azimuth: 123.4')
+        line = line.rpartition(":")[2].strip()
+        # Pomijamy puste linie i echo komendy
+        if not line or line.startswith("p "):
+            continue
+        try:
+            values.append(float(line))
+        except ValueError:
+            continue
+        if len(values) == 2:
+            return values[0], values[1]
+
+    # Alternatywne parsowanie - wyciągnij liczby z całego tekstu
+    numbers = _ROTCTL_NUMBER_RE.findall(output)
+    if len(numbers) >= 2:
+        return float(numbers[0]), float(numbers[1])
+    return None
+
+
+@lru_cache(maxsize=1)
+def _rotctl_available() -> bool:
+    """Wyszukuje rotctl w PATH (raz na proces, bez uruchamiania podprocesu)."""
+    return shutil.which("rotctl") is not None
 
 
 def sprawdz_rotctl() -> bool:
     """Sprawdza czy rotctl jest dostępne w systemie."""
+    return _rotctl_available()
+
+
+def invalidate_rotctl_cache() -> None:
+    """Wymusza ponowne sprawdzenie dostępności rotctl (np. w testach)."""
+    _rotctl_available.cache_clear()
+
+
+def enable_low_latency(port: str) -> bool:
+    """
+    Ustawia ASYNC_LOW_LATENCY na porcie szeregowym (timer FTDI 16 ms -> 1 ms).
+
+    Najpierw próbuje TIOCGSERIAL/TIOCSSERIAL, a gdy sterownik tego nie
+    obsługuje - zapisuje 1 do latency_timer w sysfs. Na systemach innych
+    niż Linux nic nie robi.
+
+    Returns:
+        True jeśli tryb niskiego opóźnienia został ustawiony
+    """
+    if fcntl is None or not hasattr(termios, "TIOCGSERIAL"):
+        return False
+
+    try:
+        fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    except OSError as e:
+        logger.debug("Nie można otworzyć %s dla low latency: %s", port, e)
+        return False
+
+    try:
+        # struct serial_struct - pole flags jest piątym intem
+        buf = array.array("i", [0] * 32)
+        fcntl.ioctl(fd, termios.TIOCGSERIAL, buf)
+        if not buf[4] & ASYNC_LOW_LATENCY:
+            buf[4] |= ASYNC_LOW_LATENCY
+            fcntl.ioctl(fd, termios.TIOCSSERIAL, buf)
+        return True
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+    # Fallback dla usb-serial: /sys/bus/usb-serial/devices/ttyUSB0/latency_timer
+    tty_name = os.path.basename(os.path.realpath(port))
     try:
-        result = subprocess.run(
-            ["rotctl", "--version"],
+        with open(
+            f"/sys/bus/usb-serial/devices/{tty_name}/latency_timer", "w"
+        ) as f:
+            f.write("1")
+        return True
+    except OSError as e:
+        logger.debug("Nie można ustawić latency_timer dla %s: %s", port, e)
+        return False
+
+
+def _run_rotctl(
+    port: str,
+    speed: int,
+    komenda: str,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> subprocess.CompletedProcess:
+    """Wykonuje komendę w jednorazowym procesie rotctl (z limitem czasu)."""
+    try:
+        return subprocess.run(
+            rotctl_argv(port, speed),
+            input=komenda,
             capture_output=True,
             text=True,
-            timeout=DEFAULT_TIMEOUT,
+            timeout=timeout,
             check=False,
         )
-        return result.returncode == 0
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        return False
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Timeout rotctl po {timeout}s (port {port})")
 
 
 def ustaw_pozycje_rotctl(port: str, az: float, el: float, speed: int = DEFAULT_BAUDRATE) -> str:
     """Ustawia pozycję rotatora za pomocą rotctl (Hamlib)."""
-    komenda = f"P {az % 360:.1f} {el:.1f}\n"
-
-    proc = subprocess.Popen(
-        ["rotctl", "-m", DEFAULT_ROTCTL_MODEL, "-r", port, "-s", str(speed), "-"],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-
-    stdout, stderr = proc.communicate(input=komenda)
+    result = _run_rotctl(port, speed, ROTCTL_SET_POS_FMT % (az % 360, el))
 
-    if proc.returncode != 0:
-        raise RuntimeError(f"Błąd rotctl: {stderr.strip()}")
+    if result.returncode != 0:
+        raise RuntimeError(f"Błąd rotctl: {result.stderr.strip() or result.stdout.strip()}")
 
-    return stdout.strip()
+    return result.stdout.strip()
 
 
 def odczytaj_pozycje_rotctl(port: str, speed: int = DEFAULT_BAUDRATE) -> Tuple[float, float]:
@@ -81,65 +265,25 @@ def odczytaj_pozycje_rotctl(port: str, speed: int = DEFAULT_BAUDRATE) -> Tuple[f
     Odczytuje aktualną pozycję rotatora za pomocą rotctl.
     Zwraca tuple (azymut, elewacja) w stopniach.
     """
-    proc = subprocess.Popen(
-        ["rotctl", "-m", DEFAULT_ROTCTL_MODEL, "-r", port, "-s", str(speed), "-"],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-
-    stdout, stderr = proc.communicate(input="p\n")
-
-    if proc.returncode != 0:
-        raise RuntimeError(f"Błąd rotctl: {stderr.strip()}")
-
-    # Parsowanie odpowiedzi - usuń echo komendy
-    lines = stdout.strip().split("\n")
-    values = []
-    for line in lines:
-        line = line.strip()
-        if line and not line.startswith("p "):
-            try:
-                values.append(float(line))
-            except ValueError:
-                # Sprawdź czy linia zawiera wartość po "p "
-                if line.startswith("p "):
-                    try:
-                        values.append(float(line[2:]))
-                    except ValueError:
-                        continue
+    result = _run_rotctl(port, speed, ROTCTL_GET_POS_CMD)
 
-    if len(values) >= 2:
-        return values[0], values[1]
-    else:
-        # Alternatywne parsowanie - wyciągnij liczby z całego tekstu
-        numbers = re.findall(r"[-+]?\d*\.?\d+", stdout)
-        if len(numbers) >= 2:
-            try:
-                return float(numbers[0]), float(numbers[1])
-            except ValueError:
-                pass
+    if result.returncode != 0:
+        raise RuntimeError(f"Błąd rotctl: {result.stderr.strip()}")
 
-        raise RuntimeError(f"Niepełna odpowiedź pozycji: {stdout}")
+    position = parse_rotctl_position(result.stdout)
+    if position is None:
+        raise RuntimeError(f"Niepełna odpowiedź pozycji: {result.stdout}")
+    return position
 
 
 def zatrzymaj_rotor_rotctl(port: str, speed: int = DEFAULT_BAUDRATE) -> str:
     """Zatrzymuje ruch rotatora za pomocą rotctl."""
-    proc = subprocess.Popen(
-        ["rotctl", "-m", DEFAULT_ROTCTL_MODEL, "-r", port, "-s", str(speed), "-"],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-
-    stdout, stderr = proc.communicate(input="S\n")
+    result = _run_rotctl(port, speed, ROTCTL_STOP_CMD)
 
-    if proc.returncode != 0:
-        raise RuntimeError(f"Błąd rotctl STOP: {stderr.strip()}")
+    if result.returncode != 0:
+        raise RuntimeError(f"Błąd rotctl STOP: {result.stderr.strip() or result.stdout.strip()}")
 
-    return stdout.strip()
+    return result.stdout.strip()
 
 
 def get_best_spid_port(preferred_port: Optional[str] = None) -> str:
@@ -151,10 +295,10 @@ def get_best_spid_port(preferred_port: Optional[str] = None) -> str:
         raise RuntimeError("rotctl (Hamlib) nie jest dostępne w systemie")
 
     if preferred_port:
-        logger.info(f"Używam podanego portu: {preferred_port}")
+        logger.info("Używam podanego portu: %s", preferred_port)
         return preferred_port
 
-    logger.info(f"Używam domyślnego portu: {DEFAULT_SPID_PORT}")
+    logger.info("Używam domyślnego portu: %s", DEFAULT_SPID_PORT)
     return DEFAULT_SPID_PORT
 
 
@@ -185,11 +329,15 @@ def rotctl_ustaw_pozycje(
     if not sprawdz_rotctl():
         raise RuntimeError("rotctl (Hamlib) nie jest dostępne w systemie")
 
-    komenda = f"P {az % 360:.1f} {el:.1f}\n"
+    komenda = ROTCTL_SET_POS_FMT % (az % 360, el)
     
     # Dodatkowe logowanie pozycji przed wysłaniem
     normalized_az = az % 360
-    logger.info(f"Rotctl: Wysyłam komendę pozycji - Az={normalized_az:.1f}°, El={el:.1f}°")
+    logger.info(
+        "Rotctl: Wysyłam komendę pozycji - Az=%.1f°, El=%.1f°",
+        normalized_az,
+        el,
+    )
     
     # Sprawdź podstawowe limity (rozsądne zakresy)
     if el < -90.0 or el > 90.0:
@@ -198,7 +346,7 @@ def rotctl_ustaw_pozycje(
     for attempt in range(retry_count + 1):
         try:
             proc = subprocess.Popen(
-                ["rotctl", "-m", "903", "-r", port, "-s", str(speed), "-"],
+                rotctl_argv(port, speed),
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -209,14 +357,20 @@ def rotctl_ustaw_pozycje(
 
             if proc.returncode == 0:
                 logger.debug(
-                    f"Rotctl ustaw pozycję Az={normalized_az:.1f}°, El={el:.1f}° - odpowiedź: {stdout.strip()}"
+                    "Rotctl ustaw pozycję Az=%.1f°, El=%.1f° - odpowiedź: %s",
+                    normalized_az,
+                    el,
+                    stdout.strip(),
                 )
                 return stdout.strip()
             else:
                 error_msg = stderr.strip() if stderr.strip() else stdout.strip()
                 if attempt < retry_count:
                     logger.warning(
-                        f"Próba {attempt + 1} nieudana, kod: {proc.returncode}, błąd: '{error_msg}', ponawiam..."
+                        "Próba %s nieudana, kod: %s, błąd: '%s', ponawiam...",
+                        attempt + 1,
+                        proc.returncode,
+                        error_msg,
                     )
                     time.sleep(1)  # Krótka pauza przed ponowieniem
                     continue
@@ -228,7 +382,7 @@ def rotctl_ustaw_pozycje(
         except subprocess.TimeoutExpired:
             proc.kill()
             if attempt < retry_count:
-                logger.warning(f"Timeout podczas próby {attempt + 1}, ponawiam...")
+                logger.warning("Timeout podczas próby %s, ponawiam...", attempt + 1)
                 time.sleep(1)
                 continue
             else:
@@ -237,7 +391,7 @@ def rotctl_ustaw_pozycje(
                 )
         except Exception as e:
             if attempt < retry_count:
-                logger.warning(f"Błąd podczas próby {attempt + 1}: {e}, ponawiam...")
+                logger.warning("Błąd podczas próby %s: %s, ponawiam...", attempt + 1, e)
                 time.sleep(1)
                 continue
             else:
@@ -267,53 +421,31 @@ def rotctl_odczytaj_pozycje(
     for attempt in range(retry_count + 1):
         try:
             proc = subprocess.Popen(
-                ["rotctl", "-m", "903", "-r", port, "-s", str(speed), "-"],
+                rotctl_argv(port, speed),
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
             )
 
-            stdout, stderr = proc.communicate(input="p\n", timeout=15)
+            stdout, stderr = proc.communicate(input=ROTCTL_GET_POS_CMD, timeout=15)
 
             if proc.returncode == 0:
-                # Parsowanie odpowiedzi rotctl
-                lines = stdout.strip().split("\n")
-                values = []
-
-                for line in lines:
-                    line = line.strip()
-                    if line and not line.startswith("p "):
-                        try:
-                            values.append(float(line))
-                        except ValueError:
-                            # Sprawdź czy linia zawiera wartość po "p "
-                            if line.startswith("p "):
-                                try:
-                                    values.append(float(line[2:]))
-                                except ValueError:
-                                    continue
-
-                if len(values) >= 2:
-                    az, el = values[0], values[1]
-                    logger.debug(f"Rotctl odczyt pozycji: Az={az:.1f}°, El={el:.1f}°")
-                    return az, el
+                position = parse_rotctl_position(stdout)
+                if position is not None:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Rotctl odczyt pozycji: Az=%.1f°, El=%.1f°",
+                            position[0],
+                            position[1],
+                        )
+                    return position
                 else:
-                    # Alternatywne parsowanie - wyciągnij liczby z całego tekstu
-                    numbers = re.findall(r"[-+]?\d*\.?\d+", stdout)
-                    if len(numbers) >= 2:
-                        try:
-                            az, el = float(numbers[0]), float(numbers[1])
-                            logger.debug(
-                                f"Rotctl odczyt pozycji (alt): Az={az:.1f}°, El={el:.1f}°"
-                            )
-                            return az, el
-                        except ValueError:
-                            pass
-
                     if attempt < retry_count:
                         logger.warning(
-                            f"Niepełna odpowiedź podczas próby {attempt + 1}: {stdout}, ponawiam..."
+                            "Niepełna odpowiedź podczas próby %s: %s, ponawiam...",
+                            attempt + 1,
+                            stdout,
                         )
                         time.sleep(0.5)
                         continue
@@ -324,7 +456,9 @@ def rotctl_odczytaj_pozycje(
             else:
                 if attempt < retry_count:
                     logger.warning(
-                        f"Błąd rotctl podczas próby {attempt + 1}: {stderr.strip()}, ponawiam..."
+                        "Błąd rotctl podczas próby %s: %s, ponawiam...",
+                        attempt + 1,
+                        stderr.strip(),
                     )
                     time.sleep(0.5)
                     continue
@@ -337,7 +471,8 @@ def rotctl_odczytaj_pozycje(
             proc.kill()
             if attempt < retry_count:
                 logger.warning(
-                    f"Timeout podczas odczytu pozycji, próba {attempt + 1}, ponawiam..."
+                    "Timeout podczas odczytu pozycji, próba %s, ponawiam...",
+                    attempt + 1,
                 )
                 time.sleep(0.5)
                 continue
@@ -348,7 +483,9 @@ def rotctl_odczytaj_pozycje(
         except Exception as e:
             if attempt < retry_count:
                 logger.warning(
-                    f"Błąd podczas odczytu pozycji, próba {attempt + 1}: {e}, ponawiam..."
+                    "Błąd podczas odczytu pozycji, próba %s: %s, ponawiam...",
+                    attempt + 1,
+                    e,
                 )
                 time.sleep(0.5)
                 continue
@@ -375,14 +512,14 @@ def rotctl_zatrzymaj_rotor(port: str, speed: int = DEFAULT_BAUDRATE) -> str:
 
     try:
         proc = subprocess.Popen(
-            ["rotctl", "-m", "903", "-r", port, "-s", str(speed), "-"],
+            rotctl_argv(port, speed),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
         )
 
-        stdout, stderr = proc.communicate(input="S\n", timeout=10)
+        stdout, stderr = proc.communicate(input=ROTCTL_STOP_CMD, timeout=10)
 
         if proc.returncode != 0:
             raise RuntimeError(f"Błąd rotctl podczas zatrzymywania: {stderr.strip()}")
@@ -423,7 +560,7 @@ def run_rotctl_command(
         "-t", str(timeout)
     ] + command
     
-    logger.debug(f"Wykonuję komendę rotctl: {' '.join(cmd)}")
+    logger.debug("Wykonuję komendę rotctl: %s", ' '.join(cmd))
     
     return subprocess.run(
         cmd,
@@ -449,10 +586,175 @@ def test_spid_connection(port: str = DEFAULT_SPID_PORT, baudrate: int = DEFAULT_
         result = run_rotctl_command(["get_pos"], port, baudrate, timeout=10)
         return result.returncode == 0
     except Exception as e:
-        logger.error(f"Błąd podczas testowania połączenia SPID: {e}")
+        logger.error("Błąd podczas testowania połączenia SPID: %s", e)
         return False
 
 
+class RotctlSession:
+    """
+    Długo działający proces rotctl czytający komendy ze stdin.
+
+    Pomija fork/exec i inicjalizację Hamlib przy każdej komendzie.
+    Komendy wysyłane są w trybie odpowiedzi rozszerzonej ('+'), więc każda
+    odpowiedź kończy się linią 'RPRT <kod>'. Martwy proces jest uruchamiany
+    ponownie przy następnej komendzie.
+    """
+
+    def __init__(
+        self, port: str, speed: int = DEFAULT_BAUDRATE, timeout: float = DEFAULT_TIMEOUT
+    ):
+        self.port = port
+        self.speed = speed
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        # Odebrane, jeszcze nieprzetworzone bajty stdout (np. kolejne odpowiedzi batch)
+        self._buffer = bytearray()
+
+    def _ensure_process(self) -> subprocess.Popen:
+        """Zwraca działający proces rotctl, uruchamiając go w razie potrzeby"""
+        if self._proc is None or self._proc.poll() is not None:
+            enable_low_latency(self.port)
+            self._buffer.clear()
+            self._proc = subprocess.Popen(
+                rotctl_argv(self.port, self.speed),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+            )
+        return self._proc
+
+    @staticmethod
+    def _payload(komenda: str) -> bytes:
+        """Bajty komendy w trybie odpowiedzi rozszerzonej"""
+        payload = ROTCTL_SESSION_PAYLOADS.get(komenda)
+        if payload is None:
+            payload = ("+" + komenda).encode("ascii")
+        return payload
+
+    def command(self, komenda: str) -> list[str]:
+        """
+        Wysyła komendę (np. ROTCTL_STOP_CMD) i zwraca linie odpowiedzi bez 'RPRT'.
+
+        Raises:
+            RuntimeError: Timeout, zakończenie procesu lub kod błędu RPRT
+        """
+        return self.batch([komenda])[0]
+
+    def batch(self, komendy: list[str]) -> list[list[str]]:
+        """
+        Wysyła kilka komend jednym zapisem i zwraca odpowiedzi w tej samej kolejności.
+
+        rotctl wykonuje je po kolei, więc odpowiedzi są czytane kolejno do
+        linii 'RPRT'. Przy błędzie jednej komendy proces jest zabijany, żeby
+        nieprzeczytane odpowiedzi pozostałych nie trafiły do następnego wywołania.
+        Jeśli proces zakończy się w trakcie, nowemu procesowi wysyłane są
+        ponownie tylko komendy, na które nie przyszła jeszcze odpowiedź.
+
+        Raises:
+            RuntimeError: Timeout, zakończenie procesu lub kod błędu RPRT
+        """
+        replies: list[list[str]] = []
+        with self._lock:
+            for attempt in range(2):
+                proc = self._ensure_process()
+                try:
+                    proc.stdin.write(
+                        b"".join(self._payload(komenda) for komenda in komendy[len(replies):])
+                    )
+                    proc.stdin.flush()
+                    while len(replies) < len(komendy):
+                        replies.append(self._read_reply(proc))
+                    return replies
+                except (BrokenPipeError, EOFError):
+                    # Proces zakończył się między komendami - jedna próba z nowym
+                    self._kill()
+                    if attempt:
+                        raise RuntimeError("Proces rotctl zakończył działanie")
+                except RuntimeError:
+                    if len(komendy) > 1:
+                        self._kill()
+                    raise
+        raise RuntimeError("Proces rotctl zakończył działanie")
+
+    def _read_reply(self, proc: subprocess.Popen) -> list[str]:
+        """Czyta odpowiedź do linii 'RPRT'; po przekroczeniu czasu proces jest zabijany"""
+        if not SELECT_ON_PIPES:
+            return self._read_reply_watchdog(proc)
+
+        deadline = time.monotonic() + self.timeout
+        fd = proc.stdout.fileno()
+        buffer = self._buffer
+        lines = []
+        while True:
+            end = buffer.find(b"\n")
+            if end < 0:
+                # Pełne bloki z potoku zamiast readline() po jednym bajcie
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                    self._kill()
+                    raise RuntimeError("Timeout odpowiedzi rotctl")
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    raise EOFError
+                buffer += chunk
+                continue
+            line = buffer[:end].decode("ascii", "replace").strip()
+            del buffer[: end + 1]
+            if line.startswith("RPRT"):
+                if line != "RPRT 0":
+                    raise RuntimeError(f"Błąd rotctl: {line}")
+                return lines
+            lines.append(line)
+
+    def _read_reply_watchdog(self, proc: subprocess.Popen) -> list[str]:
+        """Wariant _read_reply bez select(): blokujący readline pilnowany wątkiem"""
+        watchdog = threading.Timer(self.timeout, proc.kill)
+        watchdog.start()
+        try:
+            lines = []
+            while True:
+                line = proc.stdout.readline()
+                if not line:
+                    if watchdog.finished.is_set():
+                        self._kill()
+                        raise RuntimeError("Timeout odpowiedzi rotctl")
+                    raise EOFError
+                line = line.decode("ascii", "replace").strip()
+                if line.startswith("RPRT"):
+                    if line != "RPRT 0":
+                        raise RuntimeError(f"Błąd rotctl: {line}")
+                    return lines
+                lines.append(line)
+        finally:
+            watchdog.cancel()
+
+    def _kill(self):
+        """Zabija proces rotctl (jeśli działa), zamyka jego potoki i zapomina o nim"""
+        proc = self._proc
+        if proc is not None:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdin.close()
+            proc.stdout.close()
+        self._proc = None
+        self._buffer.clear()
+
+    def close(self):
+        """Kończy proces rotctl"""
+        with self._lock:
+            if self._proc is not None and self._proc.poll() is None:
+                try:
+                    self._proc.stdin.write(ROTCTL_QUIT_PAYLOAD)
+                    self._proc.stdin.flush()
+                    self._proc.wait(timeout=1)
+                except (BrokenPipeError, subprocess.TimeoutExpired):
+                    pass
+            self._kill()
+
+
 # ===== KLASY BŁĘDÓW =====
 
 class AntennaError(Exception):
@@ -481,7 +783,11 @@ class AntennaState(Enum):
     CALIBRATING = "calibrating"
 
 
-@dataclass
+# Stan sprawdzany w pętlach - AntennaState.MOVING przez klasę Enum to ~90 ns na odczyt
+_MOVING = AntennaState.MOVING
+
+
+@dataclass(slots=True)
 class Position:
     """Pozycja anteny (azymut i elewacja)"""
 
@@ -497,7 +803,7 @@ class Position:
         # Elewacja bez ograniczeń - limity sprawdzane w AntennaController
 
 
-@dataclass
+@dataclass(slots=True)
 class AntennaLimits:
     """Limity mechaniczne anteny"""
 
@@ -509,7 +815,43 @@ class AntennaLimits:
     max_elevation_speed: float = 3.0  # stopnie/s
 
 
-@dataclass
+# Cache wczytanych plików kalibracji: (ścieżka, mtime_ns, rozmiar) -> kalibracja
+CALIBRATION_CACHE_SIZE = 128
+_calibration_cache: "OrderedDict[Tuple[str, int, int], PositionCalibration]" = (
+    OrderedDict()
+)
+_calibration_cache_lock = threading.Lock()
+
+
+def _calibration_cache_key(filepath: str, st: os.stat_result) -> Tuple[str, int, int]:
+    """Klucz cache - zmiana treści pliku zmienia mtime lub rozmiar"""
+    return os.path.abspath(filepath), st.st_mtime_ns, st.st_size
+
+
+def _calibration_cache_get(
+    key: Tuple[str, int, int]
+) -> Optional["PositionCalibration"]:
+    """Zwraca kopię kalibracji z cache (wywołujący może ją modyfikować)"""
+    with _calibration_cache_lock:
+        calibration = _calibration_cache.get(key)
+        if calibration is None:
+            return None
+        _calibration_cache.move_to_end(key)
+    return copy.copy(calibration)
+
+
+def _calibration_cache_put(
+    key: Tuple[str, int, int], calibration: "PositionCalibration"
+) -> None:
+    """Zapisuje kopię kalibracji w cache (LRU, CALIBRATION_CACHE_SIZE wpisów)"""
+    with _calibration_cache_lock:
+        _calibration_cache[key] = copy.copy(calibration)
+        _calibration_cache.move_to_end(key)
+        while len(_calibration_cache) > CALIBRATION_CACHE_SIZE:
+            _calibration_cache.popitem(last=False)
+
+
+@dataclass(slots=True)
 class PositionCalibration:
     """Kalibracja pozycji anteny z limitami bezpieczeństwa"""
 
@@ -524,6 +866,27 @@ class PositionCalibration:
     max_azimuth_speed: float = 5.0  # Maksymalna prędkość azymutu w stopniach/s
     max_elevation_speed: float = 3.0  # Maksymalna prędkość elewacji w stopniach/s
 
+    # Pola eksportowane do słownika/pliku (atrybut klasy, nie pole dataclass)
+    _EXPORT_KEYS = (
+        "azimuth_offset",
+        "elevation_offset",
+        "min_azimuth",
+        "max_azimuth",
+        "min_elevation",
+        "max_elevation",
+        "max_azimuth_speed",
+        "max_elevation_speed",
+    )
+
+    def _export_values(self) -> Tuple[float, ...]:
+        """Wartości pól _EXPORT_KEYS jako krotka (klucz porównań i buforów)"""
+        return tuple(getattr(self, key) for key in self._EXPORT_KEYS)
+
+    @property
+    def has_offsets(self) -> bool:
+        """Czy kalibracja przesuwa pozycję (limity elewacji obowiązują zawsze)"""
+        return self.azimuth_offset != 0.0 or self.elevation_offset != 0.0
+
     def apply_calibration(self, position: Position) -> Position:
         """Aplikuje kalibrację do pozycji"""
         # Aplikuj offset azymutu
@@ -532,8 +895,11 @@ class PositionCalibration:
         # Aplikuj offset elewacji
         calibrated_elevation = position.elevation + self.elevation_offset
 
-        # Ogranicz elewację do zakresów z kalibracji
-        calibrated_elevation = max(self.min_elevation, min(self.max_elevation, calibrated_elevation))
+        # Ogranicz elewację do zakresów z kalibracji (porównania zamiast max/min)
+        if calibrated_elevation < self.min_elevation:
+            calibrated_elevation = self.min_elevation
+        elif calibrated_elevation > self.max_elevation:
+            calibrated_elevation = self.max_elevation
 
         return Position(calibrated_azimuth, calibrated_elevation)
 
@@ -565,7 +931,8 @@ class PositionCalibration:
         """Zapisuje kalibrację i limity do pliku JSON"""
         try:
             # Utwórz folder jeśli nie istnieje
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            directory = os.path.dirname(filepath) or "."
+            os.makedirs(directory, exist_ok=True)
 
             calibration_data = {
                 "azimuth_offset": self.azimuth_offset,
@@ -580,13 +947,31 @@ class PositionCalibration:
                 "version": "2.0",
             }
 
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(calibration_data, f, indent=4, ensure_ascii=False)
+            # Zapis atomowy: plik tymczasowy w tym samym folderze + os.replace,
+            # więc przerwany zapis nie zostawia uszkodzonego pliku kalibracji
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                try:
+                    json.dump(calibration_data, f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    f.close()
+                    os.unlink(tmp_path)
+                    raise
+            os.replace(tmp_path, filepath)
+
+            # Następne load_from_file tego pliku nie musi go parsować
+            _calibration_cache_put(
+                _calibration_cache_key(filepath, os.stat(filepath)), self
+            )
 
-            logger.info(f"Kalibracja z limitami zapisana do pliku: {filepath}")
+            logger.info("Kalibracja z limitami zapisana do pliku: %s", filepath)
 
         except Exception as e:
-            logger.error(f"Błąd podczas zapisywania kalibracji: {e}")
+            logger.error("Błąd podczas zapisywania kalibracji: %s", e)
             raise AntennaError(f"Nie można zapisać kalibracji do pliku {filepath}: {e}")
 
     @classmethod
@@ -595,14 +980,30 @@ class PositionCalibration:
     ) -> "PositionCalibration":
         """Wczytuje kalibrację i limity z pliku JSON"""
         try:
-            if not os.path.exists(filepath):
+            try:
+                st = os.stat(filepath)
+            except FileNotFoundError:
                 logger.warning(
-                    f"Plik kalibracji {filepath} nie istnieje, używam domyślnych wartości"
+                    "Plik kalibracji %s nie istnieje, używam domyślnych wartości",
+                    filepath,
                 )
                 return cls()  # Zwróć domyślną kalibrację
 
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            # Plik niezmieniony od ostatniego odczytu/zapisu - bez ponownego parsowania
+            cache_key = _calibration_cache_key(filepath, st)
+            cached = _calibration_cache_get(cache_key)
+            if cached is not None:
+                logger.debug("Kalibracja z cache dla pliku: %s", filepath)
+                return cached
+
+            # Bez bufora: mały plik czytany jednym read(), ijson czyta własnymi porcjami
+            with open(filepath, "rb", buffering=0) as f:
+                if ijson is not None and st.st_size > CALIBRATION_STREAMING_THRESHOLD:
+                    data = _json_scalar_fields_streaming(f, cls._EXPORT_KEYS)
+                elif orjson is not None and st.st_size >= CALIBRATION_MMAP_THRESHOLD:
+                    data = _json_loads_mapped(f)
+                else:
+                    data = _json_loads(f.read())
 
             # Walidacja danych - podstawowe pola kalibracji
             required_fields = [
@@ -612,43 +1013,40 @@ class PositionCalibration:
             for field in required_fields:
                 if field not in data:
                     logger.warning(
-                        f"Brak pola '{field}' w pliku kalibracji, używam wartości domyślnej"
+                        "Brak pola '%s' w pliku kalibracji, używam wartości domyślnej",
+                        field,
                     )
 
-            calibration = cls(
-                azimuth_offset=float(data.get("azimuth_offset", 0.0)),
-                elevation_offset=float(data.get("elevation_offset", 0.0)),
-                min_azimuth=float(data.get("min_azimuth", 0.0)),
-                max_azimuth=float(data.get("max_azimuth", 360.0)),
-                min_elevation=float(data.get("min_elevation", 0.0)),
-                max_elevation=float(data.get("max_elevation", 90.0)),
-                max_azimuth_speed=float(data.get("max_azimuth_speed", 5.0)),
-                max_elevation_speed=float(data.get("max_elevation_speed", 3.0)),
-            )
+            calibration = cls.import_from_dict(data)
+            _calibration_cache_put(cache_key, calibration)
 
-            logger.info(f"Kalibracja wczytana z pliku: {filepath}")
+            logger.info("Kalibracja wczytana z pliku: %s", filepath)
             logger.info(
-                f"Parametry kalibracji: "
-                f"az_off={calibration.azimuth_offset:.2f}°, "
-                f"el_off={calibration.elevation_offset:.2f}°"
+                "Parametry kalibracji: az_off=%.2f°, el_off=%.2f°",
+                calibration.azimuth_offset,
+                calibration.elevation_offset,
             )
             logger.info(
-                f"Limity: az({calibration.min_azimuth}°-{calibration.max_azimuth}°), "
-                f"el({calibration.min_elevation}°-{calibration.max_elevation}°)"
+                "Limity: az(%s°-%s°), el(%s°-%s°)",
+                calibration.min_azimuth,
+                calibration.max_azimuth,
+                calibration.min_elevation,
+                calibration.max_elevation,
             )
 
             return calibration
 
         except json.JSONDecodeError as e:
-            logger.error(f"Błąd parsowania JSON w pliku {filepath}: {e}")
+            logger.error("Błąd parsowania JSON w pliku %s: %s", filepath, e)
             raise AntennaError(f"Nieprawidłowy format pliku kalibracji: {e}")
         except Exception as e:
-            logger.error(f"Błąd podczas wczytywania kalibracji: {e}")
+            logger.error("Błąd podczas wczytywania kalibracji: %s", e)
             raise AntennaError(f"Nie można wczytać kalibracji z pliku {filepath}: {e}")
 
     def export_to_dict(self) -> Dict[str, Any]:
         """Eksportuje kalibrację do słownika"""
-        return asdict(self)
+        # Płaska kopia pól - asdict() kopiuje rekurencyjnie i jest ~13x wolniejsze
+        return {key: getattr(self, key) for key in self._EXPORT_KEYS}
 
     @classmethod
     def import_from_dict(cls, data: Dict[str, Any]) -> "PositionCalibration":
@@ -668,6 +1066,13 @@ class PositionCalibration:
 class MotorConfig:
     """Konfiguracja silnika z możliwościami kalibracji"""
 
+    __slots__ = (
+        "steps_per_revolution",
+        "microsteps",
+        "azimuth_offset",
+        "elevation_offset",
+    )
+
     def __init__(
         self,
         steps_per_revolution: int = 200,
@@ -734,6 +1139,10 @@ class MotorDriver(ABC):
     def is_moving(self) -> bool:
         """Sprawdza czy silniki się poruszają"""
 
+    def slew_rates(self) -> Optional[Tuple[float, float]]:
+        """Prędkości obrotu (azymut, elewacja) w stopniach/s, jeśli sterownik je zna"""
+        return None
+
 
 class RotctlMotorDriver(MotorDriver):
     """Sterownik silnika komunikujący się przez rotctl (Hamlib) z protokołem SPID"""
@@ -747,6 +1156,8 @@ class RotctlMotorDriver(MotorDriver):
         self.target_azimuth = 0.0
         self.target_elevation = 0.0
         self.is_moving_flag = False
+        # Jeden proces rotctl na całe połączenie zamiast procesu na komendę
+        self._session: Optional[RotctlSession] = None
 
     def connect(self) -> None:
         """Sprawdza dostępność rotctl i portu"""
@@ -754,40 +1165,65 @@ class RotctlMotorDriver(MotorDriver):
             if not sprawdz_rotctl():
                 raise CommunicationError("rotctl (Hamlib) nie jest dostępne w systemie")
 
+            self._session = RotctlSession(self.port, self.baudrate)
+
             # Test połączenia - spróbuj odczytać pozycję
-            self.current_azimuth, self.current_elevation = rotctl_odczytaj_pozycje(
-                self.port, self.baudrate
-            )
+            self.current_azimuth, self.current_elevation = self._read_position()
             self.connected = True
             logger.info(
-                f"Połączono z kontrolerem SPID przez rotctl na porcie {self.port} (baudrate: {self.baudrate})"
+                "Połączono z kontrolerem SPID przez rotctl na porcie %s (baudrate: %s)",
+                self.port,
+                self.baudrate,
             )
             logger.info(
-                f"Aktualna pozycja: Az={self.current_azimuth:.1f}°, El={self.current_elevation:.1f}°"
+                "Aktualna pozycja: Az=%.1f°, El=%.1f°",
+                self.current_azimuth,
+                self.current_elevation,
             )
 
         except Exception as e:
-            logger.error(f"Błąd połączenia z SPID przez rotctl: {e}")
+            self._close_session()
+            logger.error("Błąd połączenia z SPID przez rotctl: %s", e)
             raise CommunicationError(f"Nie można nawiązać połączenia przez rotctl: {e}")
 
     def disconnect(self) -> None:
-        """Rozłącza połączenie - rotctl nie wymaga jawnego rozłączania"""
+        """Rozłącza połączenie i kończy proces rotctl"""
+        self._close_session()
         self.connected = False
         logger.info("Rozłączono z kontrolerem SPID (rotctl)")
 
+    def _close_session(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _session_command(self, komenda: str) -> Optional[str]:
+        """Komenda przez sesję rotctl; zwraca odpowiedź lub None, gdy sesja zawiodła"""
+        try:
+            return "\n".join(self._session.command(komenda))
+        except RuntimeError as e:
+            logger.warning("Sesja rotctl: %s, używam jednorazowego wywołania rotctl", e)
+            return None
+
+    def _read_position(self) -> Tuple[float, float]:
+        """Odczyt pozycji przez sesję rotctl, z jednorazowym rotctl jako rezerwą"""
+        response = self._session_command(ROTCTL_GET_POS_CMD)
+        position = parse_rotctl_position(response) if response else None
+        if position is None:
+            position = rotctl_odczytaj_pozycje(self.port, self.baudrate)
+        return position
+
     def get_position(self) -> Tuple[float, float]:
         """Odczytuje aktualną pozycję anteny w stopniach"""
         if not self.connected:
             raise CommunicationError("Sterownik rotctl nie jest połączony")
 
         try:
-            self.current_azimuth, self.current_elevation = rotctl_odczytaj_pozycje(
-                self.port, self.baudrate
-            )
+            self.current_azimuth, self.current_elevation = self._read_position()
             return self.current_azimuth, self.current_elevation
 
         except Exception as e:
-            logger.error(f"Błąd odczytu pozycji przez rotctl: {e}")
+            logger.error("Błąd odczytu pozycji przez rotctl: %s", e)
             raise CommunicationError(f"Nie można odczytać pozycji przez rotctl: {e}")
 
     def move_to_position(self, azimuth: float, elevation: float) -> None:
@@ -805,21 +1241,32 @@ class RotctlMotorDriver(MotorDriver):
             self.is_moving_flag = True
 
             logger.info(
-                f"Rotctl: Ustawianie pozycji Az={azimuth:.1f}°, El={elevation:.1f}°"
+                "Rotctl: Ustawianie pozycji Az=%.1f°, El=%.1f°",
+                azimuth,
+                elevation,
             )
 
             # Dodatkowy delay przed wysłaniem komendy
             time.sleep(0.2)
 
-            response = rotctl_ustaw_pozycje(
-                self.port, azimuth, elevation, self.baudrate
+            if elevation < -90.0 or elevation > 90.0:
+                raise RuntimeError(
+                    f"Elewacja {elevation:.1f}° poza dozwolonym zakresem (-90° do +90°)"
+                )
+
+            response = self._session_command(
+                ROTCTL_SET_POS_FMT % (azimuth % 360, elevation)
             )
+            if response is None:
+                response = rotctl_ustaw_pozycje(
+                    self.port, azimuth, elevation, self.baudrate
+                )
 
-            logger.info(f"Rotctl: Komenda wysłana. Odpowiedź: {response}")
+            logger.info("Rotctl: Komenda wysłana. Odpowiedź: %s", response)
 
         except Exception as e:
             self.is_moving_flag = False
-            logger.error(f"Błąd podczas ruchu przez rotctl: {e}")
+            logger.error("Błąd podczas ruchu przez rotctl: %s", e)
             raise CommunicationError(f"Nie można przesunąć anteny przez rotctl: {e}")
 
     def stop(self) -> None:
@@ -829,12 +1276,14 @@ class RotctlMotorDriver(MotorDriver):
 
         try:
             logger.info("Rotctl: Zatrzymywanie ruchu anteny")
-            response = rotctl_zatrzymaj_rotor(self.port, self.baudrate)
+            response = self._session_command(ROTCTL_STOP_CMD)
+            if response is None:
+                response = rotctl_zatrzymaj_rotor(self.port, self.baudrate)
             self.is_moving_flag = False
-            logger.info(f"Rotctl: Ruch zatrzymany. Odpowiedź: {response}")
+            logger.info("Rotctl: Ruch zatrzymany. Odpowiedź: %s", response)
 
         except Exception as e:
-            logger.error(f"Błąd podczas zatrzymywania przez rotctl: {e}")
+            logger.error("Błąd podczas zatrzymywania przez rotctl: %s", e)
             raise CommunicationError(f"Nie można zatrzymać anteny przez rotctl: {e}")
 
     def is_moving(self) -> bool:
@@ -863,13 +1312,15 @@ class RotctlMotorDriver(MotorDriver):
             if is_at_target:
                 self.is_moving_flag = False
                 logger.info(
-                    f"Rotctl: Pozycja docelowa osiągnięta Az={current_az:.1f}°, El={current_el:.1f}°"
+                    "Rotctl: Pozycja docelowa osiągnięta Az=%.1f°, El=%.1f°",
+                    current_az,
+                    current_el,
                 )
 
             return not is_at_target
 
         except Exception as e:
-            logger.warning(f"Błąd sprawdzenia ruchu przez rotctl: {e}")
+            logger.warning("Błąd sprawdzenia ruchu przez rotctl: %s", e)
             # W razie błędu zakładamy że ruch się zakończył
             self.is_moving_flag = False
             return False
@@ -908,7 +1359,11 @@ class SimulatedMotorDriver(MotorDriver):
         self.is_moving_flag = True
         self.last_move_time = time.time()
 
-        logger.info(f"Symulator: Ruch do pozycji Az={azimuth}°, El={elevation}°")
+        logger.info("Symulator: Ruch do pozycji Az=%s°, El=%s°", azimuth, elevation)
+
+    def slew_rates(self) -> Tuple[float, float]:
+        """Symulator porusza obie osie z tą samą prędkością"""
+        return self.simulation_speed, self.simulation_speed
 
     def get_position(self) -> Tuple[float, float]:
         """Zwraca aktualną pozycję w stopniach z symulacją ruchu"""
@@ -983,6 +1438,9 @@ class AntennaController:
         self.update_callback = update_callback
         self.calibration_file = calibration_file
 
+        # Sekcja "calibration" statusu: (wartości kalibracji, słownik)
+        self._calibration_status: Optional[Tuple[Tuple[Any, ...], Dict[str, Any]]] = None
+
         # Wczytaj kalibrację z pliku lub użyj podanej
         if position_calibration is not None:
             self.position_calibration = position_calibration
@@ -999,13 +1457,83 @@ class AntennaController:
             self.limits = self.position_calibration.get_antenna_limits()
             logger.info("Używam limitów bezpieczeństwa z pliku kalibracji")
 
+        # Ustawiane przy każdym wyjściu ze stanu MOVING (patrz wait_until_idle)
+        self._move_done = threading.Event()
         self.state = AntennaState.IDLE
         self.current_position = Position(0.0, 0.0)
         self.target_position: Optional[Position] = None
 
+        # Ostatnio wysłana (skalibrowana) pozycja docelowa z rozdzielczością komendy rotctl
+        self._last_sent_target: Optional[Tuple[float, float]] = None
+
         self._monitoring_thread: Optional[threading.Thread] = None
         self._monitoring_active = False
         self._stop_monitoring = threading.Event()
+        # Budzi wątek monitorowania po wysłaniu ruchu; odczyt przy przewidywanym końcu
+        self._monitor_wakeup = threading.Event()
+        self._expected_arrival = 0.0
+
+        # Zapis kalibracji (chroni _saved_calibration_state)
+        self._calibration_lock = threading.Lock()
+        # Stan pliku i kalibracji po ostatnim zapisie/odczycie (pomijanie zbędnych zapisów)
+        self._saved_calibration_state = (
+            self._calibration_file_state(self.calibration_file)
+            if position_calibration is None
+            else None
+        )
+
+    def _get_calibration_status(self) -> Dict[str, Any]:
+        """
+        Sekcja "calibration" statusu jako zwykły słownik (kopia).
+
+        Słownik jest budowany ponownie tylko gdy zmienią się wartości kalibracji,
+        także zmienione w miejscu (klucz to krotka wartości, nie unieważnianie).
+        """
+        cal = self.position_calibration
+        key = cal._export_values()
+        cached = self._calibration_status
+        if cached is None or cached[0] != key:
+            limits = {
+                "min_azimuth": cal.min_azimuth,
+                "max_azimuth": cal.max_azimuth,
+                "min_elevation": cal.min_elevation,
+                "max_elevation": cal.max_elevation,
+                "max_azimuth_speed": cal.max_azimuth_speed,
+                "max_elevation_speed": cal.max_elevation_speed,
+            }
+            cached = (
+                key,
+                {
+                    "azimuth_offset": cal.azimuth_offset,
+                    "elevation_offset": cal.elevation_offset,
+                    "limits": limits,
+                },
+            )
+            self._calibration_status = cached
+        status = cached[1]
+        return {**status, "limits": dict(status["limits"])}
+
+    @property
+    def state(self) -> AntennaState:
+        """Aktualny stan anteny"""
+        return self._state
+
+    @state.setter
+    def state(self, value: AntennaState) -> None:
+        self._state = value
+        if value is _MOVING:
+            self._move_done.clear()
+        else:
+            self._move_done.set()
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Czeka, aż antena opuści stan MOVING (bez odpytywania w pętli).
+
+        Returns:
+            True jeśli ruch się zakończył, False po przekroczeniu timeout
+        """
+        return self._move_done.wait(timeout)
 
     def initialize(self) -> None:
         """Inicjalizuje system anteny"""
@@ -1041,6 +1569,9 @@ class AntennaController:
         max_consecutive_errors = 3
 
         while not self._stop_monitoring.is_set():
+            # Zerowanie przed odczytem stanu - set() z move_to po tym miejscu
+            # przerwie najbliższe wait(), a wcześniejszy jest widoczny w odczycie
+            self._monitor_wakeup.clear()
             try:
                 # Wszystkie sterowniki teraz zwracają bezpośrednio stopnie
                 azimuth, elevation = self.motor_driver.get_position()
@@ -1048,11 +1579,11 @@ class AntennaController:
 
                 # Sprawdź czy ruch się zakończył
                 if (
-                    self.state == AntennaState.MOVING
+                    self._state is _MOVING
                     and not self.motor_driver.is_moving()
                 ):
                     self.state = AntennaState.IDLE
-                    logger.info(f"Ruch zakończony. Pozycja: {self.current_position}")
+                    logger.info("Ruch zakończony. Pozycja: %s", self.current_position)
 
                 # Wywołaj callback jeśli zdefiniowany
                 if self.update_callback:
@@ -1063,19 +1594,47 @@ class AntennaController:
 
             except Exception as e:
                 consecutive_errors += 1
-                logger.error(f"Błąd monitorowania: {e}")
+                logger.error("Błąd monitorowania: %s", e)
 
                 # Jeśli wystąpiło zbyt wiele błędów pod rząd, ustaw stan błędu
                 if consecutive_errors >= max_consecutive_errors:
                     self.state = AntennaState.ERROR
                     logger.error(
-                        f"Zbyt wiele błędów monitorowania pod rząd ({consecutive_errors})"
+                        "Zbyt wiele błędów monitorowania pod rząd (%s)",
+                        consecutive_errors,
                     )
 
                 # Krótka pauza po błędzie
                 time.sleep(0.2)
 
-            time.sleep(0.5)  # Aktualizacja co 500ms
+            # Aktualizacja co 500ms, częściej w okolicy przewidywanego końca ruchu
+            delay = MONITOR_INTERVAL
+            if self._state is _MOVING:
+                remaining = self._expected_arrival - time.monotonic()
+                if -1.0 < remaining < delay:
+                    delay = max(remaining, MIN_MONITOR_INTERVAL)
+            self._monitor_wakeup.wait(delay)
+
+    def estimate_slew_time(self, from_position: Position, to_position: Position) -> float:
+        """
+        Szacuje czas ruchu (s) między pozycjami na podstawie prędkości osi.
+
+        Azymut liczony jest jako najkrótsza odległość kątowa (359° -> 1° to 2°),
+        oś bez znanej dodatniej prędkości nie wydłuża oszacowania.
+        """
+        rates = self.motor_driver.slew_rates()
+        if rates is None:
+            rates = (self.limits.max_azimuth_speed, self.limits.max_elevation_speed)
+        az_rate, el_rate = rates
+
+        d_az = abs(to_position.azimuth - from_position.azimuth) % 360.0
+        d_az = min(d_az, 360.0 - d_az)
+        d_el = abs(to_position.elevation - from_position.elevation)
+        return SLEW_START_OVERHEAD + max(
+            (distance / rate for distance, rate in ((d_az, az_rate), (d_el, el_rate))
+             if rate and rate > 0),
+            default=0.0,
+        )
 
     def _validate_position(self, position: Position) -> None:
         """Waliduje pozycję względem limitów mechanicznych"""
@@ -1093,8 +1652,13 @@ class AntennaController:
                 f"({self.limits.min_elevation}°-{self.limits.max_elevation}°)"
             )
 
-    def move_to(self, position: Position) -> None:
-        """Przesuwa antenę do zadanej pozycji (z uwzględnieniem kalibracji)"""
+    def move_to(self, position: Position, force: bool = False) -> None:
+        """Przesuwa antenę do zadanej pozycji (z uwzględnieniem kalibracji)
+
+        Args:
+            position: Pozycja docelowa (bez kalibracji)
+            force: Wyślij komendę nawet jeśli cel jest taki sam jak poprzedni
+        """
         if self.state == AntennaState.ERROR:
             raise AntennaError("System w stanie błędu - nie można wykonać ruchu")
 
@@ -1104,6 +1668,23 @@ class AntennaController:
         # Waliduj skalibrowaną pozycję
         self._validate_position(calibrated_position)
 
+        # Pomiń redundantną komendę - cel identyczny z poprzednim w rozdzielczości 0.1°
+        target_key = (
+            round(calibrated_position.azimuth % 360, 1),
+            round(calibrated_position.elevation, 1),
+        )
+        if (
+            not force
+            and target_key == self._last_sent_target
+            and not self._drifted_from(calibrated_position)
+        ):
+            logger.debug("Pominięto redundantną komendę ruchu do pozycji: %s", position)
+            return
+
+        # Przed wysłaniem komendy - błąd oszacowania nie może oznaczyć
+        # wysłanego już ruchu jako nieudanego
+        slew_time = self.estimate_slew_time(self.current_position, calibrated_position)
+
         try:
             self.target_position = (
                 position  # Zapisz oryginalną pozycję (bez kalibracji)
@@ -1114,15 +1695,33 @@ class AntennaController:
             self.motor_driver.move_to_position(
                 calibrated_position.azimuth, calibrated_position.elevation
             )
+            self._last_sent_target = target_key
+            self._expected_arrival = time.monotonic() + slew_time
+            self._monitor_wakeup.set()
 
             logger.info(
-                f"Rozpoczęto ruch do pozycji: {position} (skalibrowana: {calibrated_position})"
+                "Rozpoczęto ruch do pozycji: %s (skalibrowana: %s)",
+                position,
+                calibrated_position,
             )
                 
         except Exception as e:
+            self._last_sent_target = None
             self.state = AntennaState.ERROR
             raise PositionError(f"Błąd podczas ruchu: {e}")
 
+    def _drifted_from(self, calibrated_target: Position) -> bool:
+        """Czy antena w spoczynku stoi dalej od celu niż TARGET_DRIFT_TOLERANCE"""
+        if self._state is _MOVING:
+            return False
+        current = self.current_position
+        d_az = abs(current.azimuth - calibrated_target.azimuth) % 360.0
+        d_az = min(d_az, 360.0 - d_az)
+        return (
+            d_az > TARGET_DRIFT_TOLERANCE
+            or abs(current.elevation - calibrated_target.elevation) > TARGET_DRIFT_TOLERANCE
+        )
+
     def get_current_position(self, apply_reverse_calibration: bool = True) -> Position:
         """Zwraca aktualną pozycję anteny"""
         if apply_reverse_calibration:
@@ -1148,25 +1747,66 @@ class AntennaController:
 
         if save_to_file:
             try:
-                calibration.save_to_file(self.calibration_file)
-                logger.info("Kalibracja została automatycznie zapisana do pliku")
+                self.save_calibration()
             except Exception as e:
-                logger.warning(f"Nie udało się zapisać kalibracji do pliku: {e}")
+                logger.warning("Nie udało się zapisać kalibracji do pliku: %s", e)
 
         logger.info(
-            f"Ustawiono kalibrację pozycji: offset_az={calibration.azimuth_offset}°, "
-            f"offset_el={calibration.elevation_offset}°"
+            "Ustawiono kalibrację pozycji: offset_az=%s°, offset_el=%s°",
+            calibration.azimuth_offset,
+            calibration.elevation_offset,
         )
         logger.info(
-            f"Limity: az({calibration.min_azimuth}°-{calibration.max_azimuth}°), "
-            f"el({calibration.min_elevation}°-{calibration.max_elevation}°)"
+            "Limity: az(%s°-%s°), el(%s°-%s°)",
+            calibration.min_azimuth,
+            calibration.max_azimuth,
+            calibration.min_elevation,
+            calibration.max_elevation,
         )
 
     def save_calibration(self, filepath: Optional[str] = None) -> None:
-        """Zapisuje aktualną kalibrację do pliku"""
+        """
+        Zapisuje aktualną kalibrację do pliku (synchronicznie).
+
+        Raises:
+            AntennaError: Jeśli zapis się nie powiódł
+        """
         file_to_use = filepath or self.calibration_file
-        self.position_calibration.save_to_file(file_to_use)
-        logger.info(f"Kalibracja zapisana do {file_to_use}")
+        with self._calibration_lock:
+            written = self._write_calibration(file_to_use)
+        if written:
+            logger.info("Kalibracja zapisana do %s", file_to_use)
+
+    def _calibration_file_state(self, filepath: str) -> Optional[Tuple[Any, ...]]:
+        """Ścieżka, mtime i rozmiar pliku oraz wartości aktualnej kalibracji"""
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        calibration = self.position_calibration
+        return (
+            os.path.abspath(filepath),
+            st.st_mtime_ns,
+            st.st_size,
+            calibration._export_values(),
+        )
+
+    def _write_calibration(self, filepath: str) -> bool:
+        """
+        Zapisuje kalibrację, chyba że plik zawiera już dokładnie te wartości.
+
+        Plik zmieniony z zewnątrz (inny mtime/rozmiar) jest zawsze nadpisywany.
+
+        Returns:
+            True jeśli plik został zapisany
+        """
+        saved = self._saved_calibration_state
+        if saved is not None and saved == self._calibration_file_state(filepath):
+            logger.debug("Kalibracja bez zmian - pomijam zapis do %s", filepath)
+            return False
+        self.position_calibration.save_to_file(filepath)
+        self._saved_calibration_state = self._calibration_file_state(filepath)
+        return True
 
     def load_calibration(
         self, filepath: Optional[str] = None, update_limits: bool = True
@@ -1174,6 +1814,8 @@ class AntennaController:
         """Wczytuje kalibrację z pliku"""
         file_to_use = filepath or self.calibration_file
         self.position_calibration = PositionCalibration.load_from_file(file_to_use)
+        with self._calibration_lock:
+            self._saved_calibration_state = self._calibration_file_state(file_to_use)
 
         # Zaktualizuj limity na podstawie wczytanej kalibracji
         if update_limits:
@@ -1182,7 +1824,7 @@ class AntennaController:
                 "Limity bezpieczeństwa zaktualizowane na podstawie wczytanej kalibracji"
             )
 
-        logger.info(f"Kalibracja wczytana z {file_to_use}")
+        logger.info("Kalibracja wczytana z %s", file_to_use)
 
     def reset_calibration(
         self, save_to_file: bool = True, update_limits: bool = True
@@ -1198,9 +1840,8 @@ class AntennaController:
         if save_to_file:
             try:
                 self.save_calibration()
-                logger.info("Zresetowana kalibracja została zapisana do pliku")
             except Exception as e:
-                logger.warning(f"Nie udało się zapisać zresetowanej kalibracji: {e}")
+                logger.warning("Nie udało się zapisać zresetowanej kalibracji: %s", e)
 
         logger.info("Kalibracja została zresetowana do wartości domyślnych")
 
@@ -1220,14 +1861,14 @@ class AntennaController:
         if save_to_file:
             try:
                 self.save_calibration()
-                logger.info("Kalibracja azymutu została zapisana do pliku")
             except Exception as e:
-                logger.warning(f"Nie udało się zapisać kalibracji azymutu: {e}")
+                logger.warning("Nie udało się zapisać kalibracji azymutu: %s", e)
 
-        logger.info(f"Skalibrowano azymut: offset={offset}°")
+        logger.info("Skalibrowano azymut: offset=%s°", offset)
 
     def stop(self) -> None:
         """Zatrzymuje ruch anteny"""
+        self._last_sent_target = None
         try:
             self.motor_driver.stop()
             self.state = AntennaState.STOPPED
@@ -1241,14 +1882,14 @@ class AntennaController:
         """Kalibruje pozycję anteny (powrót do pozycji domowej)"""
         logger.info("Rozpoczęcie kalibracji...")
         self.state = AntennaState.CALIBRATING
+        self._last_sent_target = None
 
         # Powrót do pozycji 0,0
         home_position = Position(0.0, 0.0)
         self.move_to(home_position)
 
         # Czekaj na zakończenie kalibracji
-        while self.state == AntennaState.MOVING:
-            time.sleep(0.1)
+        self.wait_until_idle()
 
         self.state = AntennaState.IDLE
         logger.info("Kalibracja zakończona")
@@ -1282,24 +1923,14 @@ class AntennaController:
                     "elevation": self.limits.max_elevation_speed,
                 },
             },
-            "calibration": {
-                "azimuth_offset": self.position_calibration.azimuth_offset,
-                "elevation_offset": self.position_calibration.elevation_offset,
-                "limits": {
-                    "min_azimuth": self.position_calibration.min_azimuth,
-                    "max_azimuth": self.position_calibration.max_azimuth,
-                    "min_elevation": self.position_calibration.min_elevation,
-                    "max_elevation": self.position_calibration.max_elevation,
-                    "max_azimuth_speed": self.position_calibration.max_azimuth_speed,
-                    "max_elevation_speed": self.position_calibration.max_elevation_speed,
-                },
-            },
+            "calibration": self._get_calibration_status(),
             "calibration_file": self.calibration_file,
         }
 
     def reset_error(self) -> None:
         """Resetuje stan błędu kontrolera"""
         if self.state == AntennaState.ERROR:
+            self._last_sent_target = None
             self.state = AntennaState.IDLE
             logger.info("Stan błędu został zresetowany")
 
@@ -1337,13 +1968,21 @@ class AntennaController:
                     # Jeśli antena się porusza (więcej niż 0.2°), zaktualizuj czas ostatniego ruchu
                     if az_moved > 0.2 or el_moved > 0.2:
                         last_movement_time = current_time
-                        logger.debug(f"Wykryto ruch anteny: dAz={az_moved:.1f}°, dEl={el_moved:.1f}°")
+                        logger.debug(
+                            "Wykryto ruch anteny: dAz=%.1f°, dEl=%.1f°",
+                            az_moved,
+                            el_moved,
+                        )
 
                 # Sprawdź stan kontrolera - jeśli nie jest w ruchu i pozycja się stabilizowała
                 time_since_movement = current_time - last_movement_time
-                if (self.state != AntennaState.MOVING and 
+                if (self._state is not _MOVING and 
                     time_since_movement > 3.0):  # 3 sekundy bez ruchu dla lepszej stabilności
-                    logger.debug(f"Ruch zakończony - stan: {self.state}, brak ruchu przez {time_since_movement:.1f}s")
+                    logger.debug(
+                        "Ruch zakończony - stan: %s, brak ruchu przez %.1fs",
+                        self.state,
+                        time_since_movement,
+                    )
                     break
                 
                 # Sprawdź timeout - ale tylko jeśli antena nie porusza się przez ostatnie 10 sekund
@@ -1360,7 +1999,7 @@ class AntennaController:
             except Exception as e:
                 if isinstance(e, TimeoutError):
                     raise
-                logger.warning(f"Błąd podczas sprawdzania ruchu: {e}")
+                logger.warning("Błąd podczas sprawdzania ruchu: %s", e)
                 time.sleep(0.5)
 
 
@@ -1379,7 +2018,7 @@ class AntennaControllerFactory:
         # Jeśli port nie został podany, użyj inteligentnego wyboru
         if port is None:
             port = get_best_spid_port()
-            logger.info(f"Automatycznie wybrano port: {port}")
+            logger.info("Automatycznie wybrano port: %s", port)
         else:
             # Sprawdź czy podany port jest dostępny
             port = get_best_spid_port(preferred_port=port)
@@ -1464,8 +2103,7 @@ if __name__ == "__main__":
             controller.move_to(pos)
 
             # Czekaj na zakończenie ruchu
-            while controller.state == AntennaState.MOVING:
-                time.sleep(0.5)
+            controller.wait_until_idle(timeout=30)
 
             print(f"Osiągnięto pozycję: {controller.current_position}")
             time.sleep(1)
@@ -1482,7 +2120,7 @@ if __name__ == "__main__":
 
     except Exception as e:
         print(f"Błąd: {e}")
-        logger.error(f"Błąd główny: {e}")
+        logger.error("Błąd główny: %s", e)
 
     finally:
         controller.shutdown()
@@ -5,15 +5,18 @@ Wykorzystuje protokół SPID do sterowania anteną i kalkulator astronomiczny
 Autor: Aleks Czarnecki
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import State
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Callable, Dict, Optional
 from contextlib import asynccontextmanager
+import hashlib
 import logging
 import os
 import sys
+import time
 import asyncio
 
 # Import z głównego folderu
@@ -25,7 +28,8 @@ from antenna_controller import (
     AntennaControllerFactory, MotorConfig, get_best_spid_port
 )
 from astronomic_calculator import (
-    AstronomicalCalculator, ObserverLocation, AstronomicalObjectType, AstronomicalTracker
+    AstronomicalCalculator, ObserverLocation, AstronomicalObjectType, AstronomicalTracker,
+    AstronomicalPosition
 )
 
 # Konfiguracja logowania
@@ -35,37 +39,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Globalne instancje
-antenna_controller: Optional[AntennaController] = None
-astro_calculator: Optional[AstronomicalCalculator] = None
-current_observer_location: Optional[ObserverLocation] = None
-astro_tracker: Optional[AstronomicalTracker] = None
-tracking_active: bool = False
-tracking_task: Optional[asyncio.Task] = None
-current_port: Optional[str] = None
+# Ścieżka do pliku interfejsu webowego
+WEB_INTERFACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web_interface.html")
 
 @asynccontextmanager
-async def lifespan(_app: FastAPI):
+async def lifespan(fastapi_app: FastAPI):
     """Lifecycle manager dla aplikacji FastAPI"""
     # Startup
     logger.info("Uruchamianie API radioteleskopu...")
+
+    # Stan aplikacji przechowywany w app.state zamiast zmiennych globalnych
+    state = fastapi_app.state
+    state.controller = None
+    state.astro_calculator = None
+    state.observer_location = None
+    state.astro_tracker = None
+    state.astro_position_cache = {}
+    state.tracking_active = False
+    state.tracking_task = None
+    state.current_port = None
+
+    # Wczytaj interfejs webowy raz do pamięci zamiast czytać plik przy każdym żądaniu
+    state.web_html = None
+    if os.path.exists(WEB_INTERFACE_FILE):
+        with open(WEB_INTERFACE_FILE, "rb") as f:
+            state.web_html = f.read()
+    else:
+        logger.warning(
+            "Nie znaleziono pliku interfejsu webowego: %s",
+            WEB_INTERFACE_FILE,
+        )
     yield
     # Shutdown
-    global antenna_controller, tracking_active, tracking_task
     logger.info("Zamykanie API...")
 
     # Zatrzymaj śledzenie
-    if tracking_active:
-        tracking_active = False
-        if tracking_task and not tracking_task.done():
-            tracking_task.cancel()
+    if state.tracking_active:
+        state.tracking_active = False
+        if state.tracking_task and not state.tracking_task.done():
+            state.tracking_task.cancel()
 
-    if antenna_controller:
+    if state.controller:
         try:
-            antenna_controller.stop()
-            antenna_controller.shutdown()
+            state.controller.stop()
+            state.controller.shutdown()
         except Exception as e:
-            logger.error(f"Błąd podczas zamykania: {e}")
+            logger.error("Błąd podczas zamykania: %s", e)
 
 # Inicjalizacja FastAPI
 app = FastAPI(
@@ -154,52 +173,128 @@ class TrackingConfigModel(BaseModel):
         1.0, ge=0.1, le=300, description="Interwał aktualizacji pozycji w sekundach"
     )
 
+# Tablica obsługi obiektów astronomicznych: nazwa (małymi literami) -> funkcja pozycji
+PLANET_TYPES = (
+    AstronomicalObjectType.MERCURY,
+    AstronomicalObjectType.VENUS,
+    AstronomicalObjectType.MARS,
+    AstronomicalObjectType.JUPITER,
+    AstronomicalObjectType.SATURN,
+    AstronomicalObjectType.URANUS,
+    AstronomicalObjectType.NEPTUNE,
+)
+
+_OBJECT_HANDLERS: Dict[str, Callable[[AstronomicalCalculator], AstronomicalPosition]] = {
+    AstronomicalObjectType.SUN.value: lambda c: c.get_sun_position(),
+    AstronomicalObjectType.MOON.value: lambda c: c.get_moon_position(),
+    **{
+        planet.value: (lambda c, planet=planet: c.get_planet_position(planet))
+        for planet in PLANET_TYPES
+    },
+}
+
+# Czas ważności (s) pozycji w cache dla endpointu /astronomical/position
+ASTRO_CACHE_TTL_DEFAULT = 0.5
+ASTRO_CACHE_TTL = {
+    AstronomicalObjectType.SUN.value: 0.05,
+    AstronomicalObjectType.MOON.value: 0.05,
+}
+ASTRO_CACHE_MAX_SIZE = 256
+
 # Pomocnicze funkcje
-def get_antenna_controller() -> AntennaController:
+def get_cached_object_position(
+    state: State, calculator: AstronomicalCalculator, object_name: str
+) -> AstronomicalPosition:
+    """
+    Zwraca pozycję obiektu z krótkotrwałego cache (per obiekt) lub oblicza ją na nowo.
+    Cache jest czyszczony przy zmianie lokalizacji obserwatora.
+    """
+    key = _object_key(object_name)
+    now = time.monotonic()
+    cached = state.astro_position_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    position = get_object_position(calculator, object_name)
+    if len(state.astro_position_cache) >= ASTRO_CACHE_MAX_SIZE:
+        state.astro_position_cache.clear()
+    state.astro_position_cache[key] = (
+        now + ASTRO_CACHE_TTL.get(key, ASTRO_CACHE_TTL_DEFAULT),
+        position,
+    )
+    return position
+
+def _object_key(object_name: str) -> str:
+    """Nazwa obiektu po normalizacji używanej przy wyszukiwaniu
+
+    Nazwy z _OBJECT_HANDLERS są niezależne od wielkości liter, nazwy gwiazd
+    trafiają do katalogu PyEphem bez zmian.
+    """
+    lowered = object_name.lower()
+    return lowered if lowered in _OBJECT_HANDLERS else object_name
+
+def get_object_position(calculator: AstronomicalCalculator, object_name: str) -> AstronomicalPosition:
+    """Oblicza pozycję obiektu po nazwie - Słońce, Księżyc i planety z tablicy, pozostałe jako gwiazdy"""
+    key = _object_key(object_name)
+    handler = _OBJECT_HANDLERS.get(key)
+    if handler is not None:
+        return handler(calculator)
+    return calculator.get_star_position(key)
+
+def check_etag(request: Request, response: Response, key: tuple) -> Optional[Response]:
+    """
+    Oblicza ETag dla stanu opisanego krotką key.
+    Skrót blake2b jest stabilny między procesami (wbudowany hash() jest losowany
+    per proces, więc po restarcie lub przy kilku workerach ETag by się zmieniał).
+    Zwraca odpowiedź 304 jeśli klient ma już aktualne dane, w przeciwnym razie
+    ustawia nagłówek ETag w odpowiedzi i zwraca None.
+    """
+    etag = f'"{hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+def get_antenna_controller(request: Request) -> AntennaController:
     """Pobiera kontroler anteny lub rzuca wyjątek HTTP jeśli nie jest zainicjalizowany"""
-    global antenna_controller
-    if antenna_controller is None:
+    controller = request.app.state.controller
+    if controller is None:
         raise HTTPException(status_code=503, detail="Kontroler anteny nie jest zainicjalizowany. Użyj /connect")
-    return antenna_controller
+    return controller
 
-def get_astro_calculator() -> AstronomicalCalculator:
+def get_astro_calculator(request: Request) -> AstronomicalCalculator:
     """Pobiera kalkulator astronomiczny lub rzuca wyjątek HTTP jeśli nie jest skonfigurowany"""
-    global astro_calculator, current_observer_location
-    if astro_calculator is None or current_observer_location is None:
+    state = request.app.state
+    if state.astro_calculator is None or state.observer_location is None:
         raise HTTPException(status_code=503, detail="Kalkulator astronomiczny nie jest skonfigurowany. Ustaw lokalizację obserwatora")
-    return astro_calculator
+    return state.astro_calculator
 
-def get_astro_tracker() -> AstronomicalTracker:
+def get_astro_tracker(request: Request) -> AstronomicalTracker:
     """Pobiera tracker astronomiczny lub rzuca wyjątek HTTP jeśli nie jest skonfigurowany"""
-    global astro_tracker
-    if astro_tracker is None:
+    tracker = request.app.state.astro_tracker
+    if tracker is None:
         raise HTTPException(status_code=503, detail="Tracker astronomiczny nie jest skonfigurowany. Ustaw lokalizację obserwatora")
-    return astro_tracker
-
-async def continuous_tracking_task(tracking_config: TrackingConfigModel):
+    return tracker
+
+async def continuous_tracking_task(
+    state: State,
+    tracking_config: TrackingConfigModel,
+    tracker: AstronomicalTracker,
+    controller: AntennaController,
+):
     """Zadanie ciągłego śledzenia obiektu astronomicznego"""
-    global tracking_active, antenna_controller
-    
-    logger.info(f"Rozpoczęcie ciągłego śledzenia obiektu: {tracking_config.object_name}")
+    logger.info(
+        "Rozpoczęcie ciągłego śledzenia obiektu: %s",
+        tracking_config.object_name,
+    )
     
     try:
-        tracker = get_astro_tracker()
-        controller = get_antenna_controller()
-        
         # Utwórz funkcję śledzenia dla określonego obiektu
         if tracking_config.object_type == AstronomicalObjectType.SUN:
             track_function = tracker.track_sun()
         elif tracking_config.object_type == AstronomicalObjectType.MOON:
             track_function = tracker.track_moon()
-        elif tracking_config.object_type in [
-            AstronomicalObjectType.MERCURY,
-            AstronomicalObjectType.VENUS,
-            AstronomicalObjectType.MARS,
-            AstronomicalObjectType.JUPITER,
-            AstronomicalObjectType.SATURN,
-            AstronomicalObjectType.URANUS,
-            AstronomicalObjectType.NEPTUNE
-        ]:
+        elif tracking_config.object_type in PLANET_TYPES:
             # Planety
             track_function = tracker.track_planet(tracking_config.object_type)
         elif tracking_config.object_type == AstronomicalObjectType.STAR:
@@ -222,33 +317,45 @@ async def continuous_tracking_task(tracking_config: TrackingConfigModel):
                 # Domyślnie traktuj jako gwiazdę
                 track_function = tracker.track_star(tracking_config.object_name)
         
-        while tracking_active:
+        while state.tracking_active:
             try:
                 # Pobierz aktualną pozycję obiektu
                 target_position = track_function()
                 
                 if target_position is None:
-                    logger.warning(f"Obiekt {tracking_config.object_name} jest poza zasięgiem")
+                    logger.warning(
+                        "Obiekt %s jest poza zasięgiem",
+                        tracking_config.object_name,
+                    )
                     break
                 
-                logger.info(f"Śledzenie {tracking_config.object_name}: Az={target_position.azimuth:.2f}°, El={target_position.elevation:.2f}°")
+                logger.info(
+                    "Śledzenie %s: Az=%.2f°, El=%.2f°",
+                    tracking_config.object_name,
+                    target_position.azimuth,
+                    target_position.elevation,
+                )
                 
                 # Po prostu przesuń antenę do nowej pozycji co określony czas
                 controller.move_to(target_position)
-                logger.info(f"Przesunięto antenę do pozycji: Az={target_position.azimuth:.2f}°, El={target_position.elevation:.2f}°")
+                logger.info(
+                    "Przesunięto antenę do pozycji: Az=%.2f°, El=%.2f°",
+                    target_position.azimuth,
+                    target_position.elevation,
+                )
                 
                 # Czekaj przez określony interwał
                 await asyncio.sleep(tracking_config.update_interval)
                 
             except Exception as e:
-                logger.error(f"Błąd podczas śledzenia: {e}")
+                logger.error("Błąd podczas śledzenia: %s", e)
                 await asyncio.sleep(5)  # Krótsza pauza przy błędzie
                 
     except Exception as e:
-        logger.error(f"Krytyczny błąd śledzenia: {e}")
+        logger.error("Krytyczny błąd śledzenia: %s", e)
     finally:
-        tracking_active = False
-        logger.info(f"Zakończono śledzenie obiektu: {tracking_config.object_name}")
+        state.tracking_active = False
+        logger.info("Zakończono śledzenie obiektu: %s", tracking_config.object_name)
 
 # Endpointy API
 
@@ -263,19 +370,23 @@ async def root():
     }
 
 @app.get("/web_interface.html")
-async def get_web_interface():
-    """Serwuj interfejs webowy"""
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    html_file = os.path.join(current_dir, "web_interface.html")
-    if os.path.exists(html_file):
-        return FileResponse(html_file)
-    else:
+async def get_web_interface(request: Request):
+    """Serwuj interfejs webowy (z pamięci, wczytany przy starcie)"""
+    web_html = getattr(request.app.state, "web_html", None)
+    if web_html is None:
         raise HTTPException(status_code=404, detail="Interfejs webowy nie został znaleziony")
+    return Response(
+        content=web_html,
+        media_type="text/html",
+        headers={"Cache-Control": "public, max-age=300"}
+    )
 
 @app.get("/status", response_model=StatusResponse, summary="Status systemu")
-async def get_status():
-    """Pobierz aktualny status systemu anteny"""
-    global antenna_controller, current_observer_location
+async def get_status(request: Request, response: Response):
+    """Pobierz aktualny status systemu anteny (z obsługą ETag/304)"""
+    state = request.app.state
+    antenna_controller = state.controller
+    current_observer_location = state.observer_location
 
     connected = (antenna_controller is not None and
                  hasattr(antenna_controller.motor_driver, 'connected') and
@@ -293,7 +404,7 @@ async def get_status():
             is_moving = antenna_controller.state == AntennaState.MOVING
         except Exception as e:
             last_error = str(e)
-            logger.error(f"Błąd pobierania statusu: {e}")
+            logger.error("Błąd pobierania statusu: %s", e)
 
     observer_loc = None
     if current_observer_location:
@@ -304,77 +415,96 @@ async def get_status():
             name=current_observer_location.name
         )
 
+    # Pozycja kwantyzowana do 0.01° - w spoczynku odpowiedź jest identyczna
+    etag_key = (
+        connected,
+        is_moving,
+        last_error,
+        state.current_port,
+        (round(current_position.azimuth, 2), round(current_position.elevation, 2))
+        if current_position else None,
+        (current_observer_location.latitude, current_observer_location.longitude,
+         current_observer_location.elevation, current_observer_location.name)
+        if current_observer_location else None,
+    )
+    not_modified = check_etag(request, response, etag_key)
+    if not_modified is not None:
+        return not_modified
+
     return StatusResponse(
         connected=connected,
         current_position=current_position,
         is_moving=is_moving,
         last_error=last_error,
         observer_location=observer_loc,
-        port=current_port
+        port=state.current_port
     )
 
 @app.post("/connect", summary="Połącz z anteną")
-async def connect_antenna(config: ConnectionConfigModel):
+async def connect_antenna(config: ConnectionConfigModel, request: Request):
     """Nawiąż połączenie z anteną"""
-    global antenna_controller, current_port
+    state = request.app.state
 
     try:
         if config.use_simulator:
             logger.info("Łączę z symulatorem...")
-            antenna_controller = AntennaControllerFactory.create_simulator_controller(
+            state.controller = AntennaControllerFactory.create_simulator_controller(
                 simulation_speed=2000.0,
                 motor_config=MotorConfig()
             )
-            current_port = "Symulator"
+            state.current_port = "Symulator"
         else:
             port = config.port
             if not port:
                 # Użyj domyślnego portu lub najlepszego dostępnego
                 logger.info("Szukam najlepszego portu SPID...")
                 port = get_best_spid_port()
-                logger.info(f"Wybrany port: {port}")
+                logger.info("Wybrany port: %s", port)
 
-            logger.info(f"Łączę z portem {port}...")
-            antenna_controller = AntennaControllerFactory.create_spid_controller(
+            logger.info("Łączę z portem %s...", port)
+            state.controller = AntennaControllerFactory.create_spid_controller(
                 port=port,
                 baudrate=config.baudrate,
                 motor_config=MotorConfig()
             )
-            current_port = port
+            state.current_port = port
 
         # Inicjalizuj kontroler
-        antenna_controller.initialize()
+        state.controller.initialize()
 
         logger.info("Połączenie nawiązane pomyślnie")
-        return {"status": "connected", "port": current_port, "simulator": config.use_simulator}
+        return {"status": "connected", "port": state.current_port, "simulator": config.use_simulator}
 
     except Exception as e:
-        logger.error(f"Błąd połączenia: {e}")
+        logger.error("Błąd połączenia: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd połączenia: {str(e)}")
 
 @app.post("/disconnect", summary="Rozłącz z anteną")
-async def disconnect_antenna():
+async def disconnect_antenna(request: Request):
     """Rozłącz z anteną"""
-    global antenna_controller, current_port
+    state = request.app.state
 
     try:
-        if antenna_controller:
-            antenna_controller.stop()
-            antenna_controller.shutdown()
-            antenna_controller = None
-            current_port = None
+        if state.controller:
+            state.controller.stop()
+            state.controller.shutdown()
+            state.controller = None
+            state.current_port = None
 
         logger.info("Rozłączono z anteną")
         return {"status": "disconnected"}
 
     except Exception as e:
-        logger.error(f"Błąd rozłączania: {e}")
+        logger.error("Błąd rozłączania: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd rozłączania: {str(e)}")
 
 @app.get("/position", response_model=PositionModel, summary="Aktualna pozycja")
-async def get_position():
-    """Pobierz aktualną pozycję anteny (skalibrowaną)"""
-    controller = get_antenna_controller()
+async def get_position(
+    request: Request,
+    response: Response,
+    controller: AntennaController = Depends(get_antenna_controller),
+):
+    """Pobierz aktualną pozycję anteny (skalibrowaną, z obsługą ETag/304)"""
 
     try:
         # Użyj get_current_position() z kalibracją zamiast raw current_position
@@ -382,16 +512,24 @@ async def get_position():
         if pos is None:
             raise HTTPException(status_code=404, detail="Nie można pobrać pozycji")
 
+        not_modified = check_etag(
+            request, response, (round(pos.azimuth, 2), round(pos.elevation, 2))
+        )
+        if not_modified is not None:
+            return not_modified
+
         return PositionModel(azimuth=pos.azimuth, elevation=pos.elevation)
 
     except Exception as e:
-        logger.error(f"Błąd pobierania pozycji: {e}")
+        logger.error("Błąd pobierania pozycji: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd pobierania pozycji: {str(e)}")
 
 @app.post("/position", summary="Ustaw pozycję")
-async def set_position(position: PositionModel):
+async def set_position(
+    position: PositionModel,
+    controller: AntennaController = Depends(get_antenna_controller),
+):
     """Ustaw nową pozycję anteny"""
-    controller = get_antenna_controller()
 
     try:
         target_pos = Position(position.azimuth, position.elevation)
@@ -400,13 +538,12 @@ async def set_position(position: PositionModel):
         return {"status": "moving", "target": position.model_dump()}
 
     except Exception as e:
-        logger.error(f"Błąd ustawiania pozycji: {e}")
+        logger.error("Błąd ustawiania pozycji: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd ustawiania pozycji: {str(e)}")
 
 @app.post("/stop", summary="Zatrzymaj antenę")
-async def stop_antenna():
+async def stop_antenna(controller: AntennaController = Depends(get_antenna_controller)):
     """Natychmiastowe zatrzymanie anteny"""
-    controller = get_antenna_controller()
 
     try:
         controller.stop()
@@ -414,36 +551,37 @@ async def stop_antenna():
         return {"status": "stopped"}
 
     except Exception as e:
-        logger.error(f"Błąd zatrzymywania: {e}")
+        logger.error("Błąd zatrzymywania: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd zatrzymywania: {str(e)}")
 
 @app.post("/observer", summary="Ustaw lokalizację obserwatora")
-async def set_observer_location(location: ObserverLocationModel):
+async def set_observer_location(location: ObserverLocationModel, request: Request):
     """Ustaw lokalizację obserwatora dla obliczeń astronomicznych"""
-    global astro_calculator, current_observer_location, astro_tracker
+    state = request.app.state
 
     try:
-        current_observer_location = ObserverLocation(
+        state.observer_location = ObserverLocation(
             latitude=location.latitude,
             longitude=location.longitude,
             elevation=location.elevation,
             name=location.name
         )
 
-        astro_calculator = AstronomicalCalculator(current_observer_location)
-        astro_tracker = AstronomicalTracker(astro_calculator)
+        state.astro_calculator = AstronomicalCalculator(state.observer_location)
+        state.astro_tracker = AstronomicalTracker(state.astro_calculator)
+        state.astro_position_cache.clear()
 
-        logger.info(f"Ustawiono lokalizację obserwatora: {location.name}")
+        logger.info("Ustawiono lokalizację obserwatora: %s", location.name)
         return {"status": "set", "location": location.model_dump()}
 
     except Exception as e:
-        logger.error(f"Błąd ustawiania lokalizacji: {e}")
+        logger.error("Błąd ustawiania lokalizacji: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd ustawiania lokalizacji: {str(e)}")
 
 @app.get("/observer", response_model=ObserverLocationModel, summary="Pobierz lokalizację obserwatora")
-async def get_observer_location():
+async def get_observer_location(request: Request):
     """Pobierz aktualną lokalizację obserwatora"""
-    global current_observer_location
+    current_observer_location = request.app.state.observer_location
 
     if current_observer_location is None:
         raise HTTPException(status_code=404, detail="Lokalizacja obserwatora nie jest ustawiona")
@@ -456,22 +594,20 @@ async def get_observer_location():
     )
 
 @app.post("/track/{object_name}", summary="Śledź obiekt astronomiczny")
-async def track_object(object_name: str, object_type: AstronomicalObjectType = AstronomicalObjectType.SUN):
+async def track_object(
+    object_name: str,
+    object_type: AstronomicalObjectType = AstronomicalObjectType.SUN,
+    controller: AntennaController = Depends(get_antenna_controller),
+    calculator: AstronomicalCalculator = Depends(get_astro_calculator),
+):
     """Rozpocznij śledzenie obiektu astronomicznego"""
-    controller = get_antenna_controller()
-    calculator = get_astro_calculator()
 
     try:
-        # Oblicz pozycję obiektu
-        if object_type == AstronomicalObjectType.SUN:
-            position = calculator.get_sun_position()
-        elif object_type == AstronomicalObjectType.MOON:
-            position = calculator.get_moon_position()
-        elif object_name.lower() in ["mercury", "venus", "mars", "jupiter", "saturn", "uranus", "neptune"]:
-            planet_type = AstronomicalObjectType(object_name.lower())
-            position = calculator.get_planet_position(planet_type)
+        # Oblicz pozycję obiektu (typ SUN/MOON ma pierwszeństwo przed nazwą)
+        if object_type in (AstronomicalObjectType.SUN, AstronomicalObjectType.MOON):
+            position = get_object_position(calculator, object_type.value)
         else:
-            position = calculator.get_star_position(object_name)
+            position = get_object_position(calculator, object_name)
 
         if position is None or not position.is_visible:
             raise HTTPException(status_code=404, detail=f"Obiekt {object_name} nie jest widoczny")
@@ -483,7 +619,7 @@ async def track_object(object_name: str, object_type: AstronomicalObjectType = A
         else:
             raise HTTPException(status_code=400, detail=f"Obiekt {object_name} jest poza zasięgiem anteny")
 
-        logger.info(f"Przesunięto antenę do obiektu: {object_name}")
+        logger.info("Przesunięto antenę do obiektu: %s", object_name)
         return {
             "status": "moved_to_object",
             "object": object_name,
@@ -492,26 +628,28 @@ async def track_object(object_name: str, object_type: AstronomicalObjectType = A
         }
 
     except Exception as e:
-        logger.error(f"Błąd pozycjonowania na obiekt: {e}")
+        logger.error("Błąd pozycjonowania na obiekt: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd pozycjonowania na obiekt: {str(e)}")
 
 @app.post("/start_tracking", summary="Rozpocznij ciągłe śledzenie obiektu")
-async def start_tracking(config: TrackingConfigModel):
+async def start_tracking(config: TrackingConfigModel, request: Request):
     """Rozpocznij ciągłe śledzenie obiektu astronomicznego"""
-    global tracking_active, tracking_task
+    state = request.app.state
     
-    if tracking_active:
+    if state.tracking_active:
         raise HTTPException(status_code=400, detail="Śledzenie już jest aktywne. Zatrzymaj je najpierw.")
     
     try:
         # Sprawdź dostępność wymaganych komponentów
-        get_antenna_controller()
-        get_astro_tracker()
+        controller = get_antenna_controller(request)
+        tracker = get_astro_tracker(request)
         
-        tracking_active = True
-        tracking_task = asyncio.create_task(continuous_tracking_task(config))
+        state.tracking_active = True
+        state.tracking_task = asyncio.create_task(
+            continuous_tracking_task(state, config, tracker, controller)
+        )
         
-        logger.info(f"Rozpoczęto ciągłe śledzenie obiektu: {config.object_name}")
+        logger.info("Rozpoczęto ciągłe śledzenie obiektu: %s", config.object_name)
         return {
             "status": "tracking_started",
             "object": config.object_name,
@@ -520,43 +658,44 @@ async def start_tracking(config: TrackingConfigModel):
         }
         
     except Exception as e:
-        tracking_active = False
-        logger.error(f"Błąd rozpoczęcia śledzenia: {e}")
+        state.tracking_active = False
+        logger.error("Błąd rozpoczęcia śledzenia: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd rozpoczęcia śledzenia: {str(e)}")
 
 @app.post("/stop_tracking", summary="Zatrzymaj śledzenie")
-async def stop_tracking():
+async def stop_tracking(request: Request):
     """Zatrzymaj śledzenie obiektu"""
-    global tracking_active, tracking_task
+    state = request.app.state
     
     try:
-        if tracking_active:
-            tracking_active = False
-            if tracking_task and not tracking_task.done():
-                tracking_task.cancel()
+        if state.tracking_active:
+            state.tracking_active = False
+            if state.tracking_task and not state.tracking_task.done():
+                state.tracking_task.cancel()
                 try:
-                    await tracking_task
+                    await state.tracking_task
                 except asyncio.CancelledError:
                     pass
-            tracking_task = None
+            state.tracking_task = None
             
         # Zatrzymaj też antenę
-        controller = get_antenna_controller()
+        controller = get_antenna_controller(request)
         controller.stop()
         
         logger.info("Zatrzymano śledzenie")
         return {"status": "tracking_stopped"}
 
     except Exception as e:
-        logger.error(f"Błąd zatrzymywania śledzenia: {e}")
+        logger.error("Błąd zatrzymywania śledzenia: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd zatrzymywania śledzenia: {str(e)}")
 
 @app.get("/tracking_status", summary="Status śledzenia")
-async def get_tracking_status():
+async def get_tracking_status(request: Request):
     """Pobierz aktualny status śledzenia"""
+    state = request.app.state
     return {
-        "tracking_active": tracking_active,
-        "task_running": tracking_task is not None and not tracking_task.done() if tracking_task else False
+        "tracking_active": state.tracking_active,
+        "task_running": state.tracking_task is not None and not state.tracking_task.done() if state.tracking_task else False
     }
 
 @app.get("/ports", summary="Lista dostępnych portów")
@@ -567,7 +706,7 @@ async def list_ports():
         return {"ports": [DEFAULT_SPID_PORT], "default_port": DEFAULT_SPID_PORT}
 
     except Exception as e:
-        logger.error(f"Błąd listowania portów: {e}")
+        logger.error("Błąd listowania portów: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd listowania portów: {str(e)}")
 
 @app.get("/diagnostic", summary="Diagnostyka połączenia")
@@ -593,35 +732,26 @@ async def diagnostic():
         }
 
     except Exception as e:
-        logger.error(f"Błąd diagnostyki: {e}")
+        logger.error("Błąd diagnostyki: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd diagnostyki: {str(e)}")
 
 @app.get("/astronomical/position/{object_name}", summary="Pozycja obiektu astronomicznego")
-async def get_astronomical_position(object_name: str):
-    """Pobierz aktualną pozycję obiektu astronomicznego"""
-    calculator = get_astro_calculator()
+async def get_astronomical_position(
+    object_name: str,
+    request: Request,
+    calculator: AstronomicalCalculator = Depends(get_astro_calculator),
+):
+    """Pobierz aktualną pozycję obiektu astronomicznego (z krótkotrwałym cache)"""
 
     try:
-        object_name_lower = object_name.lower()
-
-        # Mapowanie obiektów na właściwe typy
-        if object_name_lower == "sun":
-            position = calculator.get_sun_position()
-        elif object_name_lower == "moon":
-            position = calculator.get_moon_position()
-        elif object_name_lower in ["mercury", "venus", "mars", "jupiter", "saturn", "uranus", "neptune"]:
-            # Konwertuj nazwę na AstronomicalObjectType
-            planet_type = AstronomicalObjectType(object_name_lower)
-            position = calculator.get_planet_position(planet_type)
-        else:
-            # Dla gwiazd i innych obiektów
-            position = calculator.get_star_position(object_name)
+        # Słońce, Księżyc i planety z tablicy, pozostałe obiekty jako gwiazdy
+        position = get_cached_object_position(request.app.state, calculator, object_name)
 
         if position is None:
             raise HTTPException(status_code=404, detail=f"Nie można obliczyć pozycji dla obiektu: {object_name}")
 
         if not position.is_visible:
-            logger.warning(f"Obiekt {object_name} jest pod horyzontem")
+            logger.warning("Obiekt %s jest pod horyzontem", object_name)
 
         # Konwertuj do pozycji anteny (z właściwą konwersją elewacji)
         antenna_position = position.to_antenna_position()
@@ -642,16 +772,18 @@ async def get_astronomical_position(object_name: str):
         }
 
     except ValueError:
-        logger.error(f"Nieprawidłowy obiekt astronomiczny: {object_name}")
+        logger.error("Nieprawidłowy obiekt astronomiczny: %s", object_name)
         raise HTTPException(status_code=400, detail=f"Nieprawidłowy obiekt astronomiczny: {object_name}")
     except Exception as e:
-        logger.error(f"Błąd obliczania pozycji obiektu {object_name}: {e}")
+        logger.error("Błąd obliczania pozycji obiektu %s: %s", object_name, e)
         raise HTTPException(status_code=500, detail=f"Błąd obliczania pozycji: {str(e)}")
 
 @app.post("/calibrate_azimuth", summary="Kalibracja referencji azymutu")
-async def calibrate_azimuth_reference(calibration: AzimuthCalibrationModel):
+async def calibrate_azimuth_reference(
+    calibration: AzimuthCalibrationModel,
+    controller: AntennaController = Depends(get_antenna_controller),
+):
     """Kalibruje punkt referencyjny azymutu (ustala nowe 0°)"""
-    controller = get_antenna_controller()
 
     try:
         controller.calibrate_azimuth_reference(
@@ -659,7 +791,10 @@ async def calibrate_azimuth_reference(calibration: AzimuthCalibrationModel):
             save_to_file=calibration.save_to_file
         )
 
-        logger.info(f"Kalibracja azymutu wykonana. Offset: {controller.position_calibration.azimuth_offset:.2f}°")
+        logger.info(
+            "Kalibracja azymutu wykonana. Offset: %.2f°",
+            controller.position_calibration.azimuth_offset,
+        )
         return {
             "status": "calibrated",
             "azimuth_offset": controller.position_calibration.azimuth_offset,
@@ -667,13 +802,12 @@ async def calibrate_azimuth_reference(calibration: AzimuthCalibrationModel):
         }
 
     except Exception as e:
-        logger.error(f"Błąd kalibracji azymutu: {e}")
+        logger.error("Błąd kalibracji azymutu: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd kalibracji azymutu: {str(e)}")
 
 @app.get("/calibration", summary="Pobierz aktualną kalibrację")
-async def get_calibration():
+async def get_calibration(controller: AntennaController = Depends(get_antenna_controller)):
     """Pobierz aktualne parametry kalibracji"""
-    controller = get_antenna_controller()
 
     try:
         cal = controller.position_calibration
@@ -683,13 +817,15 @@ async def get_calibration():
         )
 
     except Exception as e:
-        logger.error(f"Błąd pobierania kalibracji: {e}")
+        logger.error("Błąd pobierania kalibracji: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd pobierania kalibracji: {str(e)}")
 
 @app.post("/calibration", summary="Ustaw kalibrację")
-async def set_calibration(calibration: CalibrationModel):
+async def set_calibration(
+    calibration: CalibrationModel,
+    controller: AntennaController = Depends(get_antenna_controller),
+):
     """Ustaw parametry kalibracji"""
-    controller = get_antenna_controller()
 
     try:
         new_cal = PositionCalibration(
@@ -703,13 +839,12 @@ async def set_calibration(calibration: CalibrationModel):
         return {"status": "set", "calibration": calibration.model_dump()}
 
     except Exception as e:
-        logger.error(f"Błąd ustawiania kalibracji: {e}")
+        logger.error("Błąd ustawiania kalibracji: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd ustawiania kalibracji: {str(e)}")
 
 @app.post("/reset_calibration", summary="Resetuj kalibrację")
-async def reset_calibration():
+async def reset_calibration(controller: AntennaController = Depends(get_antenna_controller)):
     """Resetuj kalibrację do wartości domyślnych"""
-    controller = get_antenna_controller()
 
     try:
         controller.reset_calibration(save_to_file=True)
@@ -717,13 +852,15 @@ async def reset_calibration():
         return {"status": "reset", "message": "Kalibracja zresetowana do wartości domyślnych"}
 
     except Exception as e:
-        logger.error(f"Błąd resetowania kalibracji: {e}")
+        logger.error("Błąd resetowania kalibracji: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd resetowania kalibracji: {str(e)}")
 
 @app.post("/move_axis", summary="Ruch w osi")
-async def move_axis(move: AxisMoveModel):
+async def move_axis(
+    move: AxisMoveModel,
+    controller: AntennaController = Depends(get_antenna_controller),
+):
     """Porusz anteną w określonej osi o zadaną wartość"""
-    controller = get_antenna_controller()
 
     try:
         # Użyj skalibrowanej pozycji do obliczeń
@@ -748,7 +885,7 @@ async def move_axis(move: AxisMoveModel):
 
         controller.move_to(new_position)
 
-        logger.info(f"Ruch w osi {move.axis}: {move.direction} o {move.amount}°")
+        logger.info("Ruch w osi %s: %s o %s°", move.axis, move.direction, move.amount)
         return {
             "status": "moving",
             "axis": move.axis,
@@ -758,14 +895,14 @@ async def move_axis(move: AxisMoveModel):
         }
 
     except Exception as e:
-        logger.error(f"Błąd ruchu w osi: {e}")
+        logger.error("Błąd ruchu w osi: %s", e)
         raise HTTPException(status_code=500, detail=f"Błąd ruchu w osi: {str(e)}")
 
 # Obsługa błędów
 @app.exception_handler(AntennaError)
 async def antenna_error_handler(_request, exc: AntennaError):
     """Handle antenna errors"""
-    logger.error(f"Błąd anteny: {exc}")
+    logger.error("Błąd anteny: %s", exc)
     return JSONResponse(
         status_code=500,
         content={"detail": f"Błąd anteny: {str(exc)}"}
@@ -776,7 +913,7 @@ async def general_exception_handler(_request, exc: Exception):
     """Handle general exceptions"""
     import traceback
     tb_str = traceback.format_exc()
-    logger.error(f"Nieoczekiwany błąd: {exc}\n{tb_str}")
+    logger.error("Nieoczekiwany błąd: %s\n%s", exc, tb_str)
     return JSONResponse(
         status_code=500,
         content={"detail": f"Błąd serwera: {str(exc)}"}
@@ -784,4 +921,5 @@ async def general_exception_handler(_request, exc: Exception):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from start_server import LOOP_IMPL, HTTP_IMPL
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=LOOP_IMPL, http=HTTP_IMPL)
@@ -2,6 +2,7 @@
 Skrypt uruchamiający serwer API radioteleskopa
 """
 
+import importlib.util
 import uvicorn
 import sys
 import os
@@ -9,6 +10,10 @@ import os
 # Dodaj główny folder do ścieżki
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Szybsza pętla zdarzeń i parser HTTP (uvloop nie jest dostępny na Windows)
+LOOP_IMPL = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+HTTP_IMPL = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
 def main():
     """Uruchom serwer API"""
     print("Uruchamianie serwera API radioteleskopu...")
@@ -22,6 +27,8 @@ def main():
         host="0.0.0.0",
         port=8000,
         reload=True,
+        loop=LOOP_IMPL,
+        http=HTTP_IMPL,
         log_level="info"
     )
 
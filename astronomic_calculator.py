@@ -14,14 +14,40 @@ Autor: Aleks Czarnecki
 """
 
 import math
+import threading
 import ephem
 from datetime import datetime, timezone
-from typing import Optional, Dict, Tuple
+from functools import lru_cache
+from typing import Optional, Dict, Iterable, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:  # Opcjonalna kompilacja JIT jądra wzoru zamkniętego (pip install numba)
+    from numba import njit
+except ImportError:
+    njit = None
+
 # Import z głównego modułu
-from antenna_controller import Position
+from antenna_controller import AntennaLimits, Position
+
+# Rozdzielczość czasu dla cache pozycji (mikrosekundy) i jego rozmiar
+POSITION_CACHE_RESOLUTION_US = 100_000
+POSITION_CACHE_SIZE = 4096
+RISE_SET_CACHE_SIZE = 512
+
+# Dokładność obliczeń (stopnie), od której gwiazdy i współrzędne custom
+# są liczone wzorem zamkniętym zamiast pełnego compute() PyEphem
+DEFAULT_PRECISION = 0.1
+FAST_FIXED_BODY_MIN_PRECISION = 0.05
+
+JD_J2000 = 2451545.0
+# Epoka dat PyEphem (Dublin Julian Day 0) i jej dzień juliański
+DJD_EPOCH = datetime(1899, 12, 31, 12, tzinfo=timezone.utc)
+JD_DJD_EPOCH = 2415020.0
+ARCSEC_TO_RAD = math.pi / (180.0 * 3600.0)
+# Ruch własny w katalogu PyEphem jest w milisekundach łuku na rok juliański
+MAS_TO_RAD = ARCSEC_TO_RAD / 1000.0
+JULIAN_YEAR_DAYS = 365.25
 
 
 class AstronomicalObjectType(Enum):
@@ -40,7 +66,29 @@ class AstronomicalObjectType(Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+# Planety obsługiwane przez get_planet_position/get_planet_track
+PLANETS = frozenset(
+    {
+        AstronomicalObjectType.MERCURY,
+        AstronomicalObjectType.VENUS,
+        AstronomicalObjectType.MARS,
+        AstronomicalObjectType.JUPITER,
+        AstronomicalObjectType.SATURN,
+        AstronomicalObjectType.URANUS,
+        AstronomicalObjectType.NEPTUNE,
+    }
+)
+
+# Indeks typu obiektu w tablicy obiektów kalkulatora
+_ENUM_IDX = {
+    object_type: index for index, object_type in enumerate(AstronomicalObjectType)
+}
+
+# Typy obiektów, dla których PyEphem podaje odległość od Ziemi
+_HAS_DISTANCE = PLANETS | {AstronomicalObjectType.SUN, AstronomicalObjectType.MOON}
+
+
+@dataclass(slots=True)
 class ObserverLocation:
     """Lokalizacja obserwatora"""
 
@@ -57,7 +105,7 @@ class ObserverLocation:
             raise ValueError("Długość geograficzna musi być w zakresie -180° do +180°")
 
 
-@dataclass
+@dataclass(slots=True)
 class AstronomicalPosition:
     """Pozycja astronomiczna obiektu w konwencji rotctl dla SPID"""
 
@@ -83,38 +131,218 @@ class AstronomicalPosition:
         return Position(azimuth=rotctl_azimuth, elevation=rotctl_elevation)
 
 
+def to_antenna_positions(
+    positions: Iterable[AstronomicalPosition],
+    limits: Optional[AntennaLimits] = None,
+) -> List[Optional[Position]]:
+    """
+    Konwertuje serię pozycji astronomicznych do pozycji anteny (to_antenna_position).
+
+    Zwraca None dla pozycji pod horyzontem oraz (jeśli podano limits) dla
+    elewacji anteny poza zakresem min_elevation-max_elevation.
+    """
+    if limits is None:
+        return [position.to_antenna_position() for position in positions]
+
+    min_el, max_el = limits.min_elevation, limits.max_elevation
+    antenna_positions = []
+    for position in positions:
+        antenna_position = position.to_antenna_position()
+        if antenna_position is not None and not (
+            min_el <= antenna_position.elevation <= max_el
+        ):
+            antenna_position = None
+        antenna_positions.append(antenna_position)
+    return antenna_positions
+
+
+@lru_cache(maxsize=256)
+def _lookup_star(star_name: str):
+    """Wyszukuje gwiazdę w katalogu PyEphem (wspólny cache dla wszystkich obserwatorów)"""
+    star = ephem.star(star_name)
+    # Jednorazowe compute() udostępnia jasność gwiazdy dla wzoru zamkniętego
+    star.compute()
+    return star
+
+
+def _djd(observation_time: datetime) -> float:
+    """Dublin Julian Day (skala ephem.Date); czas bez strefy traktowany jako UTC"""
+    if observation_time.tzinfo is None:
+        observation_time = observation_time.replace(tzinfo=timezone.utc)
+    return (observation_time - DJD_EPOCH).total_seconds() / 86400.0
+
+
+def _julian_day(observation_time: datetime) -> float:
+    """Dzień juliański (UTC) dla podanego czasu"""
+    return _djd(observation_time) + JD_DJD_EPOCH
+
+
+def _altaz_from_radec_fast(
+    ra_rad: float,
+    dec_rad: float,
+    jd: float,
+    sin_lat: float,
+    cos_lat: float,
+    lon_rad: float,
+) -> Tuple[float, float, float, float]:
+    """
+    Wzór zamknięty: współrzędne równikowe J2000 -> horyzontalne
+
+    Uwzględnia precesję (IAU 1976) i refrakcję (wzór Bennetta dla 1013.25 hPa
+    i 15°C), pomija nutację i aberrację roczną (razem do ~0.01°). Ruch własny
+    nie jest tu liczony - ra/dec muszą być już przeniesione na datę obserwacji
+    (robi to AstronomicalCalculator._fast_raw).
+    Zwraca (az, alt, ra, dec) w radianach, ra/dec na epokę daty.
+    """
+    # Precesja J2000 -> data obserwacji
+    days = jd - JD_J2000
+    t = days / 36525.0
+    zeta = (2306.2181 + (0.30188 + 0.017998 * t) * t) * t * ARCSEC_TO_RAD
+    z = (2306.2181 + (1.09468 + 0.018203 * t) * t) * t * ARCSEC_TO_RAD
+    theta = (2004.3109 - (0.42665 + 0.041833 * t) * t) * t * ARCSEC_TO_RAD
+
+    cos_dec0 = math.cos(dec_rad)
+    sin_dec0 = math.sin(dec_rad)
+    sin_theta = math.sin(theta)
+    cos_theta = math.cos(theta)
+    ra_zeta = ra_rad + zeta
+    cos_dec0_cos_ra = cos_dec0 * math.cos(ra_zeta)
+    a = cos_dec0 * math.sin(ra_zeta)
+    b = cos_theta * cos_dec0_cos_ra - sin_theta * sin_dec0
+    c = sin_theta * cos_dec0_cos_ra + cos_theta * sin_dec0
+    ra = (math.atan2(a, b) + z) % (2.0 * math.pi)
+    dec = math.asin(c)
+
+    # Lokalny czas gwiazdowy (GMST + długość geograficzna)
+    gmst_deg = (
+        280.46061837
+        + 360.98564736629 * days
+        + (0.000387933 - t / 38710000.0) * t * t
+    )
+    hour_angle = math.radians(gmst_deg) + lon_rad - ra
+
+    sin_dec = math.sin(dec)
+    cos_dec = math.cos(dec)
+    cos_h = math.cos(hour_angle)
+    alt = math.asin(sin_lat * sin_dec + cos_lat * cos_dec * cos_h)
+    az = (
+        math.pi
+        + math.atan2(
+            math.sin(hour_angle), cos_h * sin_lat - (sin_dec / cos_dec) * cos_lat
+        )
+    ) % (2.0 * math.pi)
+
+    # Refrakcja atmosferyczna (w minutach łuku)
+    alt_deg = math.degrees(alt)
+    if alt_deg > -1.0:
+        refraction = 1.02 / math.tan(math.radians(alt_deg + 10.3 / (alt_deg + 5.11)))
+        alt += math.radians(refraction / 60.0) * (1013.25 / 1010.0) * (283.0 / 288.15)
+
+    return az, alt, ra, dec
+
+
+if njit is not None:
+    # Czysto skalarna matematyka - numba kompiluje ją bez zmian w kodzie
+    _altaz_from_radec_fast = njit(cache=True)(_altaz_from_radec_fast)
+
+
+def _build_prototype_objects() -> Tuple[Optional[ephem.Body], ...]:
+    """Buduje wzorcowe obiekty Układu Słonecznego w kolejności _ENUM_IDX"""
+    # pylint: disable=no-member  # ephem objects exist at runtime
+    objects = {
+        AstronomicalObjectType.SUN: ephem.Sun(),
+        AstronomicalObjectType.MOON: ephem.Moon(),
+        AstronomicalObjectType.MERCURY: ephem.Mercury(),
+        AstronomicalObjectType.VENUS: ephem.Venus(),
+        AstronomicalObjectType.MARS: ephem.Mars(),
+        AstronomicalObjectType.JUPITER: ephem.Jupiter(),
+        AstronomicalObjectType.SATURN: ephem.Saturn(),
+        AstronomicalObjectType.URANUS: ephem.Uranus(),
+        AstronomicalObjectType.NEPTUNE: ephem.Neptune(),
+    }
+    # None dla STAR/CUSTOM
+    return tuple(objects.get(t) for t in AstronomicalObjectType)
+
+
+# Obiekty wzorcowe budowane raz na moduł - kalkulatory dostają ich kopie
+_PROTOTYPE_OBJECTS = _build_prototype_objects()
+
+
+def _create_solar_system_objects() -> List[Optional[ephem.Body]]:
+    """Kopie obiektów wzorcowych (compute() zmienia stan obiektu)"""
+    return [None if body is None else body.copy() for body in _PROTOTYPE_OBJECTS]
+
+
 class AstronomicalCalculator:
     """Kalkulator pozycji astronomicznych"""
 
-    def __init__(self, observer_location: ObserverLocation):
-        self.observer_location = observer_location
-        self.observer = ephem.Observer()
+    def __init__(
+        self,
+        observer_location: ObserverLocation,
+        precision: float = DEFAULT_PRECISION,
+    ):
+        self._observer_location = observer_location
+        self.precision = precision  # Wymagana dokładność w stopniach
+        # Obserwator i obiekty PyEphem są osobne dla każdego wątku,
+        # bo compute() zmienia ich stan
+        self._tls = threading.local()
+
+        # Cache surowych wyników obliczeń, czyszczony przy zmianie obserwatora
+        self._compute_raw = lru_cache(maxsize=POSITION_CACHE_SIZE)(
+            self._compute_raw_position
+        )
+        self._rise_set_cached = lru_cache(maxsize=RISE_SET_CACHE_SIZE)(
+            self._compute_rise_set
+        )
         self._setup_observer()
 
-        # Słownik obiektów astronomicznych
-        # pylint: disable=no-member  # ephem objects exist at runtime
-        self._objects = {
-            AstronomicalObjectType.SUN: ephem.Sun(),
-            AstronomicalObjectType.MOON: ephem.Moon(),
-            AstronomicalObjectType.MERCURY: ephem.Mercury(),
-            AstronomicalObjectType.VENUS: ephem.Venus(),
-            AstronomicalObjectType.MARS: ephem.Mars(),
-            AstronomicalObjectType.JUPITER: ephem.Jupiter(),
-            AstronomicalObjectType.SATURN: ephem.Saturn(),
-            AstronomicalObjectType.URANUS: ephem.Uranus(),
-            AstronomicalObjectType.NEPTUNE: ephem.Neptune(),
-        }
-
-        # Cache dla gwiazd
-        self._star_cache: Dict[str, object] = {}
+    @property
+    def observer_location(self) -> ObserverLocation:
+        """Lokalizacja obserwatora"""
+        return self._observer_location
+
+    @observer_location.setter
+    def observer_location(self, location: ObserverLocation):
+        """Zmiana lokalizacji przelicza stałe obserwatora i czyści cache"""
+        self._observer_location = location
+        self._setup_observer()
 
     def _setup_observer(self):
         """Konfiguruje obserwatora"""
-        self.observer.lat = math.radians(self.observer_location.latitude)
-        self.observer.lon = math.radians(self.observer_location.longitude)
-        self.observer.elev = self.observer_location.elevation
-        self.observer.pressure = 1013.25  # Ciśnienie atmosferyczne w hPa
-        self.observer.temp = 15.0  # Temperatura w °C
+        lat_rad = math.radians(self.observer_location.latitude)
+
+        # Wartości dla wzoru zamkniętego, liczone raz na obserwatora
+        self._sin_lat = math.sin(lat_rad)
+        self._cos_lat = math.cos(lat_rad)
+        self._lon_rad = math.radians(self.observer_location.longitude)
+
+        # Wątki zbudują obserwatora od nowa dla nowej lokalizacji
+        self._tls = threading.local()
+        self._compute_raw.cache_clear()
+        self._rise_set_cached.cache_clear()
+
+    @property
+    def observer(self) -> ephem.Observer:
+        """Obserwator PyEphem bieżącego wątku"""
+        return self._thread_state().observer
+
+    def _thread_state(self) -> threading.local:
+        """Zwraca (tworząc przy pierwszym użyciu) obserwatora i obiekty bieżącego wątku"""
+        state = self._tls
+        if "observer" not in state.__dict__:
+            state.observer = self._create_observer()
+            state.objects_arr = _create_solar_system_objects()
+        return state
+
+    def _create_observer(self) -> ephem.Observer:
+        """Tworzy obserwatora PyEphem dla aktualnej lokalizacji"""
+        observer = ephem.Observer()
+        observer.lat = math.radians(self.observer_location.latitude)
+        observer.lon = self._lon_rad
+        observer.elev = self.observer_location.elevation
+        observer.pressure = 1013.25  # Ciśnienie atmosferyczne w hPa
+        observer.temp = 15.0  # Temperatura w °C
+        return observer
 
     def get_position(
         self,
@@ -124,57 +352,100 @@ class AstronomicalCalculator:
         observation_time: Optional[datetime] = None,
     ) -> AstronomicalPosition:
         """Oblicza pozycję obiektu astronomicznego"""
+        return self._position_from_raw(
+            self._cached_raw(
+                object_type, object_name, star_coordinates, observation_time
+            )
+        )
+
+    def get_altitude_only(
+        self,
+        object_type: AstronomicalObjectType,
+        object_name: Optional[str] = None,
+        star_coordinates: Optional[Tuple[float, float]] = None,
+        observation_time: Optional[datetime] = None,
+    ) -> float:
+        """Zwraca tylko elewację obiektu w stopniach (bez budowania AstronomicalPosition)"""
+        raw = self._cached_raw(
+            object_type, object_name, star_coordinates, observation_time
+        )
+        return math.degrees(raw[1])
+
+    def _cached_raw(
+        self,
+        object_type: AstronomicalObjectType,
+        object_name: Optional[str],
+        star_coordinates: Optional[Tuple[float, float]],
+        observation_time: Optional[datetime],
+    ) -> Tuple[float, float, float, float, float, float]:
+        """Surowa pozycja z cache dla czasu zaokrąglonego do 100 ms"""
         if observation_time is None:
             observation_time = datetime.now(timezone.utc)
 
-        # Ustawienie czasu obserwacji
-        self.observer.date = observation_time.strftime("%Y/%m/%d %H:%M:%S")
+        # Zaokrąglenie czasu - kolejne zapytania w tym samym przedziale
+        # korzystają z cache zamiast ponownego obliczenia PyEphem
+        rounded_time = observation_time.replace(
+            microsecond=observation_time.microsecond
+            // POSITION_CACHE_RESOLUTION_US
+            * POSITION_CACHE_RESOLUTION_US
+        )
+        if star_coordinates is not None:
+            star_coordinates = tuple(star_coordinates)
 
-        # Wybór obiektu
-        if object_type == AstronomicalObjectType.STAR:
-            if object_name:
-                astronomical_object = self._get_star_by_name(object_name)
-            elif star_coordinates:
-                astronomical_object = self._create_star_from_coordinates(
-                    star_coordinates[0], star_coordinates[1]
-                )
-            else:
-                raise ValueError("Dla gwiazd wymagana jest nazwa lub współrzędne")
+        return self._compute_raw(
+            object_type, object_name, star_coordinates, rounded_time
+        )
 
-        elif object_type == AstronomicalObjectType.CUSTOM:
-            if not star_coordinates:
-                raise ValueError("Dla obiektu custom wymagane są współrzędne")
-            astronomical_object = self._create_star_from_coordinates(
-                star_coordinates[0], star_coordinates[1]
-            )
+    def get_positions_batch(
+        self,
+        object_type: AstronomicalObjectType,
+        observation_times: Iterable[datetime],
+        object_name: Optional[str] = None,
+        star_coordinates: Optional[Tuple[float, float]] = None,
+    ) -> List[AstronomicalPosition]:
+        """Oblicza pozycje obiektu dla serii czasów (np. predykcja trajektorii)
 
-        else:
-            if object_type not in self._objects:
-                raise ValueError(f"Nieobsługiwany typ obiektu: {object_type}")
-            astronomical_object = self._objects[object_type]
+        Obiekt jest wybierany raz dla całej serii, a w pętli zmienia się
+        tylko data obserwatora - bez narzutu cache i walidacji na próbkę.
+        """
+        astronomical_object = self._resolve_object(
+            object_type, object_name, star_coordinates
+        )
+
+        if self._uses_fast_path(object_type):
+            return [
+                self._position_from_raw(
+                    self._fast_raw(astronomical_object, object_name, observation_time)
+                )
+                for observation_time in observation_times
+            ]
+
+        observer = self.observer
+        positions = []
+        for observation_time in observation_times:
+            observer.date = _djd(observation_time)
+            astronomical_object.compute(observer)
+            positions.append(
+                self._position_from_raw(
+                    self._raw_from_object(astronomical_object, object_type)
+                )
+            )
+        return positions
 
-        # Obliczenie pozycji
-        astronomical_object.compute(self.observer)
+    @staticmethod
+    def _position_from_raw(
+        raw: Tuple[float, float, float, float, float, float]
+    ) -> AstronomicalPosition:
+        """Buduje AstronomicalPosition z surowej krotki (az, alt, odległość, ra, dec, jasność)"""
+        az_rad, alt_rad, distance, ra_rad, dec_rad, magnitude = raw
 
         # Konwersja do stopni - PyEphem zwraca azymut w konwencji astronomicznej
         # (0° = północ, 90° = wschód) co jest zgodne z rotctl
         # Elewacja z PyEphem: 0° = horyzont, 90° = zenit (standardowa)
-        azimuth = math.degrees(astronomical_object.az)
-        elevation = math.degrees(astronomical_object.alt)
-
-        # Dodatkowe informacje
-        distance = (
-            astronomical_object.earth_distance
-            if hasattr(astronomical_object, "earth_distance")
-            else 0.0
-        )
-        ra = math.degrees(astronomical_object.ra) / 15.0  # Konwersja do godzin
-        dec = math.degrees(astronomical_object.dec)
-
-        # Jasność pozorna (jeśli dostępna)
-        magnitude = (
-            astronomical_object.mag if hasattr(astronomical_object, "mag") else 0.0
-        )
+        azimuth = math.degrees(az_rad)
+        elevation = math.degrees(alt_rad)
+        ra = math.degrees(ra_rad) / 15.0  # Konwersja do godzin
+        dec = math.degrees(dec_rad)
 
         return AstronomicalPosition(
             azimuth=azimuth,
@@ -186,16 +457,128 @@ class AstronomicalCalculator:
             magnitude=magnitude,
         )
 
-    def _get_star_by_name(self, star_name: str) -> object:
-        """Pobiera gwiazdę po nazwie z cache lub tworzy nową"""
-        if star_name in self._star_cache:
-            return self._star_cache[star_name]
+    def _compute_raw_position(
+        self,
+        object_type: AstronomicalObjectType,
+        object_name: Optional[str],
+        star_coordinates: Optional[Tuple[float, float]],
+        observation_time: datetime,
+    ) -> Tuple[float, float, float, float, float, float]:
+        """Oblicza surową pozycję obiektu (az, alt, odległość, ra, dec, jasność) w radianach"""
+        astronomical_object = self._resolve_object(
+            object_type, object_name, star_coordinates
+        )
+
+        if self._uses_fast_path(object_type):
+            return self._fast_raw(astronomical_object, object_name, observation_time)
+
+        # Ustawienie czasu obserwacji i obliczenie pozycji
+        observer = self.observer
+        observer.date = _djd(observation_time)
+        astronomical_object.compute(observer)
 
-        # Próba znalezienia gwiazdy w katalogu
+        return self._raw_from_object(astronomical_object, object_type)
+
+    def _uses_fast_path(self, object_type: AstronomicalObjectType) -> bool:
+        """Czy obiekt liczyć wzorem zamkniętym (gwiazdy i współrzędne custom)"""
+        return (
+            object_type in (AstronomicalObjectType.STAR, AstronomicalObjectType.CUSTOM)
+            and self.precision >= FAST_FIXED_BODY_MIN_PRECISION
+        )
+
+    def _fast_raw(
+        self,
+        astronomical_object,
+        object_name: Optional[str],
+        observation_time: datetime,
+    ) -> Tuple[float, float, float, float, float, float]:
+        """Surowa pozycja obiektu stałego ze wzoru zamkniętego"""
+        jd = _julian_day(observation_time)
+        ra = float(astronomical_object._ra)
+        dec = float(astronomical_object._dec)
+        # Ruch własny od epoki katalogu J2000 (np. Arcturus ~2"/rok, 0.015° na 25 lat);
+        # _pmra to ruch w rektascensji pomnożony przez cos(dec)
+        pm_ra = astronomical_object._pmra
+        pm_dec = astronomical_object._pmdec
+        if pm_ra or pm_dec:
+            years = (jd - JD_J2000) / JULIAN_YEAR_DAYS
+            ra += pm_ra * MAS_TO_RAD * years / math.cos(dec)
+            dec += pm_dec * MAS_TO_RAD * years
+
+        az, alt, ra, dec = _altaz_from_radec_fast(
+            ra,
+            dec,
+            jd,
+            self._sin_lat,
+            self._cos_lat,
+            self._lon_rad,
+        )
+        magnitude = astronomical_object.mag if object_name else 0.0
+        return (az, alt, 0.0, ra, dec, magnitude)
+
+    def _resolve_object(
+        self,
+        object_type: AstronomicalObjectType,
+        object_name: Optional[str],
+        star_coordinates: Optional[Tuple[float, float]],
+    ) -> object:
+        """Wybiera obiekt PyEphem dla podanego typu"""
+        if object_type == AstronomicalObjectType.STAR:
+            if object_name:
+                return self._get_star_by_name(object_name)
+            if star_coordinates:
+                return self._create_star_from_coordinates(
+                    star_coordinates[0], star_coordinates[1]
+                )
+            raise ValueError("Dla gwiazd wymagana jest nazwa lub współrzędne")
+
+        if object_type == AstronomicalObjectType.CUSTOM:
+            if not star_coordinates:
+                raise ValueError("Dla obiektu custom wymagane są współrzędne")
+            return self._create_star_from_coordinates(
+                star_coordinates[0], star_coordinates[1]
+            )
+
+        return self._get_solar_system_object(object_type)
+
+    def _get_solar_system_object(self, object_type: AstronomicalObjectType) -> object:
+        """Zwraca obiekt Układu Słonecznego z tablicy dyspozycji"""
+        index = _ENUM_IDX.get(object_type)
+        astronomical_object = (
+            None if index is None else self._thread_state().objects_arr[index]
+        )
+        if astronomical_object is None:
+            raise ValueError(f"Nieobsługiwany typ obiektu: {object_type}")
+        return astronomical_object
+
+    @staticmethod
+    def _raw_from_object(
+        astronomical_object,
+        object_type: AstronomicalObjectType,
+    ) -> Tuple[float, float, float, float, float, float]:
+        """Odczytuje surową pozycję z obiektu PyEphem po compute()"""
+        # Odległość tylko dla ciał Układu Słonecznego (FixedBody jej nie ma)
+        distance = (
+            astronomical_object.earth_distance
+            if object_type in _HAS_DISTANCE
+            else 0.0
+        )
+
+        return (
+            float(astronomical_object.az),
+            float(astronomical_object.alt),
+            distance,
+            float(astronomical_object.ra),
+            float(astronomical_object.dec),
+            astronomical_object.mag,  # Jasność pozorna - każde ciało po compute()
+        )
+
+    @staticmethod
+    def _get_star_by_name(star_name: str) -> object:
+        """Pobiera gwiazdę po nazwie ze wspólnego cache katalogu"""
         try:
-            star = ephem.star(star_name)
-            self._star_cache[star_name] = star
-            return star
+            # compute() zmienia stan obiektu - każde wywołanie dostaje własną kopię
+            return _lookup_star(star_name).copy()
         except Exception:
             raise ValueError(f"Nie znaleziono gwiazdy: {star_name}")
 
@@ -216,6 +599,14 @@ class AstronomicalCalculator:
             AstronomicalObjectType.SUN, observation_time=observation_time
         )
 
+    def get_sun_positions_batch(
+        self, observation_times: Iterable[datetime]
+    ) -> List[AstronomicalPosition]:
+        """Pozycje Słońca dla serii czasów (np. predykcja ścieżki)"""
+        return self.get_positions_batch(
+            AstronomicalObjectType.SUN, observation_times
+        )
+
     def get_moon_position(
         self, observation_time: Optional[datetime] = None
     ) -> AstronomicalPosition:
@@ -230,19 +621,22 @@ class AstronomicalCalculator:
         observation_time: Optional[datetime] = None,
     ) -> AstronomicalPosition:
         """Skrócona metoda dla pozycji planet"""
-        if planet not in [
-            AstronomicalObjectType.MERCURY,
-            AstronomicalObjectType.VENUS,
-            AstronomicalObjectType.MARS,
-            AstronomicalObjectType.JUPITER,
-            AstronomicalObjectType.SATURN,
-            AstronomicalObjectType.URANUS,
-            AstronomicalObjectType.NEPTUNE,
-        ]:
+        if planet not in PLANETS:
             raise ValueError(f"Nieprawidłowy typ planety: {planet}")
 
         return self.get_position(planet, observation_time=observation_time)
 
+    def get_planet_track(
+        self,
+        planet: AstronomicalObjectType,
+        observation_times: Iterable[datetime],
+    ) -> List[AstronomicalPosition]:
+        """Trajektoria planety dla serii czasów (np. 24 h co minutę)"""
+        if planet not in PLANETS:
+            raise ValueError(f"Nieprawidłowy typ planety: {planet}")
+
+        return self.get_positions_batch(planet, observation_times)
+
     def get_star_position(
         self, star_name: str, observation_time: Optional[datetime] = None
     ) -> AstronomicalPosition:
@@ -276,8 +670,29 @@ class AstronomicalCalculator:
         """Oblicza czasy wschodu i zachodu obiektu"""
         if date is None:
             date = datetime.now(timezone.utc)
+        if star_coordinates is not None:
+            star_coordinates = tuple(star_coordinates)
+
+        # Wyniki zależą tylko od dnia - cache z kluczem dziennym
+        rise_time, set_time, transit_time = self._rise_set_cached(
+            object_type, object_name, star_coordinates, date.toordinal()
+        )
+        return {"rise": rise_time, "set": set_time, "transit": transit_time}
 
-        self.observer.date = date.strftime("%Y/%m/%d")
+    def _compute_rise_set(
+        self,
+        object_type: AstronomicalObjectType,
+        object_name: Optional[str],
+        star_coordinates: Optional[Tuple[float, float]],
+        day_ordinal: int,
+    ) -> Tuple[Optional[datetime], Optional[datetime], Optional[datetime]]:
+        """Oblicza (wschód, zachód, górowanie) dla dnia o podanym numerze porządkowym
+
+        PyEphem wyznacza każde zdarzenie iteracyjnie z kąta godzinnego (kilka
+        obliczeń pozycji, ~50 µs dla Słońca), a nie przeszukiwaniem doby.
+        """
+        observer = self.observer
+        observer.date = _djd(datetime.fromordinal(day_ordinal))
 
         # Wybór obiektu
         if object_type == AstronomicalObjectType.STAR:
@@ -290,20 +705,20 @@ class AstronomicalCalculator:
             else:
                 raise ValueError("Dla gwiazd wymagana jest nazwa lub współrzędne")
         else:
-            astronomical_object = self._objects[object_type]
+            astronomical_object = self._get_solar_system_object(object_type)
 
         try:
-            rise_time = self.observer.next_rising(astronomical_object)
-            set_time = self.observer.next_setting(astronomical_object)
-            transit_time = self.observer.next_transit(astronomical_object)
-
-            return {
-                "rise": ephem.localtime(rise_time),
-                "set": ephem.localtime(set_time),
-                "transit": ephem.localtime(transit_time),
-            }
+            rise_time = observer.next_rising(astronomical_object)
+            set_time = observer.next_setting(astronomical_object)
+            transit_time = observer.next_transit(astronomical_object)
+
+            return (
+                ephem.localtime(rise_time),
+                ephem.localtime(set_time),
+                ephem.localtime(transit_time),
+            )
         except Exception:
-            return {"rise": None, "set": None, "transit": None}
+            return (None, None, None)
 
     def is_object_visible(
         self,
@@ -341,15 +756,22 @@ class AstronomicalTracker:
 
         def get_position() -> Optional[Position]:
             try:
-                # Pobierz aktualną pozycję astronomiczną
+                now = datetime.now(timezone.utc)
+
+                # Obiekt pod horyzontem - bez budowania pozycji
+                if (
+                    self.calculator.get_altitude_only(
+                        object_type, object_name, star_coordinates, now
+                    )
+                    <= 0
+                ):
+                    return None
+
+                # Pełna pozycja - surowe dane są już w cache
                 ast_position = self.calculator.get_position(
-                    object_type, object_name, star_coordinates
+                    object_type, object_name, star_coordinates, now
                 )
 
-                # Sprawdź widoczność
-                if not ast_position.is_visible:
-                    return None
-
                 # Konwertuj na pozycję anteny
                 antenna_position = ast_position.to_antenna_position()
                 return antenna_position
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 """
-Emergency Stop dla rotatorów SPID za pomocą rotctl (Hamlib)
+Emergency Stop dla rotatorów SPID
 
-Używa rotctl do natychmiastowego zatrzymania ruchu anteny.
-Model 903 dla SPID MD-03 ROT2 mode.
+Wysyła ramkę STOP protokołu ROT2 bezpośrednio na port szeregowy (pyserial),
+a w razie niepowodzenia używa rotctl (Hamlib), model 903 dla SPID MD-03 ROT2 mode.
 
 Autor: Aleks Czarnecki
 """
@@ -11,19 +11,58 @@ Autor: Aleks Czarnecki
 import sys
 import logging
 from antenna_controller import (
-    DEFAULT_SPID_PORT, DEFAULT_BAUDRATE, sprawdz_rotctl, rotctl_zatrzymaj_rotor
+    DEFAULT_SPID_PORT, DEFAULT_BAUDRATE,
+    enable_low_latency, sprawdz_rotctl, rotctl_zatrzymaj_rotor
 )
 
+try:
+    import serial
+except ImportError:  # Bez pyserial zostaje tylko ścieżka rotctl
+    serial = None
+
 # Konfiguracja logowania
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Ramka STOP protokołu SPID ROT2: 'W', 10 bajtów zerowych, komenda 0x0F, 0x20
+SPID_STOP_FRAME = bytes([0x57] + [0x00] * 10 + [0x0F, 0x20])
+SPID_REPLY_LENGTH = 12
+SPID_TIMEOUT = 0.2
+
+
+def spid_stop_direct(port: str, speed: int = DEFAULT_BAUDRATE) -> bool:
+    """
+    Wysyła ramkę STOP ROT2 bezpośrednio na port, z pominięciem Hamlib.
+
+    Returns:
+        True jeśli kontroler odpowiedział poprawną 12-bajtową ramką
+    """
+    if serial is None:
+        return False
+
+    reply = bytearray(SPID_REPLY_LENGTH)
+    try:
+        with serial.Serial(port, speed, timeout=SPID_TIMEOUT) as ser:
+            ser.write(SPID_STOP_FRAME)
+            received = ser.readinto(reply)
+    except (serial.SerialException, OSError) as e:
+        logger.warning("Bezpośredni STOP przez %s nieudany: %s", port, e)
+        return False
+
+    if received != SPID_REPLY_LENGTH or reply[0] != 0x57 or reply[-1] != 0x20:
+        logger.warning(
+            "Nieprawidłowa odpowiedź SPID na STOP: %s",
+            bytes(reply[:received]).hex(),
+        )
+        return False
+    return True
+
 
 def emergency_stop(port: str = DEFAULT_SPID_PORT, speed: int = DEFAULT_BAUDRATE) -> bool:
     """
-    Awaryjne zatrzymanie rotatora SPID za pomocą rotctl.
+    Awaryjne zatrzymanie rotatora SPID (ramka ROT2, a awaryjnie rotctl).
 
     Args:
         port: Port szeregowy kontrolera SPID
@@ -32,32 +71,40 @@ def emergency_stop(port: str = DEFAULT_SPID_PORT, speed: int = DEFAULT_BAUDRATE)
     Returns:
         True jeśli zatrzymanie się powiodło, False w przeciwnym razie
     """
+    logger.info("AWARYJNE ZATRZYMANIE - wysyłanie komendy STOP do portu %s", port)
+
+    # Bez tego adapter FTDI może przetrzymać ramkę STOP do 16 ms
+    enable_low_latency(port)
+
+    # Najszybsza ścieżka - ramka ROT2 bez procesu rotctl
+    if spid_stop_direct(port, speed):
+        logger.info("ZATRZYMANO! (ramka SPID ROT2)")
+        return True
+
     if not sprawdz_rotctl():
         logger.error("rotctl (Hamlib) nie jest dostępne w systemie")
         return False
 
     try:
-        logger.info(f"AWARYJNE ZATRZYMANIE - wysyłanie komendy STOP do portu {port}")
-        
         # Użyj funkcji z antenna_controller
         result = rotctl_zatrzymaj_rotor(port, speed)
         
         if "OK" in result or "STOP" in result:
-            logger.info(f"ZATRZYMANO! Odpowiedź: {result.strip()}")
+            logger.info("ZATRZYMANO! Odpowiedź: %s", result.strip())
             return True
         else:
-            logger.error(f"Błąd podczas zatrzymania: {result.strip()}")
+            logger.error("Błąd podczas zatrzymania: %s", result.strip())
             return False
 
     except Exception as e:
-        logger.error(f"Błąd podczas awaryjnego zatrzymania: {e}")
+        logger.error("Błąd podczas awaryjnego zatrzymania: %s", e)
         return False
 
 
 def main():
     """Główna funkcja - wykonuje awaryjne zatrzymanie."""
     print("=== AWARYJNE ZATRZYMANIE ROTATORA SPID ===")
-    print("Używa rotctl (Hamlib) z modelem 903 dla SPID MD-01/02")
+    print("Ramka SPID ROT2 przez pyserial, awaryjnie rotctl (Hamlib) z modelem 903")
     print()
 
     # Sprawdź argumenty
@@ -9,12 +9,20 @@ długotrwałymi sesjami obserwacyjnymi z uwzględnieniem limitów mechanicznych
 Autor: Aleks Czarnecki
 """
 
-import os
+import asyncio
+import math
 import sys
 import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from pathlib import Path
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Katalog główny projektu w sys.path (raz, także przy wielokrotnym imporcie)
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from antenna_controller import (MotorConfig,
     Position, AntennaState, DEFAULT_SPID_PORT, DEFAULT_BAUDRATE,
@@ -22,20 +30,62 @@ from antenna_controller import (MotorConfig,
 )
 
 from astronomic_calculator import (
-    AstronomicalCalculator, AstronomicalObjectType, OBSERVATORIES
+    AstronomicalCalculator, AstronomicalObjectType, OBSERVATORIES,
+    to_antenna_positions
 )
 
+from background_printer import BackgroundPrinter
+
+# Składowa enum pobierana raz, a nie w każdej iteracji pętli śledzenia
+_SUN = AstronomicalObjectType.SUN
+
 # Dodanie wyjątku SafetyError dla przypadku przekroczenia limitów
 class SafetyError(Exception):
     """Wyjątek związany z bezpieczeństwem anteny"""
 
 
+class DeadbandingTrackingFilter:
+    """Wysyła move_to tylko gdy cel przesunął się o więcej niż tolerancja
+
+    Słońce przesuwa się o ~0.02° na 5 s - bez filtra każda aktualizacja
+    śledzenia to osobna komenda do kontrolera i drgnięcie silnika.
+    """
+
+    def __init__(self, controller, az_tol: float = 0.1, el_tol: float = 0.1):
+        self.controller = controller
+        self.az_tol = az_tol
+        self.el_tol = el_tol
+        self.last_cmd_position = None
+
+    def move_to(self, position: Position) -> bool:
+        """Przekazuje ruch do kontrolera; zwraca False jeśli cel był w strefie martwej"""
+        last = self.last_cmd_position
+        if last is not None:
+            d_az = abs(position.azimuth - last.azimuth) % 360.0
+            d_az = min(d_az, 360.0 - d_az)
+            if d_az < self.az_tol and abs(position.elevation - last.elevation) < self.el_tol:
+                return False
+
+        self.controller.move_to(position)
+        self.last_cmd_position = position
+        return True
+
+
 # =============================================================================
 # PRZYKŁAD 1: Śledzenie Słońca w czasie rzeczywistym
 # =============================================================================
 
-def track_sun_realtime():
-    """Śledzenie Słońca w czasie rzeczywistym"""
+async def track_sun_realtime(sun_cache_seconds: int = 5):
+    """Śledzenie Słońca w czasie rzeczywistym (asyncio)
+
+    Obliczenia efemeryd i komendy ruchu wykonywane są w wątku roboczym,
+    a aktualizacje pozycji z wątku kontrolera trafiają do asyncio.Queue.
+
+    Args:
+        sun_cache_seconds: Okno (w sekundach), w którym pozycja Słońca jest
+            liczona tylko raz; nie dłuższe niż interwał aktualizacji - Słońce
+            przesuwa się o ~0.02° na 5 s, poniżej progu 0.1° filtra śledzenia
+    """
     print("=== Śledzenie Słońca w czasie rzeczywistym ===")
 
     # Konfiguracja lokalizacji
@@ -58,40 +108,90 @@ def track_sun_realtime():
         baudrate=DEFAULT_BAUDRATE,
         motor_config=motor_config
     )
+    tracking_filter = DeadbandingTrackingFilter(controller, az_tol=0.1, el_tol=0.1)
+
+    # Główna pętla śledzenia będzie działać przez 5 minut
+    tracking_duration = 300
+    update_interval = 5
+    # Dłuższe okno powodowałoby stałe opóźnienie śledzenia względem Słońca
+    sun_cache_seconds = min(sun_cache_seconds, update_interval)
 
     # Klasa pomocnicza do śledzenia
     class SunTrackingMonitor:
         """Klasa do monitorowania śledzenia Słońca"""
-        def __init__(self):
+        def __init__(self, capacity: int):
             self.tracking = False
             self.current_sun_position = None
-            self.path_history = []
-            self.start_time = datetime.now()
+            # Historia w prealokowanych kolumnach array('d') (8 bajtów na wartość),
+            # NaN oznacza brak pozycji Słońca; wypełnione jest pierwsze `samples` wierszy
+            self.samples = 0
+            self._capacity = capacity
+            self.times = array('d', [math.nan]) * capacity
+            self.antenna_az = array('d', self.times)
+            self.antenna_el = array('d', self.times)
+            self.sun_az = array('d', self.times)
+            self.sun_el = array('d', self.times)
+            self.output = BackgroundPrinter()
+            # Monotoniczny zegar - odporny na korekty NTP i tańszy niż datetime.now()
+            self.start_time = time.perf_counter()
 
         def position_callback(self, position: Position, _state: AntennaState):
             """Callback wywoływany przy aktualizacji pozycji"""
-            elapsed = (datetime.now() - self.start_time).total_seconds()
-            if self.current_sun_position:
-                print(f"[{elapsed:6.1f}s] "
-                      f"Antena: Az={position.azimuth:6.1f}° El={position.elevation:5.1f}° | "
-                      f"Słońce: Az={self.current_sun_position.azimuth:6.1f}° El={self.current_sun_position.elevation:5.1f}°")
+            elapsed = time.perf_counter() - self.start_time
+            sun = self.current_sun_position
+            if sun:
+                self.output.put(f"[{elapsed:6.1f}s] "
+                                f"Antena: Az={position.azimuth:6.1f}° El={position.elevation:5.1f}° | "
+                                f"Słońce: Az={sun.azimuth:6.1f}° El={sun.elevation:5.1f}°")
             else:
-                print(f"[{elapsed:6.1f}s] "
-                      f"Antena: Az={position.azimuth:6.1f}° El={position.elevation:5.1f}° | "
-                      f"Słońce: --")
-
-            # Zapisz historię
-            self.path_history.append({
-                'time': elapsed,
-                'antenna_az': position.azimuth,
-                'antenna_el': position.elevation,
-                'sun_az': self.current_sun_position.azimuth if self.current_sun_position else None,
-                'sun_el': self.current_sun_position.elevation if self.current_sun_position else None
-            })
-
-    # Stworzenie monitora i przypisanie callbacka
-    monitor = SunTrackingMonitor()
-    controller.update_callback = monitor.position_callback
+                self.output.put(f"[{elapsed:6.1f}s] "
+                                f"Antena: Az={position.azimuth:6.1f}° El={position.elevation:5.1f}° | "
+                                f"Słońce: --")
+
+            # Zapisz historię (przy przepełnieniu kolumny rosną dwukrotnie)
+            i = self.samples
+            if i == self._capacity:
+                for column in (self.times, self.antenna_az, self.antenna_el,
+                               self.sun_az, self.sun_el):
+                    column.extend(array('d', [math.nan]) * i)
+                self._capacity *= 2
+            self.times[i] = elapsed
+            self.antenna_az[i] = position.azimuth
+            self.antenna_el[i] = position.elevation
+            if sun:
+                self.sun_az[i] = sun.azimuth
+                self.sun_el[i] = sun.elevation
+            self.samples = i + 1
+
+    # Stworzenie monitora - kontroler wywołuje callback co 0.5 s w swoim wątku,
+    # więc aktualizacje przekazujemy do pętli zdarzeń przez kolejkę
+    monitor = SunTrackingMonitor(capacity=int(tracking_duration / 0.5) + 16)
+    loop = asyncio.get_running_loop()
+    status_queue: asyncio.Queue = asyncio.Queue()
+
+    def enqueue_status(position: Position, state: AntennaState):
+        loop.call_soon_threadsafe(status_queue.put_nowait, (position, state))
+
+    async def consume_status():
+        while True:
+            position, state = await status_queue.get()
+            monitor.position_callback(position, state)
+
+    controller.update_callback = enqueue_status
+
+    def sun_position_at(timestamp: float):
+        """Pozycja Słońca dla czasu zaokrąglonego do okna sun_cache_seconds
+
+        Kolejne odczyty w tym samym oknie trafiają w cache kalkulatora.
+        """
+        bucket_time = datetime.fromtimestamp(
+            timestamp - timestamp % sun_cache_seconds, timezone.utc
+        )
+        return calculator.get_sun_position(observation_time=bucket_time)
+
+    # Efemerydy i komendy ruchu w wątku roboczym - nie blokują pętli zdarzeń
+    executor = ThreadPoolExecutor(max_workers=1)
+    status_task = None
 
     try:
         controller.initialize()
@@ -100,26 +200,26 @@ def track_sun_realtime():
         print("-" * 70)
 
         monitor.tracking = True
-        start_time = time.time()
-
-        # Główna pętla śledzenia będzie działać przez 5 minut
-        tracking_duration = 300
-        update_interval = 5
+        status_task = asyncio.create_task(consume_status())
+        start_time = time.perf_counter()
+        next_sun_position = loop.run_in_executor(executor, sun_position_at, time.time())
 
-        while time.time() - start_time < tracking_duration:
-            # Pobierz aktualną pozycję Słońca
-            sun_position = calculator.get_sun_position()
+        while time.perf_counter() - start_time < tracking_duration:
+            # Pobierz aktualną pozycję Słońca (zwykle już policzoną w tle)
+            sun_position = await next_sun_position
             monitor.current_sun_position = sun_position
 
             # Przelicz na pozycję anteny
             antenna_position = sun_position.to_antenna_position()
 
             if antenna_position:
-                # Aktualizuj pozycję anteny
-                controller.move_to(antenna_position)
+                # Aktualizuj pozycję anteny (pomijając zmiany poniżej 0.1°)
+                await loop.run_in_executor(
+                    executor, tracking_filter.move_to, antenna_position
+                )
                 # Pokaż czas wschodu/zachodu
-                if len(monitor.path_history) <= 1:  # Tylko raz na początku
-                    sun_times = calculator.calculate_rise_set_times(AstronomicalObjectType.SUN)
+                if monitor.samples <= 1:  # Tylko raz na początku
+                    sun_times = calculator.calculate_rise_set_times(_SUN)
                     print("\nSłońce dzisiaj:")
                     for event, time_val in sun_times.items():
                         if time_val:
@@ -127,22 +227,32 @@ def track_sun_realtime():
             else:
                 print("Słońce poniżej minimalnej elewacji - śledzenie wstrzymane")
 
-            # Poczekaj na następną aktualizację
-            time.sleep(update_interval)
+            # Zleć obliczenie następnej pozycji i poczekaj na aktualizację
+            next_sun_position = loop.run_in_executor(
+                executor, sun_position_at, time.time() + update_interval
+            )
+            await asyncio.sleep(update_interval)
 
+        monitor.output.flush()
         print("\n✓ Śledzenie zakończone po upływie czasu")
 
         # Statystyki śledzenia
-        if monitor.path_history:
+        n = monitor.samples
+        if n:
             print("\nStatystyki śledzenia:")
-            sun_elevations = [p['sun_el'] for p in monitor.path_history if p['sun_el'] is not None]
+            sun_elevations = [el for el in monitor.sun_el[:n] if not math.isnan(el)]
             if sun_elevations:
                 print(f"Zmiana elewacji Słońca: {min(sun_elevations):.2f}° → {max(sun_elevations):.2f}°")
-            print(f"Czas śledzenia: {monitor.path_history[-1]['time']:.1f}s")
+            print(f"Czas śledzenia: {monitor.times[n - 1]:.1f}s")
 
     except Exception as e:
         print(f"✗ Błąd podczas śledzenia: {e}")
     finally:
+        if status_task is not None:
+            status_task.cancel()
+        # Czekamy na trwające w wątku roboczym move_to/efemerydy, żeby nie
+        # ścigały się z wyłączaniem kontrolera
+        executor.shutdown(wait=True)
         controller.shutdown()
         print("System wyłączony")
 
@@ -174,45 +284,63 @@ def track_sun_with_prediction():
     print(f"Obliczam przewidywaną ścieżkę Słońca na {prediction_hours} godzin...")
     predicted_path = []
 
-    for minutes in range(0, prediction_hours * 60 + 1, prediction_step_minutes):
-        prediction_time = current_time + timedelta(minutes=minutes)
-        sun_position = calculator.get_sun_position(observation_time=prediction_time)
-
-        # Używamy niższego progu elewacji, aby mieć więcej punktów
-        antenna_position = sun_position.to_antenna_position()
+    # Wszystkie punkty predykcji liczone jednym wywołaniem wsadowym
+    prediction_minutes = range(0, prediction_hours * 60 + 1, prediction_step_minutes)
+    prediction_times = [current_time + timedelta(minutes=m) for m in prediction_minutes]
+    sun_positions = calculator.get_sun_positions_batch(prediction_times)
+    antenna_positions = to_antenna_positions(sun_positions)
 
+    # Pokaż co 20 minut dla czytelności (ale zapewnij, że przynajmniej kilka punktów będzie pokazane)
+    visible_count = sum(1 for antenna_position in antenna_positions if antenna_position)
+    display_step = min(20 // prediction_step_minutes, max(1, visible_count // 5)) if visible_count else 1
+
+    # Równoległe listy (minuty, azymut, elewacja) - minuty rosną monotonicznie,
+    # więc w tracking_callback najbliższy punkt wyszukujemy binarnie
+    path_minutes = []
+    path_az = []
+    path_el = []
+    # Wiersze fragmentu ścieżki zbierane w trakcie jej budowania
+    preview_rows = []
+    path_count = 0
+
+    for minutes, prediction_time, sun_position, antenna_position in zip(
+        prediction_minutes, prediction_times, sun_positions, antenna_positions
+    ):
         # Podgląd wartości
-        print(f"Czas: {prediction_time.strftime('%H:%M:%S')} - "
+        time_str = prediction_time.strftime('%H:%M:%S')
+        print(f"Czas: {time_str} - "
               f"Az: {sun_position.azimuth:.2f}°, El: {sun_position.elevation:.2f}° - "
               f"Widoczny: {sun_position.is_visible} - Pozycja anteny: {'Tak' if antenna_position else 'Nie'}")
 
-        if antenna_position:
-            predicted_path.append({
-                'time': prediction_time,
-                'minutes_from_now': minutes,
-                'position': antenna_position,
-                'sun_position': sun_position
-            })
-        else:
-            print(f"Pominięto punkt w czasie {prediction_time.strftime('%H:%M:%S')} - "
+        if not antenna_position:
+            print(f"Pominięto punkt w czasie {time_str} - "
                   f"elewacja {sun_position.elevation:.2f}° zbyt niska")
-
-    print(f"✓ Obliczono {len(predicted_path)} punktów ścieżki")
+            continue
+
+        predicted_path.append({
+            'time': prediction_time,
+            'minutes_from_now': minutes,
+            'position': antenna_position,
+            'sun_position': sun_position
+        })
+        path_minutes.append(minutes)
+        path_az.append(antenna_position.azimuth)
+        path_el.append(antenna_position.elevation)
+
+        if path_count % display_step == 0 or path_count == visible_count - 1:
+            preview_rows.append(
+                f"  {time_str} | {antenna_position.azimuth:8.2f}° | {antenna_position.elevation:8.2f}°"
+            )
+        path_count += 1
+
+    print(f"✓ Obliczono {path_count} punktów ścieżki")
 
     # Wyświetl fragment przewidywanej ścieżki
     print("\nFragment przewidywanej ścieżki Słońca:")
     print("  Czas           | Azymut    | Elewacja")
     print("-" * 45)
-
-    # Pokaż co 20 minut dla czytelności (ale zapewnij, że przynajmniej kilka punktów będzie pokazane)
-    display_step = min(20 // prediction_step_minutes, max(1, len(predicted_path) // 5)) if predicted_path else 1
-
-    for i, point in enumerate(predicted_path):
-        if i % display_step == 0 or i == len(predicted_path) - 1:
-            time_str = point['time'].strftime('%H:%M:%S')
-            az = point['position'].azimuth
-            el = point['position'].elevation
-            print(f"  {time_str} | {az:8.2f}° | {el:8.2f}°")
+    for row in preview_rows:
+        print(row)
 
     # Sprawdź, czy mamy punkty do śledzenia
     if not predicted_path:
@@ -227,6 +355,7 @@ def track_sun_with_prediction():
     # Inicjalizacja zmiennej do przechowywania czasu rozpoczęcia śledzenia
     # WAŻNE: Ta zmienna musi być zdefiniowana PRZED funkcją tracking_callback!
     start_time = None
+    output = BackgroundPrinter()
 
     # Funkcja monitorująca postęp śledzenia
     def tracking_callback(position: Position, _state: AntennaState):
@@ -235,19 +364,24 @@ def track_sun_with_prediction():
         if start_time is None:
             return
 
-        elapsed = (datetime.now() - start_time).total_seconds()
+        elapsed = time.perf_counter() - start_time
         minutes_elapsed = elapsed / 60
 
         # Znajdź najbliższy punkt predykcji
-        if predicted_path:
-            closest_point = min(predicted_path,
-                              key=lambda p: abs(p['minutes_from_now'] - minutes_elapsed))
-            target_az = closest_point['position'].azimuth
-            target_el = closest_point['position'].elevation
-
-            print(f"[{elapsed:6.1f}s] "
-                  f"Antena: Az={position.azimuth:6.1f}° El={position.elevation:5.1f}° | "
-                  f"Predykcja: Az={target_az:6.1f}° El={target_el:5.1f}°")
+        if path_minutes:
+            idx = bisect_left(path_minutes, minutes_elapsed)
+            if idx == len(path_minutes) or (
+                idx > 0
+                and minutes_elapsed - path_minutes[idx - 1]
+                <= path_minutes[idx] - minutes_elapsed
+            ):
+                idx -= 1
+            target_az = path_az[idx]
+            target_el = path_el[idx]
+
+            output.put(f"[{elapsed:6.1f}s] "
+                       f"Antena: Az={position.azimuth:6.1f}° El={position.elevation:5.1f}° | "
+                       f"Predykcja: Az={target_az:6.1f}° El={target_el:5.1f}°")
 
     # Przypisanie callbacku
     controller.update_callback = tracking_callback
@@ -257,8 +391,8 @@ def track_sun_with_prediction():
         print("\nRozpoczynanie śledzenia Słońca z wykorzystaniem predykcji...")
         print("-" * 70)
 
-        # Czas rozpoczęcia śledzenia
-        start_time = datetime.now()
+        # Czas rozpoczęcia śledzenia (zegar monotoniczny)
+        start_time = time.perf_counter()
 
         # Wykonaj śledzenie przez określony czas
         tracking_duration = 180  # 3 minuty
@@ -266,7 +400,7 @@ def track_sun_with_prediction():
         # Realizacja ścieżki z predykcji
         for i, point in enumerate(predicted_path):
             # Sprawdź, czy czas śledzenia nie upłynął
-            elapsed_seconds = (datetime.now() - start_time).total_seconds()
+            elapsed_seconds = time.perf_counter() - start_time
             if elapsed_seconds >= tracking_duration:
                 break
 
@@ -274,12 +408,8 @@ def track_sun_with_prediction():
                 # Ruch anteny do przewidywanej pozycji
                 controller.move_to(point['position'])
 
-                # Poczekaj na osiągnięcie pozycji lub część czasu między punktami
-                wait_start = time.time()
-                while controller.state == AntennaState.MOVING:
-                    if time.time() - wait_start > 2:  # Maksymalnie 2 sekundy na ruch
-                        break
-                    time.sleep(0.1)
+                # Poczekaj na osiągnięcie pozycji (maksymalnie 2 sekundy na ruch)
+                controller.wait_until_idle(timeout=2)
 
                 # Oblicz czas do następnego punktu
                 if i < len(predicted_path) - 1:
@@ -291,6 +421,7 @@ def track_sun_with_prediction():
                 print(f"⚠ Pozycja poza limitami: {e}")
                 continue
 
+        output.flush()
         print("\n✓ Śledzenie z predykcją zakończone")
 
     except Exception as e:
@@ -304,7 +435,7 @@ def track_sun_with_prediction():
 # Uruchomienie przykładów
 #=============================================================================
 if __name__ == "__main__":
-    track_sun_realtime()
+    asyncio.run(track_sun_realtime())
     track_sun_with_prediction()
 
     print("\nWszystkie przykłady zaawansowane zakończone pomyślnie.")
@@ -0,0 +1,53 @@
+"""
+Buforowane wypisywanie komunikatów dla przykładów Sterownika Anteny Radioteleskopu
+
+Callbacki kontrolera wywoływane są z wątku monitorowania pozycji - zamiast
+blokować go na print(), linie trafiają do kolejki i są wypisywane zbiorczo
+przez osobny wątek.
+
+Autor: Aleks Czarnecki
+"""
+
+import queue
+import sys
+import threading
+
+
+class BackgroundPrinter:
+    """Wypisuje linie na stdout w wątku w tle (put() nie czeka na I/O)"""
+
+    def __init__(self, stream=None):
+        self._stream = stream if stream is not None else sys.stdout
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, line: str) -> None:
+        """Dodaje linię do wypisania"""
+        self._queue.put(line)
+
+    def flush(self, timeout: float = 1.0) -> None:
+        """Czeka, aż wszystkie wcześniej dodane linie zostaną wypisane"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        """Pętla wątku - zbiera wszystkie oczekujące linie i wypisuje je jednym write()"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = [item for item in batch if isinstance(item, str)]
+            if lines:
+                self._stream.write("\n".join(lines) + "\n")
+                self._stream.flush()
+
+            # Znaczniki flush() zwalniamy dopiero po wypisaniu linii przed nimi
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
@@ -8,17 +8,22 @@ Autor: Aleks Czarnecki
 """
 
 import time
-import os
 import sys
-from datetime import datetime
+from array import array
+from pathlib import Path
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Katalog główny projektu w sys.path (raz, także przy wielokrotnym imporcie)
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from antenna_controller import (MotorConfig, 
     Position, DEFAULT_BAUDRATE,
     AntennaLimits, AntennaControllerFactory, AntennaState
 )
 
+from background_printer import BackgroundPrinter
+
 
 # =============================================================================
 # PRZYKŁAD 1: Podstawowe sterowanie anteną
@@ -80,10 +85,9 @@ def basic_antenna_control():
             controller.move_to(pos)
 
             # Monitoruj postęp
-            while controller.state == AntennaState.MOVING:
+            while not controller.wait_until_idle(timeout=1.0):
                 current = controller.current_position
                 print(f"  Aktualna pozycja: Az={current.azimuth:.1f}°, El={current.elevation:.1f}°")
-                time.sleep(1.0)
 
             print(f"✓ Osiągnięto pozycję: {controller.current_position}")
             time.sleep(0.5)  # Krótka pauza
@@ -101,43 +105,51 @@ def basic_antenna_control():
 # PRZYKŁAD 2: Monitorowanie w czasie rzeczywistym
 # =============================================================================
 
+# Kod stanu zapisywany w historii (1 bajt zamiast obiektu na próbkę)
+STATE_CODES = {state: code for code, state in enumerate(AntennaState)}
+
+
 class AntennaMonitor:
     """Klasa do monitorowania stanu anteny"""
 
     def __init__(self):
-        self.positions_history = []
+        # Historia pozycji w równoległych kolumnach array - bez słownika na próbkę
+        self.elapsed = array('d')
+        self.azimuths = array('d')
+        self.elevations = array('d')
+        self.states = array('B')  # kody z STATE_CODES
         self.state_changes = []
-        self.start_time = datetime.now()
+        # Czas względny liczony zegarem monotonicznym
+        self.start_time = time.perf_counter()
+        # Wypisywanie poza wątkiem monitorowania kontrolera
+        self.output = BackgroundPrinter()
 
     def position_callback(self, position: Position, state: AntennaState):
         """Callback wywoływany przy zmianie stanu"""
-        timestamp = datetime.now()
+        elapsed = time.perf_counter() - self.start_time
 
         # Zapisz historię pozycji
-        self.positions_history.append({
-            'timestamp': timestamp,
-            'azimuth': position.azimuth,
-            'elevation': position.elevation,
-            'state': state.value
-        })
+        self.elapsed.append(elapsed)
+        self.azimuths.append(position.azimuth)
+        self.elevations.append(position.elevation)
+        self.states.append(STATE_CODES[state])
 
         # Wyświetl aktualizację
-        elapsed = (timestamp - self.start_time).total_seconds()
-        print(f"[{elapsed:6.1f}s] Az:{position.azimuth:6.1f}° El:{position.elevation:5.1f}° Stan:{state.value}")
+        self.output.put(f"[{elapsed:6.1f}s] Az:{position.azimuth:6.1f}° El:{position.elevation:5.1f}° Stan:{state.value}")
 
     def get_statistics(self):
         """Zwraca statystyki ruchu"""
-        if not self.positions_history:
+        if not self.elapsed:
             return {}
 
-        azimuths = [p['azimuth'] for p in self.positions_history]
-        elevations = [p['elevation'] for p in self.positions_history]
+        azimuths = self.azimuths
+        elevations = self.elevations
 
         return {
-            'total_samples': len(self.positions_history),
+            'total_samples': len(self.elapsed),
             'azimuth_range': (min(azimuths), max(azimuths)),
             'elevation_range': (min(elevations), max(elevations)),
-            'duration_seconds': (datetime.now() - self.start_time).total_seconds()
+            'duration_seconds': time.perf_counter() - self.start_time
         }
 
 
@@ -170,12 +182,12 @@ def monitored_antenna_control():
             controller.move_to(pos)
 
             # Czekaj na zakończenie z monitorowaniem
-            while controller.state == AntennaState.MOVING:
-                time.sleep(0.2)
+            controller.wait_until_idle(timeout=30)
 
             time.sleep(1)  # Pauza między ruchami
 
         # Wyświetl statystyki
+        monitor.output.flush()
         stats = monitor.get_statistics()
         print("\n" + "=" * 60)
         print("STATYSTYKI SESJI:")
@@ -192,6 +204,39 @@ def monitored_antenna_control():
 # PRZYKŁAD 3: Skanowanie nieba w siatce
 # =============================================================================
 
+def optimize_scan_order(start: Position, positions, slew_time):
+    """
+    Poprawia kolejność punktów skanowania metodą 2-opt (ścieżka otwarta od `start`).
+
+    Koszt odcinka to slew_time(a, b) - osie obracają się równocześnie, więc
+    liczy się dłuższy z ruchów. Azymut nie jest zawijany przez 0°, bo
+    rotator nie przechodzi przez ogranicznik 360°/0°.
+    """
+    tour = [start, *positions]
+    n = len(tour)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            a, b = tour[i - 1], tour[i]
+            cost_ab = slew_time(a, b)
+            for j in range(i + 1, n):
+                c = tour[j]
+                if j + 1 < n:
+                    d = tour[j + 1]
+                    delta = slew_time(a, c) + slew_time(b, d) - cost_ab - slew_time(c, d)
+                else:
+                    # Koniec ścieżki - odwrócenie ogona zmienia tylko jedną krawędź
+                    delta = slew_time(a, c) - cost_ab
+                if delta < -1e-9:
+                    tour[i:j + 1] = reversed(tour[i:j + 1])
+                    improved = True
+                    break
+            if improved:
+                break
+    return tour[1:]
+
+
 def grid_sky_scan():
     """Systematyczne skanowanie nieba w regularnej siatce"""
     print("\n=== Skanowanie nieba w siatce ===")
@@ -202,15 +247,22 @@ def grid_sky_scan():
     az_start, az_end, az_step = 0, 360, 30  # Co 30° w azymucie
     el_start, el_end, el_step = 0, 30, 10  # Co 10° w elewacji
 
-    # Generowanie siatki pozycji
+    # Generowanie siatki pozycji - wiersze na przemian w przód i wstecz
+    # (boustrofedon), więc między wierszami nie ma powrotu azymutu 360° → 0°
+    azimuths = [float(az) for az in range(az_start, az_end, az_step)]
     scan_positions = []
-    for elevation in range(el_start, el_end + 1, el_step):
-        for azimuth in range(az_start, az_end, az_step):
-            scan_positions.append(Position(float(azimuth), float(elevation)))
+    for row, elevation in enumerate(range(el_start, el_end + 1, el_step)):
+        row_azimuths = reversed(azimuths) if row % 2 else azimuths
+        scan_positions.extend(Position(az, float(elevation)) for az in row_azimuths)
 
     try:
         controller.initialize()
 
+        # Boustrofedon jako punkt startowy, 2-opt skraca trasę dla innych siatek
+        scan_positions = optimize_scan_order(
+            controller.current_position, scan_positions, controller.estimate_slew_time
+        )
+
         print(f"Rozpoczynam skanowanie {len(scan_positions)} pozycji")
         print(f"Azymut: {az_start}°-{az_end}° co {az_step}°")
         print(f"Elewacja: {el_start}°-{el_end}° co {el_step}°")
@@ -221,14 +273,13 @@ def grid_sky_scan():
         for i, pos in enumerate(scan_positions, 1):
             print(f"[{i:2d}/{len(scan_positions)}] Skanowanie Az={pos.azimuth:3.0f}° El={pos.elevation:2.0f}°", end="")
 
-            # Ruch do pozycji
-            move_start = time.time()
+            # Ruch do pozycji - limit oczekiwania z szacowanego czasu obrotu
+            expected_slew = controller.estimate_slew_time(controller.current_position, pos)
+            move_start = time.perf_counter()
             controller.move_to(pos)
+            controller.wait_until_idle(timeout=expected_slew * 1.5 + 2.0)
 
-            while controller.state == AntennaState.MOVING:
-                time.sleep(0.1)
-
-            move_time = time.time() - move_start
+            move_time = time.perf_counter() - move_start
 
             measurement_time = 2.0  # 2 sekundy na pomiar
             print(f" (ruch: {move_time:.1f}s, pomiar: {measurement_time:.1f}s)")
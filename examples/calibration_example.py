@@ -8,17 +8,17 @@ w systemie sterowania anteną radioteleskopu.
 Autor: Aleks Czarnecki
 """
 
-import time
 import logging
 import sys
-import os
+from pathlib import Path
 
-# Dodaj ścieżkę do głównego folderu projektu
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Katalog główny projektu w sys.path (raz, także przy wielokrotnym imporcie)
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from antenna_controller import (
-    AntennaControllerFactory, PositionCalibration,
-    Position, AntennaState
+    AntennaControllerFactory, PositionCalibration, Position
 )
 
 # Konfiguracja logowania
@@ -75,8 +75,7 @@ def demonstrate_calibration_management():
     print(f"   Pozycja po kalibracji: Az={calibrated_pos.azimuth:.1f}°, El={calibrated_pos.elevation:.1f}°")
     
     controller.move_to(test_position)
-    while controller.state == AntennaState.MOVING:
-        time.sleep(0.1)
+    controller.wait_until_idle(timeout=30)
     print("   Ruch zakończony")
     print()
     
@@ -195,5 +194,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\nPrzerwano przez użytkownika")
     except Exception as e:
-        logger.error(f"Błąd podczas demonstracji: {e}")
+        logger.error("Błąd podczas demonstracji: %s", e)
         print(f"Wystąpił błąd: {e}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Testy API serwera radioteleskopu (FastAPI TestClient, bez sprzętu)
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+# Dodaj ścieżkę do głównego folderu projektu
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:  # Raz, także gdy kilka modułów testów jest importowanych
+    sys.path.insert(0, _ROOT)
+
+try:
+    from fastapi.testclient import TestClient
+    from api_server.main import app
+except ImportError:  # Bez fastapi/httpx testy API są pomijane
+    TestClient = None
+
+
+@unittest.skipIf(TestClient is None, "Brak fastapi lub httpx")
+class TestApiEtag(unittest.TestCase):
+    """Testy nagłówka ETag i odpowiedzi 304 w API"""
+
+    def test_status_not_modified(self):
+        """Powtórzone żądanie z If-None-Match dostaje 304 bez treści"""
+        with TestClient(app) as client:
+            first = client.get("/status")
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers["etag"]
+
+            second = client.get("/status", headers={"If-None-Match": etag})
+            self.assertEqual(second.status_code, 304)
+            self.assertEqual(second.content, b"")
+
+            # Nieaktualny ETag - pełna odpowiedź
+            third = client.get("/status", headers={"If-None-Match": '"0"'})
+            self.assertEqual(third.status_code, 200)
+
+    def test_etag_stable_across_processes(self):
+        """ETag nie zależy od procesu (wbudowany hash() napisów jest losowany per proces)"""
+        code = (
+            "from starlette.requests import Request\n"
+            "from starlette.responses import Response\n"
+            "from api_server.main import check_etag\n"
+            "response = Response()\n"
+            "request = Request({'type': 'http', 'headers': []})\n"
+            "check_etag(request, response, (True, 'Symulator', (1.25, 2.5)))\n"
+            "print(response.headers['etag'])\n"
+        )
+        etags = set()
+        for seed in ("1", "2"):
+            result = subprocess.run(
+                [sys.executable, "-c", code], cwd=_ROOT, capture_output=True, text=True,
+                env={**os.environ, "PYTHONHASHSEED": seed}, check=True,
+            )
+            etags.add(result.stdout.strip())
+        self.assertEqual(len(etags), 1)
+
+
+if __name__ == '__main__':
+    # Uruchom testy
+    unittest.main(verbosity=2)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Testy kalkulatora astronomicznego (bez sprzętu)
+
+Porównują szybką ścieżkę obliczeń z pełnym compute() PyEphem.
+"""
+
+import math
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Dodaj ścieżkę do głównego folderu projektu
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:  # Raz, także gdy kilka modułów testów jest importowanych
+    sys.path.insert(0, _ROOT)
+
+from astronomic_calculator import (
+    FAST_FIXED_BODY_MIN_PRECISION, OBSERVATORIES, AstronomicalCalculator
+)
+
+# Dopuszczalny błąd wzoru zamkniętego względem PyEphem (stopnie)
+FAST_FIXED_BODY_MAX_ERROR = 0.015
+
+
+class TestFastFixedBodyAccuracy(unittest.TestCase):
+    """Dokładność wzoru zamkniętego (_altaz_from_radec_fast) względem PyEphem"""
+
+    def test_matches_pyephem(self):
+        """Różnica dla jasnych gwiazd nad horyzontem (także z dużym ruchem własnym)"""
+        location = OBSERVATORIES['poznan']
+        fast = AstronomicalCalculator(location, precision=FAST_FIXED_BODY_MIN_PRECISION)
+        reference = AstronomicalCalculator(location, precision=0.01)
+
+        start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+        max_error = 0.0
+        for star in ('Sirius', 'Vega', 'Polaris', 'Betelgeuse', 'Deneb', 'Arcturus'):
+            for hours in range(0, 24 * 365 * 20, 3001):
+                when = start + timedelta(hours=hours)
+                expected = reference.get_star_position(star, when)
+                if expected.elevation < 5.0:
+                    continue  # Przy horyzoncie dominują różnice modelu refrakcji
+                actual = fast.get_star_position(star, when)
+
+                d_az = abs(actual.azimuth - expected.azimuth) % 360.0
+                d_az = min(d_az, 360.0 - d_az) * math.cos(math.radians(expected.elevation))
+                max_error = max(max_error, d_az, abs(actual.elevation - expected.elevation))
+
+        # Pozostaje pominięta nutacja i aberracja roczna (~0.01°)
+        self.assertLess(max_error, FAST_FIXED_BODY_MAX_ERROR)
+
+
+if __name__ == '__main__':
+    # Uruchom testy
+    unittest.main(verbosity=2)
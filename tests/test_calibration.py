@@ -5,45 +5,60 @@ Testy jednostkowe dla funkcjonalności zapisywania i odczytywania kalibracji
 Test suite dla nowych funkcji zarządzania kalibracją w systemie antenna_controller.
 """
 
+import math
 import unittest
 import tempfile
 import os
 import json
+import shutil
 import sys
+from collections import OrderedDict
+from dataclasses import replace
+from unittest import mock
 
 # Dodaj ścieżkę do głównego folderu projektu
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:  # Raz, także gdy kilka modułów testów jest importowanych
+    sys.path.insert(0, _ROOT)
 
-from antenna_controller import PositionCalibration, AntennaControllerFactory
+import antenna_controller
+from antenna_controller import AntennaError, Position, PositionCalibration, AntennaControllerFactory
 
+# Kalibracja bazowa testów (domyślne limity, zwiększone prędkości);
+# testy tworzą z niej warianty przez dataclasses.replace
+BASE_CALIBRATION = PositionCalibration(max_azimuth_speed=10.0, max_elevation_speed=8.0)
 
-class TestCalibrationPersistence(unittest.TestCase):
+
+class CalibrationTestCase(unittest.TestCase):
+    """Bazowa klasa testów z porównaniem kątów z tolerancją 0.05°"""
+
+    def assertClose(self, first, second):
+        """Odpowiednik assertAlmostEqual(..., places=1) bez jego wolnej ścieżki"""
+        if not math.isclose(first, second, abs_tol=0.05):
+            self.fail(f"{first!r} != {second!r} (tolerancja 0.05)")
+
+
+class TestCalibrationPersistence(CalibrationTestCase):
     """Testy dla funkcji zapisywania/odczytywania kalibracji"""
 
-    def setUp(self):
-        """Przygotowanie testów"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_file = os.path.join(self.temp_dir, "test_calibration.json")
+    @classmethod
+    def setUpClass(cls):
+        """Jeden folder tymczasowy dla wszystkich testów klasy"""
+        cls.temp_dir = tempfile.mkdtemp()
 
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Czyszczenie po testach"""
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
-        os.rmdir(self.temp_dir)
+        shutil.rmtree(cls.temp_dir)
+
+    def setUp(self):
+        """Przygotowanie testów - osobny plik dla każdego testu"""
+        self.test_file = os.path.join(self.temp_dir, f"{self._testMethodName}.json")
 
     def test_save_and_load_calibration(self):
         """Test zapisywania i wczytywania kalibracji"""
         # Utwórz testową kalibrację
-        original = PositionCalibration(
-            azimuth_offset=45.5,
-            elevation_offset=-12.3,
-            min_azimuth=0.0,
-            max_azimuth=360.0,
-            min_elevation=0.0,
-            max_elevation=90.0,
-            max_azimuth_speed=10.0,
-            max_elevation_speed=8.0
-        )
+        original = replace(BASE_CALIBRATION, azimuth_offset=45.5, elevation_offset=-12.3)
 
         # Zapisz do pliku
         original.save_to_file(self.test_file)
@@ -53,14 +68,14 @@ class TestCalibrationPersistence(unittest.TestCase):
         loaded = PositionCalibration.load_from_file(self.test_file)
 
         # Sprawdź czy wartości są identyczne
-        self.assertAlmostEqual(original.azimuth_offset, loaded.azimuth_offset, places=1)
-        self.assertAlmostEqual(original.elevation_offset, loaded.elevation_offset, places=1)
-        self.assertAlmostEqual(original.min_azimuth, loaded.min_azimuth, places=1)
-        self.assertAlmostEqual(original.max_azimuth, loaded.max_azimuth, places=1)
-        self.assertAlmostEqual(original.min_elevation, loaded.min_elevation, places=1)
-        self.assertAlmostEqual(original.max_elevation, loaded.max_elevation, places=1)
-        self.assertAlmostEqual(original.max_azimuth_speed, loaded.max_azimuth_speed, places=1)
-        self.assertAlmostEqual(original.max_elevation_speed, loaded.max_elevation_speed, places=1)
+        self.assertClose(original.azimuth_offset, loaded.azimuth_offset)
+        self.assertClose(original.elevation_offset, loaded.elevation_offset)
+        self.assertClose(original.min_azimuth, loaded.min_azimuth)
+        self.assertClose(original.max_azimuth, loaded.max_azimuth)
+        self.assertClose(original.min_elevation, loaded.min_elevation)
+        self.assertClose(original.max_elevation, loaded.max_elevation)
+        self.assertClose(original.max_azimuth_speed, loaded.max_azimuth_speed)
+        self.assertClose(original.max_elevation_speed, loaded.max_elevation_speed)
 
     def test_load_nonexistent_file(self):
         """Test wczytywania nieistniejącego pliku (powinna zwrócić domyślną kalibrację)"""
@@ -89,16 +104,7 @@ class TestCalibrationPersistence(unittest.TestCase):
 
     def test_export_import_dict(self):
         """Test eksportu/importu do/z słownika"""
-        original = PositionCalibration(
-            azimuth_offset=30.0,
-            elevation_offset=5.5,
-            min_azimuth=0.0,
-            max_azimuth=360.0,
-            min_elevation=0.0,
-            max_elevation=90.0,
-            max_azimuth_speed=10.0,
-            max_elevation_speed=8.0
-        )
+        original = replace(BASE_CALIBRATION, azimuth_offset=30.0, elevation_offset=5.5)
 
         # Export do słownika
         data_dict = original.export_to_dict()
@@ -113,25 +119,16 @@ class TestCalibrationPersistence(unittest.TestCase):
         imported = PositionCalibration.import_from_dict(data_dict)
 
         # Sprawdź czy wartości są identyczne
-        self.assertAlmostEqual(original.azimuth_offset, imported.azimuth_offset, places=1)
-        self.assertAlmostEqual(original.elevation_offset, imported.elevation_offset, places=1)
-        self.assertAlmostEqual(original.min_azimuth, imported.min_azimuth, places=1)
-        self.assertAlmostEqual(original.max_azimuth, imported.max_azimuth, places=1)
-        self.assertAlmostEqual(original.min_elevation, imported.min_elevation, places=1)
-        self.assertAlmostEqual(original.max_elevation, imported.max_elevation, places=1)
+        self.assertClose(original.azimuth_offset, imported.azimuth_offset)
+        self.assertClose(original.elevation_offset, imported.elevation_offset)
+        self.assertClose(original.min_azimuth, imported.min_azimuth)
+        self.assertClose(original.max_azimuth, imported.max_azimuth)
+        self.assertClose(original.min_elevation, imported.min_elevation)
+        self.assertClose(original.max_elevation, imported.max_elevation)
 
     def test_json_file_format(self):
         """Test formatu pliku JSON"""
-        calibration = PositionCalibration(
-            azimuth_offset=60.0,
-            elevation_offset=-5.0,
-            min_azimuth=0.0,
-            max_azimuth=360.0,
-            min_elevation=0.0,
-            max_elevation=90.0,
-            max_azimuth_speed=10.0,
-            max_elevation_speed=8.0
-        )
+        calibration = replace(BASE_CALIBRATION, azimuth_offset=60.0, elevation_offset=-5.0)
 
         # Zapisz do pliku
         calibration.save_to_file(self.test_file)
@@ -161,28 +158,75 @@ class TestCalibrationPersistence(unittest.TestCase):
         self.assertEqual(data['max_elevation'], 90.0)
         self.assertEqual(data['version'], '2.0')
 
+    def test_cached_load_follows_file_changes(self):
+        """Test cache wczytywania - zmiana pliku (mtime/rozmiar) wymusza ponowny odczyt"""
+        replace(BASE_CALIBRATION, azimuth_offset=1.0).save_to_file(self.test_file)
+        first = PositionCalibration.load_from_file(self.test_file)
+
+        # Cache zwraca kopię - modyfikacja nie wpływa na kolejne wczytanie
+        first.azimuth_offset = 99.0
+        self.assertClose(PositionCalibration.load_from_file(self.test_file).azimuth_offset, 1.0)
 
-class TestAntennaControllerCalibration(unittest.TestCase):
+        # Zapis z innym programem (inny rozmiar i czas modyfikacji pliku)
+        with open(self.test_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['azimuth_offset'] = 12.25
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        st = os.stat(self.test_file)
+        os.utime(self.test_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        self.assertClose(PositionCalibration.load_from_file(self.test_file).azimuth_offset, 12.25)
+
+    def test_cache_keeps_limited_number_of_entries(self):
+        """Test limitu wpisów cache kalibracji (LRU)"""
+        with mock.patch.object(antenna_controller, '_calibration_cache', OrderedDict()), \
+                mock.patch.object(antenna_controller, 'CALIBRATION_CACHE_SIZE', 2):
+            paths = [os.path.join(self.temp_dir, f"lru_{i}.json") for i in range(3)]
+            for i, path in enumerate(paths):
+                replace(BASE_CALIBRATION, azimuth_offset=float(i)).save_to_file(path)
+                PositionCalibration.load_from_file(path)
+
+            cached_paths = [key[0] for key in antenna_controller._calibration_cache]
+            self.assertEqual(len(cached_paths), 2)
+            self.assertNotIn(paths[0], cached_paths)
+
+            # Usunięty z cache plik jest po prostu wczytywany ponownie
+            self.assertClose(PositionCalibration.load_from_file(paths[0]).azimuth_offset, 0.0)
+
+    def test_file_uses_four_space_indent(self):
+        """Test formatu zapisu - wcięcie 4 spacje jak we wcześniejszych wersjach"""
+        BASE_CALIBRATION.save_to_file(self.test_file)
+        with open(self.test_file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], '{')
+        self.assertTrue(lines[1].startswith('    "'))
+
+
+class TestAntennaControllerCalibration(CalibrationTestCase):
     """Testy dla funkcji kalibracji w AntennaController"""
 
-    def setUp(self):
-        """Przygotowanie testów"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_file = os.path.join(self.temp_dir, "controller_calibration.json")
-        
-        # Utwórz kontroler symulatora
-        self.controller = AntennaControllerFactory.create_simulator_controller(
+    @classmethod
+    def setUpClass(cls):
+        """Jeden folder tymczasowy i jeden kontroler symulatora dla testów klasy"""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.controller = AntennaControllerFactory.create_simulator_controller(
             simulation_speed=5000.0,
-            calibration_file=self.test_file
+            calibration_file=os.path.join(cls.temp_dir, "controller_calibration.json")
         )
-        self.controller.initialize()
+        cls.controller.initialize()
 
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Czyszczenie po testach"""
-        self.controller.shutdown()
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
-        os.rmdir(self.temp_dir)
+        cls.controller.shutdown()
+        shutil.rmtree(cls.temp_dir)
+
+    def setUp(self):
+        """Przygotowanie testów - osobny plik kalibracji i domyślna kalibracja"""
+        self.test_file = os.path.join(self.temp_dir, f"{self._testMethodName}.json")
+        self.controller.calibration_file = self.test_file
+        self.controller.reset_calibration(save_to_file=False)
 
     def test_automatic_calibration_save_on_set(self):
         """Test automatycznego zapisywania kalibracji przy ustawianiu"""
@@ -199,8 +243,24 @@ class TestAntennaControllerCalibration(unittest.TestCase):
 
         # Wczytaj z pliku i sprawdź wartości
         loaded = PositionCalibration.load_from_file(self.test_file)
-        self.assertAlmostEqual(loaded.azimuth_offset, 90.0, places=1)
-        self.assertAlmostEqual(loaded.elevation_offset, 10.0, places=1)
+        self.assertClose(loaded.azimuth_offset, 90.0)
+        self.assertClose(loaded.elevation_offset, 10.0)
+
+    def test_save_error_handling(self):
+        """Test błędu zapisu - save_calibration go zgłasza, zmiana kalibracji tylko ostrzega"""
+        # Katalog kalibracji jest zwykłym plikiem - zapis musi się nie udać
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write("{}")
+        self.controller.calibration_file = os.path.join(self.test_file, "calibration.json")
+
+        with self.assertRaises(AntennaError):
+            self.controller.save_calibration()
+
+        # Kalibracja jest ustawiona w pamięci mimo nieudanego zapisu
+        new_calibration = replace(BASE_CALIBRATION, azimuth_offset=7.0)
+        with self.assertLogs('antenna_controller', level='WARNING'):
+            self.controller.set_position_calibration(new_calibration, save_to_file=True)
+        self.assertClose(self.controller.position_calibration.azimuth_offset, 7.0)
 
     def test_manual_save_load(self):
         """Test ręcznego zapisywania i wczytywania"""
@@ -220,8 +280,8 @@ class TestAntennaControllerCalibration(unittest.TestCase):
         self.controller.load_calibration()
 
         # Sprawdź czy wartości zostały przywrócone
-        self.assertAlmostEqual(self.controller.position_calibration.azimuth_offset, 45.0, places=1)
-        self.assertAlmostEqual(self.controller.position_calibration.elevation_offset, 10.0, places=1)
+        self.assertClose(self.controller.position_calibration.azimuth_offset, 45.0)
+        self.assertClose(self.controller.position_calibration.elevation_offset, 10.0)
 
     def test_reset_calibration(self):
         """Test resetowania kalibracji"""
@@ -233,27 +293,18 @@ class TestAntennaControllerCalibration(unittest.TestCase):
         self.controller.reset_calibration(save_to_file=True)
 
         # Sprawdź czy wartości są domyślne
-        self.assertAlmostEqual(self.controller.position_calibration.azimuth_offset, 0.0, places=1)
-        self.assertAlmostEqual(self.controller.position_calibration.elevation_offset, 0.0, places=1)
+        self.assertClose(self.controller.position_calibration.azimuth_offset, 0.0)
+        self.assertClose(self.controller.position_calibration.elevation_offset, 0.0)
 
         # Sprawdź czy zostało zapisane do pliku
         loaded = PositionCalibration.load_from_file(self.test_file)
-        self.assertAlmostEqual(loaded.azimuth_offset, 0.0, places=1)
-        self.assertAlmostEqual(loaded.elevation_offset, 0.0, places=1)
+        self.assertClose(loaded.azimuth_offset, 0.0)
+        self.assertClose(loaded.elevation_offset, 0.0)
 
     def test_status_includes_calibration(self):
         """Test czy status zawiera informacje o kalibracji"""
         # Ustaw testową kalibrację
-        test_cal = PositionCalibration(
-            azimuth_offset=30.0,
-            elevation_offset=15.0,
-            min_azimuth=0.0,
-            max_azimuth=360.0,
-            min_elevation=0.0,
-            max_elevation=90.0,
-            max_azimuth_speed=10.0,
-            max_elevation_speed=8.0
-        )
+        test_cal = replace(BASE_CALIBRATION, azimuth_offset=30.0, elevation_offset=15.0)
         self.controller.set_position_calibration(test_cal, save_to_file=False)
 
         # Pobierz status
@@ -264,8 +315,71 @@ class TestAntennaControllerCalibration(unittest.TestCase):
         self.assertIn('calibration_file', status)
 
         cal_info = status['calibration']
-        self.assertAlmostEqual(cal_info['azimuth_offset'], 30.0, places=1)
-        self.assertAlmostEqual(cal_info['elevation_offset'], 15.0, places=1)
+        self.assertClose(cal_info['azimuth_offset'], 30.0)
+        self.assertClose(cal_info['elevation_offset'], 15.0)
+
+    def test_status_is_json_and_follows_in_place_changes(self):
+        """Test czy status da się serializować i widzi zmiany kalibracji w miejscu"""
+        json.dumps(self.controller.get_status())
+
+        # Zmiana pola bez przypisania nowej kalibracji
+        self.controller.position_calibration.azimuth_offset = 12.0
+        status = self.controller.get_status()
+        self.assertClose(status['calibration']['azimuth_offset'], 12.0)
+
+        # Wywołujący dostaje kopię - modyfikacja nie psuje kolejnych statusów
+        status['calibration']['limits']['max_elevation'] = -1.0
+        limits = self.controller.get_status()['calibration']['limits']
+        self.assertClose(limits['max_elevation'], 90.0)
+
+
+class TestMoveToRepeatFilter(unittest.TestCase):
+    """Testy pomijania powtórzonej komendy ruchu w AntennaController.move_to"""
+
+    def setUp(self):
+        """Kontroler symulatora z osobnym plikiem kalibracji"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        self.controller = AntennaControllerFactory.create_simulator_controller(
+            simulation_speed=5000.0,
+            calibration_file=os.path.join(temp_dir, "calibration.json")
+        )
+        self.controller.initialize()
+        self.addCleanup(self.controller.shutdown)
+
+        driver = self.controller.motor_driver
+        patcher = mock.patch.object(
+            driver, "move_to_position", wraps=driver.move_to_position
+        )
+        self.move_to_position = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _move(self, position: Position, **kwargs):
+        self.controller.move_to(position, **kwargs)
+        self.controller.wait_until_idle(timeout=5.0)
+
+    def test_repeated_target_is_skipped(self):
+        """Ten sam cel wysłany drugi raz nie trafia do sterownika"""
+        self._move(Position(10.0, 20.0))
+        self._move(Position(10.0, 20.0))
+        self.assertEqual(self.move_to_position.call_count, 1)
+
+        # Inny cel jest wysyłany normalnie
+        self._move(Position(11.0, 20.0))
+        self.assertEqual(self.move_to_position.call_count, 2)
+
+    def test_force_sends_repeated_target(self):
+        """force=True wysyła komendę mimo identycznego celu"""
+        self._move(Position(10.0, 20.0))
+        self._move(Position(10.0, 20.0), force=True)
+        self.assertEqual(self.move_to_position.call_count, 2)
+
+    def test_drift_resends_repeated_target(self):
+        """Cel jest wysyłany ponownie, gdy antena w spoczynku odjechała od niego"""
+        self._move(Position(10.0, 20.0))
+        self.controller.current_position = Position(30.0, 20.0)
+        self._move(Position(10.0, 20.0))
+        self.assertEqual(self.move_to_position.call_count, 2)
 
 
 if __name__ == '__main__':
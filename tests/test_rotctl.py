@@ -1,6 +1,7 @@
 """
 Testy protokołu SPID dla Sterownika Anteny Radioteleskopu
-Używa biblioteki Hamlib (rotctl) do komunikacji z kontrolerem SPID MD-01/02/03
+Komunikuje się z kontrolerem SPID MD-01/02/03 bezpośrednio ramkami ROT2 (pyserial),
+a gdy port nie jest dostępny przez pyserial - przez Hamlib (rotctl lub demon rotctld)
 
 Test jednostkowy do weryfikacji komunikacji z kontrolerem SPID.
 Zawiera testy połączenia, pozycjonowania i odczytu pozycji.
@@ -8,21 +9,36 @@ Zawiera testy połączenia, pozycjonowania i odczytu pozycji.
 Autor: Aleks Czarnecki
 """
 
-import subprocess
 import sys
 import unittest
 import time
 import logging
 import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+from typing import Optional, Tuple
+from unittest import mock
 
 # Dodaj ścieżkę do głównego folderu projektu
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:  # Raz, także gdy kilka modułów testów jest importowanych
+    sys.path.insert(0, _ROOT)
 
 from antenna_controller import (
     PositionCalibration, DEFAULT_CALIBRATION_FILE, DEFAULT_SPID_PORT, DEFAULT_BAUDRATE,
+    DEFAULT_TIMEOUT, ROTCTL_SET_POS_FMT, ROTCTL_GET_POS_CMD, ROTCTL_STOP_CMD,
+    ROTCTL_QUIT_PAYLOAD, RotctlSession, enable_low_latency, parse_rotctl_position,
     sprawdz_rotctl
 )
 
+try:
+    import serial
+except ImportError:  # Bez pyserial testy używają tylko rotctl
+    serial = None
+
 # Konfiguracja logowania
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +46,234 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Ramki protokołu SPID ROT2: 'W', 10 bajtów danych, komenda, 0x20
+SPID_STATUS_FRAME = bytes([0x57] + [0x00] * 10 + [0x1F, 0x20])
+SPID_STOP_FRAME = bytes([0x57] + [0x00] * 10 + [0x0F, 0x20])
+SPID_SET_CMD = 0x2F
+SPID_REPLY_LENGTH = 12
+SPID_TIMEOUT = 0.5
+
+# Domyślny port TCP demona rotctld (Hamlib)
+DEFAULT_ROTCTLD_PORT = 4533
+
+# Odstępy odczytów w sprawdz_pozycje (s): po błędzie, najkrótszy i najdłuższy
+POLL_INTERVAL = 0.5
+POLL_MIN_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 1.0
+# Brak ruchu dłużej niż POLL_STALL_TIME podwaja odstęp (do POLL_STALL_MAX_INTERVAL)
+POLL_STALL_TIME = 3.0
+POLL_STALL_MAX_INTERVAL = 4.0
+
+
+# Fałszywy rotctl: odpowiada na każdą komendę jak Hamlib w trybie '+'.
+# FAKE_ROTCTL_MODE: "ok", "silent" (brak odpowiedzi) lub "die_once"
+# (pierwszy proces kończy się po pierwszej odpowiedzi)
+FAKE_ROTCTL = """#!{python}
+import os, sys
+mode = os.environ.get("FAKE_ROTCTL_MODE", "ok")
+marker = os.environ["FAKE_ROTCTL_LOG"] + ".died"
+die = mode == "die_once" and not os.path.exists(marker)
+with open(os.environ["FAKE_ROTCTL_LOG"], "a") as log:
+    for line in sys.stdin:
+        log.write(line)
+        log.flush()
+        if line.strip() == "q" or mode == "silent":
+            continue
+        sys.stdout.write("Azimuth: 12.5\\nElevation: 34.5\\nRPRT 0\\n")
+        sys.stdout.flush()
+        if die:
+            open(marker, "w").close()
+            sys.exit(0)
+"""
+
+
+def _ang_diff(a: float, b: float) -> float:
+    """Odległość kątowa w stopniach (0-180), z przejściem przez 0°"""
+    d = abs(a - b) % 360.0
+    return d if d <= 180.0 else 360.0 - d
+
+
+class SPIDSerial:
+    """
+    Bezpośrednia komunikacja z kontrolerem SPID (protokół ROT2) przez pyserial.
+
+    Jedna ramka zapisu i 12-bajtowa odpowiedź zamiast procesu rotctl na komendę.
+    """
+
+    def __init__(self, port: str, speed: int = DEFAULT_BAUDRATE, timeout: float = SPID_TIMEOUT):
+        self._serial = serial.Serial(port, speed, timeout=timeout)
+        self._reply = bytearray(SPID_REPLY_LENGTH)
+        # Impulsy na stopień (PH/PV), aktualizowane z odpowiedzi kontrolera
+        self.az_resolution = 10
+        self.el_resolution = 10
+
+    def _transact(self, frame: bytes) -> Tuple[float, float]:
+        """Wysyła ramkę i dekoduje pozycję z odpowiedzi (azymut, elewacja)"""
+        self._serial.reset_input_buffer()
+        self._serial.write(frame)
+        received = self._serial.readinto(self._reply)
+        reply = self._reply
+        if received != SPID_REPLY_LENGTH or reply[0] != 0x57 or reply[11] != 0x20:
+            raise RuntimeError(f"Nieprawidłowa odpowiedź SPID: {bytes(reply[:received]).hex()}")
+        if reply[5]:
+            self.az_resolution = reply[5]
+        if reply[10]:
+            self.el_resolution = reply[10]
+        # Cyfry setek, dziesiątek, jedności i dziesiątych części stopnia, przesunięte o 360°
+        az = (reply[1] * 1000 + reply[2] * 100 + reply[3] * 10 + reply[4] - 3600) / 10.0
+        el = (reply[6] * 1000 + reply[7] * 100 + reply[8] * 10 + reply[9] - 3600) / 10.0
+        return az, el
+
+    def get_position(self) -> Tuple[float, float]:
+        """Odczytuje pozycję (ramka STATUS)"""
+        return self._transact(SPID_STATUS_FRAME)
+
+    def stop(self) -> Tuple[float, float]:
+        """Zatrzymuje rotor (ramka STOP), zwraca pozycję zatrzymania"""
+        return self._transact(SPID_STOP_FRAME)
+
+    def set_position(self, az: float, el: float) -> None:
+        """Wysyła ramkę SET (kontroler nie odpowiada na tę komendę)"""
+        h = round(self.az_resolution * (360.0 + az))
+        v = round(self.el_resolution * (360.0 + el))
+        frame = (
+            b"W%04d" % h + bytes([self.az_resolution])
+            + b"%04d" % v + bytes([self.el_resolution, SPID_SET_CMD, 0x20])
+        )
+        self._serial.write(frame)
+
+    def close(self) -> None:
+        """Zamyka port szeregowy"""
+        self._serial.close()
+
+
+class RotctldClient:
+    """
+    Klient demona rotctld (Hamlib) przez jedno długo otwarte połączenie TCP.
+
+    Ten sam interfejs co RotctlSession (command/batch/close), ale port
+    szeregowy trzyma demon, więc może go współdzielić kilka procesów.
+    Zerwane połączenie jest nawiązywane ponownie przy następnej komendzie.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_ROTCTLD_PORT,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _ensure_connection(self):
+        """Zwraca strumień odpowiedzi, łącząc się z rotctld w razie potrzeby"""
+        if self._sock is None:
+            sock = socket.create_connection((self.host, self.port), self.timeout)
+            # Krótkie komendy bez czekania na algorytm Nagle'a
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sock = sock
+            self._reader = sock.makefile("rb")
+        return self._reader
+
+    def command(self, komenda: str) -> list[str]:
+        """
+        Wysyła komendę (np. ROTCTL_STOP_CMD) i zwraca linie odpowiedzi bez 'RPRT'.
+
+        Raises:
+            RuntimeError: Błąd połączenia, timeout lub kod błędu RPRT
+        """
+        return self.batch([komenda])[0]
+
+    def batch(self, komendy: list[str]) -> list[list[str]]:
+        """
+        Wysyła kilka komend jednym sendall() i zwraca odpowiedzi w tej kolejności.
+
+        Odpowiedzi wszystkich komend są czytane także po błędzie jednej z nich,
+        więc połączenie pozostaje zsynchronizowane.
+
+        Raises:
+            RuntimeError: Błąd połączenia, timeout lub pierwszy kod błędu RPRT
+        """
+        payload = b"".join(RotctlSession._payload(komenda) for komenda in komendy)
+        with self._lock:
+            try:
+                reader = self._ensure_connection()
+                self._sock.sendall(payload)
+                replies = [self._read_reply(reader) for _ in komendy]
+            except OSError as e:
+                # Również timeout - strumień odpowiedzi jest wtedy niepewny
+                self._disconnect()
+                raise RuntimeError(f"Błąd połączenia z rotctld: {e}")
+        for reply in replies:
+            if isinstance(reply, str):
+                raise RuntimeError(f"Błąd rotctl: {reply}")
+        return replies
+
+    def _read_reply(self, reader):
+        """Czyta odpowiedź do linii 'RPRT'; przy kodzie błędu zwraca tę linię"""
+        lines = []
+        while True:
+            line = reader.readline()
+            if not line:
+                raise ConnectionResetError("rotctld zamknął połączenie")
+            line = line.decode("ascii", "replace").strip()
+            if line.startswith("RPRT"):
+                return lines if line == "RPRT 0" else line
+            lines.append(line)
+
+    def _disconnect(self):
+        """Zamyka gniazdo (jeśli otwarte) i zapomina o nim"""
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def close(self):
+        """Kończy połączenie z rotctld (demon działa dalej)"""
+        with self._lock:
+            if self._sock is not None:
+                try:
+                    self._sock.sendall(ROTCTL_QUIT_PAYLOAD)
+                except OSError:
+                    pass
+            self._disconnect()
+
+
+# Jedno połączenie na (port, prędkość) na cały przebieg testów
+_polaczenia: dict = {}
+
+
+def polaczenie_spid(port: str, speed: int = DEFAULT_BAUDRATE):
+    """
+    Zwraca wspólne połączenie z kontrolerem: SPIDSerial (ROT2 przez pyserial),
+    a gdy portu nie da się otworzyć - RotctlSession (jeden długo działający rotctl).
+    Klient rotctld zarejestrowany w setUpClass ma pierwszeństwo.
+    """
+    conn = _polaczenia.get((port, speed))
+    if conn is None:
+        if serial is not None:
+            try:
+                conn = SPIDSerial(port, speed)
+            except (serial.SerialException, OSError) as e:
+                logger.warning("ROT2 przez pyserial niedostępny (%s), używam rotctl", e)
+        if conn is None:
+            conn = RotctlSession(port, speed)
+        _polaczenia[(port, speed)] = conn
+    return conn
+
+
+def zamknij_polaczenia():
+    """Zamyka wszystkie połączenia otwarte przez testy"""
+    for conn in _polaczenia.values():
+        conn.close()
+    _polaczenia.clear()
+
+
 def ustaw_pozycje(port: str, az: float, el: float, speed: int = DEFAULT_BAUDRATE, apply_calibration: bool = True):
     """Ustawia pozycję rotatora SPID MD-03 za pomocą rotctl (Hamlib)"""
     
@@ -38,126 +282,87 @@ def ustaw_pozycje(port: str, az: float, el: float, speed: int = DEFAULT_BAUDRATE
         try:
             calibration = wczytaj_kalibracje()
             az, el = zastosuj_offset_kalibracji(az, el, calibration)
-            logger.debug(f"Pozycja po aplikacji offsetu: Az={az:.1f}°, El={el:.1f}°")
+            logger.debug("Pozycja po aplikacji offsetu: Az=%.1f°, El=%.1f°", az, el)
         except Exception as e:
-            logger.warning(f"Nie można zastosować kalibracji: {e}")
+            logger.warning("Nie można zastosować kalibracji: %s", e)
     
-    komenda = f"P {az % 360:.1f} {el:.1f}\n"
-
-    proc = subprocess.Popen(
-        ['rotctl', '-m', '903', '-r', port, '-s', str(speed), '-'],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
-
-    stdout, stderr = proc.communicate(input=komenda)
-
-    if proc.returncode != 0:
-        raise RuntimeError(f"Błąd rotctl: {stderr.strip()}")
+    conn = polaczenie_spid(port, speed)
+    if isinstance(conn, SPIDSerial):
+        conn.set_position(az % 360, el)
+        return ""
 
-    return stdout.strip()
+    # RotctlSession zgłasza RuntimeError przy błędzie (RPRT != 0) lub timeoucie
+    return "\n".join(conn.command(ROTCTL_SET_POS_FMT % (az % 360, el)))
 
 def odczytaj_pozycje(port: str, speed: int = DEFAULT_BAUDRATE, apply_calibration: bool = True):
     """
     Odczytuje aktualną pozycję rotatora SPID.
     Zwraca tuple (azymut, elewacja) w stopniach z uwzględnieniem offsetów kalibracji.
     """
-    proc = subprocess.Popen(
-        ['rotctl', '-m', '903', '-r', port, '-s', str(speed), '-'],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
-
-    stdout, stderr = proc.communicate(input="p\n")
-
-    if proc.returncode != 0:
-        raise RuntimeError(f"Błąd rotctl: {stderr.strip()}")
-
-    lines = stdout.strip().split('\n')
-    values = []
-    for line in lines:
-        line = line.strip()
-        if line and not line.startswith('p '):
-            try:
-                values.append(float(line))
-            except ValueError:
-                # Sprawdź czy linia zawiera wartość po "p "
-                if line.startswith('p '):
-                    try:
-                        values.append(float(line[2:]))
-                    except ValueError:
-                        continue
-
-    if len(values) >= 2:
-        raw_az, raw_el = values[0], values[1]
-        
-        # Zastosuj kompensację offsetu kalibracji jeśli włączona
-        if apply_calibration:
-            try:
-                calibration = wczytaj_kalibracje()
-                # Odejmij offsety żeby uzyskać rzeczywistą pozycję
-                compensated_az = (raw_az - calibration.azimuth_offset) % 360
-                compensated_el = raw_el - calibration.elevation_offset
-                logger.debug(f"Pozycja surowa: Az={raw_az:.1f}°, El={raw_el:.1f}°")
-                logger.debug(f"Pozycja po kompensacji: Az={compensated_az:.1f}°, El={compensated_el:.1f}°")
-                return compensated_az, compensated_el
-            except Exception as e:
-                logger.warning(f"Nie można zastosować kompensacji kalibracji: {e}")
-        
-        return raw_az, raw_el
+    conn = polaczenie_spid(port, speed)
+    if isinstance(conn, SPIDSerial):
+        raw_az, raw_el = conn.get_position()
     else:
-        # Alternatywne parsowanie - spróbuj wyciągnąć liczby z całego tekstu
-        import re
-        numbers = re.findall(r'[-+]?\d*\.?\d+', stdout)
-        if len(numbers) >= 2:
-            try:
-                raw_az, raw_el = float(numbers[0]), float(numbers[1])
-                
-                # Zastosuj kompensację offsetu kalibracji jeśli włączona
-                if apply_calibration:
-                    try:
-                        calibration = wczytaj_kalibracje()
-                        # Odejmij offsety żeby uzyskać rzeczywistą pozycję
-                        compensated_az = (raw_az - calibration.azimuth_offset) % 360
-                        compensated_el = raw_el - calibration.elevation_offset
-                        return compensated_az, compensated_el
-                    except Exception as e:
-                        logger.warning(f"Nie można zastosować kompensacji kalibracji: {e}")
-                
-                return raw_az, raw_el
-            except ValueError:
-                pass
+        raw_az, raw_el = parsuj_pozycje_rotctl(conn.command(ROTCTL_GET_POS_CMD))
 
-        raise RuntimeError(f"Niepełna odpowiedź pozycji: {stdout}")
+    # Zastosuj kompensację offsetu kalibracji jeśli włączona
+    if apply_calibration:
+        try:
+            calibration = wczytaj_kalibracje()
+            if not calibration.has_offsets:
+                # Zerowe offsety - kompensacja sprowadza się do normalizacji azymutu
+                return raw_az % 360, raw_el
+            # Odejmij offsety żeby uzyskać rzeczywistą pozycję
+            compensated_az = (raw_az - calibration.azimuth_offset) % 360
+            compensated_el = raw_el - calibration.elevation_offset
+            logger.debug("Pozycja surowa: Az=%.1f°, El=%.1f°", raw_az, raw_el)
+            logger.debug(
+                "Pozycja po kompensacji: Az=%.1f°, El=%.1f°",
+                compensated_az,
+                compensated_el,
+            )
+            return compensated_az, compensated_el
+        except Exception as e:
+            logger.warning("Nie można zastosować kompensacji kalibracji: %s", e)
 
-def zatrzymaj_rotor(port: str, speed: int = 115200):
-    """Zatrzymuje ruch rotatora."""
-    proc = subprocess.Popen(
-        ['rotctl', '-m', '903', '-r', port, '-s', str(speed), '-'],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
+    return raw_az, raw_el
+
+
+def odczytaj_pozycje_seria(port: str, count: int, speed: int = DEFAULT_BAUDRATE):
+    """
+    Odczytuje pozycję `count` razy pod rząd (surowe wartości, bez kalibracji).
+    Przez rotctl wszystkie komendy 'p' idą jednym zapisem do procesu.
+    """
+    conn = polaczenie_spid(port, speed)
+    if isinstance(conn, SPIDSerial):
+        return [conn.get_position() for _ in range(count)]
+    return [parsuj_pozycje_rotctl(lines) for lines in conn.batch([ROTCTL_GET_POS_CMD] * count)]
 
-    stdout, stderr = proc.communicate(input="S\n")
 
-    if proc.returncode != 0:
-        raise RuntimeError(f"Błąd rotctl STOP: {stderr.strip()}")
+def parsuj_pozycje_rotctl(lines) -> Tuple[float, float]:
+    """Wyciąga surową pozycję (azymut, elewacja) z linii odpowiedzi rotctl na 'p'"""
+    stdout = "\n".join(lines)
+    position = parse_rotctl_position(stdout)
+    if position is None:
+        raise RuntimeError(f"Niepełna odpowiedź pozycji: {stdout}")
+    return position
 
-    return stdout.strip()
+def zatrzymaj_rotor(port: str, speed: int = 115200):
+    """Zatrzymuje ruch rotatora."""
+    conn = polaczenie_spid(port, speed)
+    if isinstance(conn, SPIDSerial):
+        az, el = conn.stop()
+        return f"STOP Az={az:.1f} El={el:.1f}"
+    return "\n".join(conn.command(ROTCTL_STOP_CMD))
 
 
 def sprawdz_pozycje(port: str, target_az: float, target_el: float, tolerance: float = 1.5,
                    timeout: float = 90.0, speed: int = DEFAULT_BAUDRATE):
     """
     Sprawdza czy rotor osiągnął zadaną pozycję z określoną tolerancją.
-    Używa inteligentnego czekania sprawdzając pozycję co 0.5s zamiast stałego czekania.
-    Przedłuża timeout jeśli wykryje ruch anteny.
+    Odstęp między odczytami to połowa szacowanego czasu dojazdu (z prędkości osi
+    w kalibracji), w granicach 0.05-1s; gdy antena stoi dłużej niż 3s, odstęp
+    jest podwajany. Przedłuża timeout jeśli wykryje ruch anteny.
 
     Args:
         port: Port szeregowy
@@ -174,6 +379,12 @@ def sprawdz_pozycje(port: str, target_az: float, target_el: float, tolerance: fl
     last_movement_time = start_time
     attempt = 0
     prev_az, prev_el = None, None
+    stall_delay = POLL_MAX_INTERVAL
+    # Prędkości osi do szacowania czasu dojazdu (domyślne, jeśli plik ma zera)
+    calibration = wczytaj_kalibracje()
+    defaults = PositionCalibration()
+    az_rate = calibration.max_azimuth_speed if calibration.max_azimuth_speed > 0 else defaults.max_azimuth_speed
+    el_rate = calibration.max_elevation_speed if calibration.max_elevation_speed > 0 else defaults.max_elevation_speed
     
     while True:
         attempt += 1
@@ -185,25 +396,34 @@ def sprawdz_pozycje(port: str, target_az: float, target_el: float, tolerance: fl
 
             # Sprawdź czy antena się porusza (porównaj z poprzednią pozycją)
             if prev_az is not None and prev_el is not None:
-                az_moved = abs(current_az - prev_az)
-                if az_moved > 180:  # Uwzględnij przejście przez 0°
-                    az_moved = 360 - az_moved
+                az_moved = _ang_diff(current_az, prev_az)
                 el_moved = abs(current_el - prev_el)
                 
                 # Jeśli antena się porusza (więcej niż 0.2°), zaktualizuj czas ostatniego ruchu
                 if az_moved > 0.2 or el_moved > 0.2:
                     last_movement_time = current_time
-                    logger.debug(f"Wykryto ruch: dAz={az_moved:.1f}°, dEl={el_moved:.1f}°")
+                    logger.debug(
+                        "Wykryto ruch: dAz=%.1f°, dEl=%.1f°",
+                        az_moved,
+                        el_moved,
+                    )
 
             # Oblicz różnicę od pozycji docelowej
-            az_diff = abs(current_az - target_az)
-            if az_diff > 180:
-                az_diff = 360 - az_diff
+            az_diff = _ang_diff(current_az, target_az)
             el_diff = abs(current_el - target_el)
 
-            logger.debug(f"Próba {attempt}: Az={current_az:.1f}° (cel {target_az:.1f}°, diff {az_diff:.1f}°), "
-                        f"El={current_el:.1f}° (cel {target_el:.1f}°, diff {el_diff:.1f}°), "
-                        f"elapsed={elapsed_time:.1f}s")
+            logger.debug(
+                "Próba %s: Az=%.1f° (cel %.1f°, diff %.1f°), "
+                "El=%.1f° (cel %.1f°, diff %.1f°), elapsed=%.1fs",
+                attempt,
+                current_az,
+                target_az,
+                az_diff,
+                current_el,
+                target_el,
+                el_diff,
+                elapsed_time,
+            )
 
             # Sprawdź czy osiągnęliśmy pozycję z tolerancją
             if az_diff <= tolerance and el_diff <= tolerance:
@@ -212,27 +432,39 @@ def sprawdz_pozycje(port: str, target_az: float, target_el: float, tolerance: fl
             # Sprawdź timeout - ale tylko jeśli antena nie porusza się przez ostatnie 10 sekund
             time_since_movement = current_time - last_movement_time
             if elapsed_time > timeout and time_since_movement > 10.0:
-                logger.warning(f"Timeout po {elapsed_time:.1f}s (brak ruchu przez {time_since_movement:.1f}s)")
-                break
+                logger.warning(
+                    "Timeout po %.1fs (brak ruchu przez %.1fs)",
+                    elapsed_time,
+                    time_since_movement,
+                )
+                # Ostatni odczyt z pętli jest aktualną pozycją - bez ponownego odczytu
+                return False, current_az, current_el, elapsed_time
 
             # Zapisz pozycję dla następnej iteracji
             prev_az, prev_el = current_az, current_el
             
-            # Czekaj przed następną próbą
-            time.sleep(0.5)
+            # Czekaj przed następną próbą - połowę szacowanego czasu dojazdu
+            delay = 0.5 * max(az_diff / az_rate, el_diff / el_rate)
+            delay = min(max(delay, POLL_MIN_INTERVAL), POLL_MAX_INTERVAL)
+            if time_since_movement > POLL_STALL_TIME:
+                stall_delay = min(stall_delay * 2, POLL_STALL_MAX_INTERVAL)
+                delay = max(delay, stall_delay)
+            else:
+                stall_delay = POLL_MAX_INTERVAL
+            time.sleep(delay)
 
         except Exception as e:
-            logger.warning(f"Błąd podczas sprawdzania pozycji (próba {attempt}): {e}")
-            time.sleep(0.5)
-
-    # Ostatni odczyt dla zwrócenia aktualnej pozycji
-    try:
-        final_az, final_el = odczytaj_pozycje(port, speed)
-        elapsed_time = time.time() - start_time
-        return False, final_az, final_el, elapsed_time
-    except Exception:
-        elapsed_time = time.time() - start_time
-        return False, 0.0, 0.0, elapsed_time
+            logger.warning(
+                "Błąd podczas sprawdzania pozycji (próba %s): %s",
+                attempt,
+                e,
+            )
+            if elapsed_time > timeout:
+                # Zwróć ostatnią odczytaną pozycję (0, 0 jeśli żaden odczyt się nie udał)
+                if prev_az is None:
+                    return False, 0.0, 0.0, elapsed_time
+                return False, prev_az, prev_el, elapsed_time
+            time.sleep(POLL_INTERVAL)
 
 
 def wczytaj_kalibracje(calibration_file=None):
@@ -240,17 +472,29 @@ def wczytaj_kalibracje(calibration_file=None):
     file_path = calibration_file or DEFAULT_CALIBRATION_FILE
     try:
         calibration = PositionCalibration.load_from_file(file_path)
-        logger.info(f"Kalibracja wczytana z {file_path}: az_offset={calibration.azimuth_offset:.1f}°, el_offset={calibration.elevation_offset:.1f}°")
+        logger.info(
+            "Kalibracja wczytana z %s: az_offset=%.1f°, el_offset=%.1f°",
+            file_path,
+            calibration.azimuth_offset,
+            calibration.elevation_offset,
+        )
         return calibration
     except Exception as e:
-        logger.warning(f"Nie można wczytać kalibracji z {file_path}: {e}. Używam wartości domyślnych.")
+        logger.warning(
+            "Nie można wczytać kalibracji z %s: %s. Używam wartości domyślnych.",
+            file_path,
+            e,
+        )
         return PositionCalibration()
 
 
 def zastosuj_offset_kalibracji(az: float, el: float, calibration: PositionCalibration):
     """Stosuje offset kalibracji do pozycji"""
-    calibrated_az = (az + calibration.azimuth_offset) % 360
-    calibrated_el = el + calibration.elevation_offset
+    if calibration.has_offsets:
+        calibrated_az = (az + calibration.azimuth_offset) % 360
+        calibrated_el = el + calibration.elevation_offset
+    else:
+        calibrated_az, calibrated_el = az % 360, el
     
     # Ogranicz elewację do sensownego zakresu
     calibrated_el = max(calibration.min_elevation, min(calibration.max_elevation, calibrated_el))
@@ -263,36 +507,56 @@ class SPIDProtocolTests(unittest.TestCase):
 
     PORT = DEFAULT_SPID_PORT
     BAUDRATE = DEFAULT_BAUDRATE
+    # (host, port) działającego rotctld - gdy port szeregowy trzyma demon
+    ROTCTLD_ADDRESS = None
 
     @classmethod
     def setUpClass(cls):
-        """Sprawdzenie czy rotctl jest dostępne przed rozpoczęciem testów."""
-        if not sprawdz_rotctl():
-            raise unittest.SkipTest("rotctl (Hamlib) nie jest dostępne w systemie")
+        """Otwarcie połączenia (ROT2, rotctld lub rotctl) przed rozpoczęciem testów."""
+        if cls.ROTCTLD_ADDRESS is not None:
+            # Wszystkie funkcje pomocnicze użyją tego połączenia dla PORT
+            _polaczenia[(cls.PORT, cls.BAUDRATE)] = RotctldClient(*cls.ROTCTLD_ADDRESS)
+        elif enable_low_latency(cls.PORT):
+            # Adapter FTDI domyślnie przetrzymuje każdą odpowiedź do 16 ms
+            logger.info("Tryb low latency włączony dla %s", cls.PORT)
+
+        # Jedno połączenie dla wszystkich testów klasy
+        conn = polaczenie_spid(cls.PORT, cls.BAUDRATE)
+        if isinstance(conn, RotctlSession) and not sprawdz_rotctl():
+            zamknij_polaczenia()
+            raise unittest.SkipTest(
+                "Port niedostępny przez pyserial, a rotctl (Hamlib) nie jest dostępne"
+            )
 
         logger.info("=" * 60)
         logger.info("ROZPOCZĘCIE TESTÓW PROTOKOŁU SPID")
-        logger.info(f"Port: {cls.PORT}")
-        logger.info(f"Baudrate: {cls.BAUDRATE}")
+        logger.info("Port: %s", cls.PORT)
+        logger.info("Baudrate: %s", cls.BAUDRATE)
+        logger.info("Połączenie: %s", type(conn).__name__)
         logger.info("=" * 60)
 
+    @classmethod
+    def tearDownClass(cls):
+        """Zamknięcie wspólnego połączenia."""
+        zamknij_polaczenia()
+
     def setUp(self):
         """Przygotowanie do każdego testu."""
         logger.info("-" * 60)
-        logger.info(f"Rozpoczęcie testu: {self._testMethodName}")
+        logger.info("Rozpoczęcie testu: %s", self._testMethodName)
         
         # Wczytaj kalibrację
         self.calibration = wczytaj_kalibracje()
 
     def tearDown(self):
         """Sprzątanie po każdym teście."""
-        logger.info(f"Zakończenie testu: {self._testMethodName}")
+        logger.info("Zakończenie testu: %s", self._testMethodName)
         # Zatrzymaj rotor po każdym teście dla bezpieczeństwa
         try:
             zatrzymaj_rotor(self.PORT, self.BAUDRATE)
             logger.info("Rotor zatrzymany po teście")
         except Exception as e:
-            logger.warning(f"Nie można zatrzymać rotora: {e}")
+            logger.warning("Nie można zatrzymać rotora: %s", e)
 
     def test_01_connection_test(self):
         """Test połączenia z kontrolerem SPID."""
@@ -300,7 +564,7 @@ class SPIDProtocolTests(unittest.TestCase):
 
         try:
             az, el = odczytaj_pozycje(self.PORT, self.BAUDRATE)
-            logger.info(f"Połączenie OK - Pozycja: Az={az:.1f}°, El={el:.1f}°")
+            logger.info("Połączenie OK - Pozycja: Az=%.1f°, El=%.1f°", az, el)
 
             # Sprawdź czy wartości są w rozsądnych zakresach
             self.assertTrue(0 <= az <= 360, f"Azymut poza zakresem: {az}")
@@ -313,15 +577,13 @@ class SPIDProtocolTests(unittest.TestCase):
         """Test wielokrotnego odczytu pozycji."""
         logger.info("Test wielokrotnego odczytu pozycji")
 
-        positions = []
-        for i in range(3):
-            try:
-                az, el = odczytaj_pozycje(self.PORT, self.BAUDRATE)
-                positions.append((az, el))
-                logger.info(f"Odczyt {i+1}: Az={az:.1f}°, El={el:.1f}°")
-                time.sleep(0.5)
-            except Exception as e:
-                self.fail(f"Błąd odczytu pozycji (próba {i+1}): {e}")
+        try:
+            positions = odczytaj_pozycje_seria(self.PORT, 3, self.BAUDRATE)
+        except Exception as e:
+            self.fail(f"Błąd odczytu pozycji: {e}")
+
+        for i, (az, el) in enumerate(positions):
+            logger.info("Odczyt %s: Az=%.1f°, El=%.1f°", i+1, az, el)
 
         # Sprawdź czy wszystkie odczyty się powiodły
         self.assertEqual(len(positions), 3, "Nie wszystkie odczyty się powiodły")
@@ -338,29 +600,36 @@ class SPIDProtocolTests(unittest.TestCase):
 
         # Odczytaj pozycję początkową
         initial_az, initial_el = odczytaj_pozycje(self.PORT, self.BAUDRATE)
-        logger.info(f"Pozycja początkowa: Az={initial_az:.1f}°, El={initial_el:.1f}°")
+        logger.info("Pozycja początkowa: Az=%.1f°, El=%.1f°", initial_az, initial_el)
 
         # Przejedź do pozycji 0°, 0°
         target_az, target_el = 0.0, 0.0
 
         try:
             ustaw_pozycje(self.PORT, az=target_az, el=target_el, speed=self.BAUDRATE)
-            logger.info(f"Komenda MOVE do ({target_az}°, {target_el}°) wysłana")
+            logger.info("Komenda MOVE do (%s°, %s°) wysłana", target_az, target_el)
 
             # Sprawdź czy pozycja została osiągnięta
             success, final_az, final_el, elapsed_time = sprawdz_pozycje(
                 self.PORT, target_az, target_el, tolerance=2.0, timeout=20.0
             )
 
-            logger.info(f"Pozycja końcowa: Az={final_az:.1f}°, El={final_el:.1f}° (czas: {elapsed_time:.1f}s)")
+            logger.info(
+                "Pozycja końcowa: Az=%.1f°, El=%.1f° (czas: %.1fs)",
+                final_az,
+                final_el,
+                elapsed_time,
+            )
 
             # Test zakończony sukcesem tylko jeśli osiągnięto pozycję
             if success:
-                logger.info(f"Pozycja ({target_az}°, {target_el}°) osiągnięta pomyślnie")
+                logger.info(
+                    "Pozycja (%s°, %s°) osiągnięta pomyślnie",
+                    target_az,
+                    target_el,
+                )
             else:
-                az_diff = abs(final_az - target_az)
-                if az_diff > 180:
-                    az_diff = 360 - az_diff
+                az_diff = _ang_diff(final_az, target_az)
                 el_diff = abs(final_el - target_el)
                 self.fail(f"Nie osiągnięto pozycji ({target_az}°, {target_el}°). "
                          f"Różnica: Az={az_diff:.1f}°, El={el_diff:.1f}°")
@@ -374,7 +643,7 @@ class SPIDProtocolTests(unittest.TestCase):
 
         # Odczytaj pozycję początkową
         initial_az, initial_el = odczytaj_pozycje(self.PORT, self.BAUDRATE)
-        logger.info(f"Pozycja początkowa: Az={initial_az:.1f}°, El={initial_el:.1f}°")
+        logger.info("Pozycja początkowa: Az=%.1f°, El=%.1f°", initial_az, initial_el)
 
         # Oblicz nową pozycję (dodaj 5° do azymutu)
         target_az = (initial_az + 5.0) % 360.0
@@ -382,22 +651,33 @@ class SPIDProtocolTests(unittest.TestCase):
 
         try:
             ustaw_pozycje(self.PORT, az=target_az, el=target_el, speed=self.BAUDRATE)
-            logger.info(f"Komenda MOVE do Az={target_az:.1f}°, El={target_el:.1f}° wysłana")
+            logger.info(
+                "Komenda MOVE do Az=%.1f°, El=%.1f° wysłana",
+                target_az,
+                target_el,
+            )
 
             # Sprawdź czy pozycja została osiągnięta
             success, final_az, final_el, elapsed_time = sprawdz_pozycje(
                 self.PORT, target_az, target_el, tolerance=1.5, timeout=15.0
             )
 
-            logger.info(f"Pozycja końcowa: Az={final_az:.1f}°, El={final_el:.1f}° (czas: {elapsed_time:.1f}s)")
+            logger.info(
+                "Pozycja końcowa: Az=%.1f°, El=%.1f° (czas: %.1fs)",
+                final_az,
+                final_el,
+                elapsed_time,
+            )
 
             # Test zakończony sukcesem tylko jeśli osiągnięto pozycję
             if success:
-                logger.info(f"Pozycja Az={target_az:.1f}°, El={target_el:.1f}° osiągnięta pomyślnie")
+                logger.info(
+                    "Pozycja Az=%.1f°, El=%.1f° osiągnięta pomyślnie",
+                    target_az,
+                    target_el,
+                )
             else:
-                az_diff = abs(final_az - target_az)
-                if az_diff > 180:
-                    az_diff = 360 - az_diff
+                az_diff = _ang_diff(final_az, target_az)
                 el_diff = abs(final_el - target_el)
                 self.fail(f"Nie osiągnięto pozycji Az={target_az:.1f}°, El={target_el:.1f}°. "
                          f"Różnica: Az={az_diff:.1f}°, El={el_diff:.1f}°")
@@ -411,12 +691,12 @@ class SPIDProtocolTests(unittest.TestCase):
 
         try:
             result = zatrzymaj_rotor(self.PORT, self.BAUDRATE)
-            logger.info(f"Komenda STOP wykonana: {result}")
+            logger.info("Komenda STOP wykonana: %s", result)
 
             # Sprawdź że rotor odpowiada na komendy po STOP
             time.sleep(1.0)
             az, el = odczytaj_pozycje(self.PORT, self.BAUDRATE)
-            logger.info(f"Pozycja po STOP: Az={az:.1f}°, El={el:.1f}°")
+            logger.info("Pozycja po STOP: Az=%.1f°, El=%.1f°", az, el)
 
         except Exception as e:
             self.fail(f"Błąd podczas wykonywania komendy STOP: {e}")
@@ -431,7 +711,13 @@ class SPIDProtocolTests(unittest.TestCase):
         min_el = self.calibration.min_elevation
         max_el = self.calibration.max_elevation
         
-        logger.info(f"Limity z kalibracji: Az({min_az:.1f}°-{max_az:.1f}°), El({min_el:.1f}°-{max_el:.1f}°)")
+        logger.info(
+            "Limity z kalibracji: Az(%.1f°-%.1f°), El(%.1f°-%.1f°)",
+            min_az,
+            max_az,
+            min_el,
+            max_el,
+        )
 
         # Bezpieczne pozycje testowe (przed zastosowaniem offsetu)
         test_positions = [
@@ -449,12 +735,22 @@ class SPIDProtocolTests(unittest.TestCase):
                     # Zastosuj offset kalibracji
                     calibrated_az, calibrated_el = zastosuj_offset_kalibracji(az, el, self.calibration)
                     
-                    logger.info(f"Test pozycji Az={az:.1f}°→{calibrated_az:.1f}°, El={el:.1f}°→{calibrated_el:.1f}°")
+                    logger.info(
+                        "Test pozycji Az=%.1f°→%.1f°, El=%.1f°→%.1f°",
+                        az,
+                        calibrated_az,
+                        el,
+                        calibrated_el,
+                    )
                     
                     # Sprawdź czy pozycja po kalibracji jest w bezpiecznych limitach
                     if (calibrated_el < min_el or calibrated_el > max_el or 
                         calibrated_az < min_az or calibrated_az >= max_az):
-                        logger.warning(f"Pozycja po kalibracji poza limitami ({calibrated_az:.1f}°, {calibrated_el:.1f}°), pomijam test")
+                        logger.warning(
+                            "Pozycja po kalibracji poza limitami (%.1f°, %.1f°), pomijam test",
+                            calibrated_az,
+                            calibrated_el,
+                        )
                         continue
                     
                     # Wykonaj ruch do pozycji skalibrowanej (nie stosuj offsetu ponownie)
@@ -465,7 +761,11 @@ class SPIDProtocolTests(unittest.TestCase):
 
                     # Sprawdź czy komenda została przyjęta (nie stosuj kompensacji ponownie)
                     current_az, current_el = odczytaj_pozycje(self.PORT, self.BAUDRATE, apply_calibration=False)
-                    logger.info(f"Pozycja po komendzie: Az={current_az:.1f}°, El={current_el:.1f}°")
+                    logger.info(
+                        "Pozycja po komendzie: Az=%.1f°, El=%.1f°",
+                        current_az,
+                        current_el,
+                    )
 
                 except Exception as e:
                     self.fail(f"Błąd przy pozycji ({az}, {el}): {e}")
@@ -477,21 +777,26 @@ class SPIDProtocolTests(unittest.TestCase):
         try:
             # 1. Sprawdź status początkowy
             initial_az, initial_el = odczytaj_pozycje(self.PORT, self.BAUDRATE)
-            logger.info(f"Status początkowy: Az={initial_az:.1f}°, El={initial_el:.1f}°")
+            logger.info("Status początkowy: Az=%.1f°, El=%.1f°", initial_az, initial_el)
 
             # 2. Wykonaj ruch
             target_az = (initial_az + 10.0) % 360.0
             target_el = max(-20.0, min(20.0, initial_el))  # Bezpieczna elewacja
 
             ustaw_pozycje(self.PORT, az=target_az, el=target_el, speed=self.BAUDRATE)
-            logger.info(f"Komenda MOVE do Az={target_az:.1f}°, El={target_el:.1f}°")
+            logger.info("Komenda MOVE do Az=%.1f°, El=%.1f°", target_az, target_el)
 
             # 3. Sprawdź czy pozycja została osiągnięta
             success, final_az, final_el, elapsed_time = sprawdz_pozycje(
                 self.PORT, target_az, target_el, tolerance=2.0, timeout=15.0
             )
 
-            logger.info(f"Status po ruchu: Az={final_az:.1f}°, El={final_el:.1f}° (czas: {elapsed_time:.1f}s)")
+            logger.info(
+                "Status po ruchu: Az=%.1f°, El=%.1f° (czas: %.1fs)",
+                final_az,
+                final_el,
+                elapsed_time,
+            )
 
             # 4. Zatrzymaj
             zatrzymaj_rotor(self.PORT, self.BAUDRATE)
@@ -500,15 +805,13 @@ class SPIDProtocolTests(unittest.TestCase):
             # 5. Końcowy status
             time.sleep(1.0)
             status_az, status_el = odczytaj_pozycje(self.PORT, self.BAUDRATE)
-            logger.info(f"Status końcowy: Az={status_az:.1f}°, El={status_el:.1f}°")
+            logger.info("Status końcowy: Az=%.1f°, El=%.1f°", status_az, status_el)
 
             # Sprawdź czy test się powiódł
             if success:
                 logger.info("Sekwencja protokołu wykonana pomyślnie")
             else:
-                az_diff = abs(final_az - target_az)
-                if az_diff > 180:
-                    az_diff = 360 - az_diff
+                az_diff = _ang_diff(final_az, target_az)
                 el_diff = abs(final_el - target_el)
                 self.fail(f"Sekwencja nieudana - nie osiągnięto pozycji docelowej. "
                          f"Różnica: Az={az_diff:.1f}°, El={el_diff:.1f}°")
@@ -517,11 +820,89 @@ class SPIDProtocolTests(unittest.TestCase):
             self.fail(f"Błąd w sekwencji komend: {e}")
 
 
+class TestParseRotctlPosition(unittest.TestCase):
+    """Testy parsowania odpowiedzi rotctl na komendę 'p'"""
+
+    def test_plain_reply(self):
+        """Odpowiedź zwykła - dwie liczby w osobnych liniach"""
+        self.assertEqual(parse_rotctl_position("123.400000\n45.600000\n"), (123.4, 45.6))
+
+    def test_extended_reply(self):
+        """Odpowiedź rozszerzona z etykietami i echem komendy"""
+        output = "get_pos:\nAzimuth: 10.5\nElevation: -2.0\nRPRT 0\n"
+        self.assertEqual(parse_rotctl_position(output), (10.5, -2.0))
+
+    def test_incomplete_reply(self):
+        """Niepełna odpowiedź zwraca None"""
+        self.assertIsNone(parse_rotctl_position("Azimuth: 10.5\n"))
+        self.assertIsNone(parse_rotctl_position(""))
+
+
+@unittest.skipIf(os.name == "nt", "Fałszywy rotctl jest skryptem z linią #!")
+class TestRotctlSession(unittest.TestCase):
+    """Testy RotctlSession na fałszywym programie rotctl w PATH"""
+
+    def setUp(self):
+        """Fałszywy rotctl w folderze tymczasowym na początku PATH"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        script = os.path.join(self.temp_dir, "rotctl")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(FAKE_ROTCTL.format(python=sys.executable))
+        os.chmod(script, os.stat(script).st_mode | stat.S_IXUSR)
+
+        self.log_file = os.path.join(self.temp_dir, "commands.log")
+        patcher = mock.patch.dict(os.environ, {
+            "PATH": self.temp_dir + os.pathsep + os.environ.get("PATH", ""),
+            "FAKE_ROTCTL_LOG": self.log_file,
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _session(self, mode: str, timeout: float = 2.0) -> RotctlSession:
+        os.environ["FAKE_ROTCTL_MODE"] = mode
+        session = RotctlSession(os.path.join(self.temp_dir, "ttyFAKE"), timeout=timeout)
+        self.addCleanup(session.close)
+        return session
+
+    def _sent_commands(self):
+        with open(self.log_file, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() != "q"]
+
+    def test_batch_returns_replies_in_order(self):
+        """Kilka komend jednym zapisem, odpowiedzi w tej samej kolejności"""
+        session = self._session("ok")
+        replies = session.batch([ROTCTL_GET_POS_CMD, ROTCTL_STOP_CMD])
+        self.assertEqual(len(replies), 2)
+        self.assertEqual(parse_rotctl_position("\n".join(replies[0])), (12.5, 34.5))
+
+        # Ten sam proces obsługuje kolejne komendy
+        session.command(ROTCTL_STOP_CMD)
+        self.assertEqual(self._sent_commands(), ["+p", "+S", "+S"])
+
+    def test_timeout_raises(self):
+        """Brak odpowiedzi w czasie timeout kończy się RuntimeError"""
+        session = self._session("silent", timeout=0.3)
+        with self.assertRaisesRegex(RuntimeError, "Timeout"):
+            session.command(ROTCTL_GET_POS_CMD)
+
+    def test_eof_resends_only_unanswered_commands(self):
+        """Po zakończeniu procesu nowy proces dostaje tylko komendy bez odpowiedzi"""
+        session = self._session("die_once")
+        replies = session.batch([ROTCTL_GET_POS_CMD, ROTCTL_STOP_CMD, ROTCTL_GET_POS_CMD])
+        self.assertEqual(len(replies), 3)
+        self.assertEqual(self._sent_commands(), ["+p", "+S", "+p"])
+
+
 def main():
     """Funkcja główna do uruchamiania testów."""
     if len(sys.argv) > 1:
         # Użyj podanego portu
         SPIDProtocolTests.PORT = sys.argv[1]
+    if len(sys.argv) > 2:
+        # Drugi argument: adres rotctld jako host[:port]
+        host, _, tcp_port = sys.argv[2].partition(":")
+        SPIDProtocolTests.ROTCTLD_ADDRESS = (host, int(tcp_port or DEFAULT_ROTCTLD_PORT))
 
     # Uruchom testy
     unittest.main(argv=[''], exit=False, verbosity=2)
@@ -14,7 +14,9 @@ import time
 import os
 
 # Dodaj ścieżkę do głównego folderu projektu
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:  # Raz, także gdy kilka modułów testów jest importowanych
+    sys.path.insert(0, _ROOT)
 
 from antenna_controller import DEFAULT_SPID_PORT, DEFAULT_BAUDRATE, DEFAULT_ROTCTL_MODEL
 
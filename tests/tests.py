@@ -15,7 +15,10 @@ import time
 import logging
 import sys
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Dodaj ścieżkę do głównego folderu projektu (raz)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
 from antenna_controller import (
     AntennaControllerFactory,
@@ -56,7 +59,7 @@ class AntennaHardwareTests(unittest.TestCase):
     def setUp(self):
         """Przygotowanie do testów — inicjalizacja kontrolera z konfiguracją z pliku"""
         logger.info("-" * 80)
-        logger.info(f"Rozpoczęcie testu: {self._testMethodName}")
+        logger.info("Rozpoczęcie testu: %s", self._testMethodName)
 
         # Inicjalizacja kontrolera sprzętowego z plikiem kalibracji
         try:
@@ -66,7 +69,7 @@ class AntennaHardwareTests(unittest.TestCase):
 
             self.controller.initialize()
             logger.info("Kontroler sprzętowy zainicjalizowany pomyślnie")
-            logger.info(f"Używa pliku kalibracji: {self.controller.calibration_file}")
+            logger.info("Używa pliku kalibracji: %s", self.controller.calibration_file)
 
             # Konfiguracja kalkulatora astronomicznego
             self.observer_location = ObserverLocation(
@@ -79,7 +82,7 @@ class AntennaHardwareTests(unittest.TestCase):
             self.tracker = AstronomicalTracker(self.calculator)
 
         except Exception as e:
-            logger.error(f"Błąd inicjalizacji kontrolera: {e}")
+            logger.error("Błąd inicjalizacji kontrolera: %s", e)
             raise
 
     def tearDown(self):
@@ -91,15 +94,15 @@ class AntennaHardwareTests(unittest.TestCase):
                 try:
                     self.move_to_safe_position()
                 except Exception as e:
-                    logger.error(f"Błąd podczas powrotu do pozycji bezpiecznej: {e}")
+                    logger.error("Błąd podczas powrotu do pozycji bezpiecznej: %s", e)
 
                 # Wyłączenie kontrolera
                 self.controller.shutdown()
                 logger.info("Kontroler wyłączony")
         except Exception as e:
-            logger.error(f"Błąd podczas wyłączania: {e}")
+            logger.error("Błąd podczas wyłączania: %s", e)
 
-        logger.info(f"Zakończenie testu: {self._testMethodName}")
+        logger.info("Zakończenie testu: %s", self._testMethodName)
         logger.info("-" * 80)
 
     def move_to_safe_position(self):
@@ -120,7 +123,8 @@ class AntennaHardwareTests(unittest.TestCase):
         self.controller.wait_for_movement(timeout=30)
 
         logger.info(
-            f"Pozycja bezpieczna osiągnięta: {self.controller.current_position}"
+            "Pozycja bezpieczna osiągnięta: %s",
+            self.controller.current_position,
         )
 
     def test_00_reset(self):
@@ -136,7 +140,7 @@ class AntennaHardwareTests(unittest.TestCase):
             self.assertEqual(self.controller.state, AntennaState.IDLE)
             logger.info("Sterownik jest w stanie IDLE po resecie")
         except Exception as e:
-            logger.error(f"Błąd podczas resetowania stanu błędu: {e}")
+            logger.error("Błąd podczas resetowania stanu błędu: %s", e)
             raise
 
     def test_01_connection(self):
@@ -150,7 +154,9 @@ class AntennaHardwareTests(unittest.TestCase):
         # Pobierz aktualną pozycję
         position = self.controller.current_position
         logger.info(
-            f"Aktualna pozycja: Az={position.azimuth:.2f}°, El={position.elevation:.2f}°"
+            "Aktualna pozycja: Az=%.2f°, El=%.2f°",
+            position.azimuth,
+            position.elevation,
         )
 
         # Sprawdź, czy pozycja jest w sensownych granicach (używa limitów z kontrolera)
@@ -179,10 +185,14 @@ class AntennaHardwareTests(unittest.TestCase):
         calibration = self.controller.position_calibration
         
         logger.info(
-            f"Pozycja po kalibracji: Az={position.azimuth:.2f}°, El={position.elevation:.2f}°"
+            "Pozycja po kalibracji: Az=%.2f°, El=%.2f°",
+            position.azimuth,
+            position.elevation,
         )
         logger.info(
-            f"Offset kalibracji: Az={calibration.azimuth_offset:.2f}°, El={calibration.elevation_offset:.2f}°"
+            "Offset kalibracji: Az=%.2f°, El=%.2f°",
+            calibration.azimuth_offset,
+            calibration.elevation_offset,
         )
 
         # Po kalibracji pozycja powinna być (0,0) + offset
@@ -222,7 +232,11 @@ class AntennaHardwareTests(unittest.TestCase):
 
         for i, pos in enumerate(test_positions):
             logger.info(
-                f"Ruch {i+1}/{len(test_positions)}: Az={pos.azimuth:.1f}°, El={pos.elevation:.1f}°"
+                "Ruch %s/%s: Az=%.1f°, El=%.1f°",
+                i+1,
+                len(test_positions),
+                pos.azimuth,
+                pos.elevation,
             )
 
             start_time = time.time()
@@ -236,7 +250,10 @@ class AntennaHardwareTests(unittest.TestCase):
             move_time = time.time() - start_time
 
             logger.info(
-                f"Osiągnięto: Az={current.azimuth:.1f}°, El={current.elevation:.1f}° w {move_time:.1f}s"
+                "Osiągnięto: Az=%.1f°, El=%.1f° w %.1fs",
+                current.azimuth,
+                current.elevation,
+                move_time,
             )
 
             # Porównaj z oryginalną pozycją docelową (nie z pozycją po kalibracji)
@@ -263,7 +280,7 @@ class AntennaHardwareTests(unittest.TestCase):
         # Seria małych ruchów azymutowych
         for i, azimuth in enumerate([2.0, 5.0, 8.0, 10.0, 12.0]):
             pos = Position(azimuth, safe_elevation)
-            logger.info(f"Precyzyjny ruch do Az={azimuth:.1f}°")
+            logger.info("Precyzyjny ruch do Az=%.1f°", azimuth)
 
             self.controller.move_to(pos)
             self.controller.wait_for_movement()
@@ -281,7 +298,11 @@ class AntennaHardwareTests(unittest.TestCase):
             
             # Użyj średniej z pomiarów dla lepszej dokładności
             avg_azimuth = sum(p.azimuth for p in current_positions) / len(current_positions)
-            logger.info(f"Osiągnięto: Az={avg_azimuth:.2f}° (pomiary: {[f'{p.azimuth:.1f}' for p in current_positions]})")
+            logger.info(
+                "Osiągnięto: Az=%.2f° (pomiary: %s)",
+                avg_azimuth,
+                [f'{p.azimuth:.1f}' for p in current_positions],
+            )
 
             # Porównaj z oryginalną pozycją docelową z większą tolerancją
             self.assertAlmostEqual(avg_azimuth, pos.azimuth, delta=5.0,
@@ -294,7 +315,7 @@ class AntennaHardwareTests(unittest.TestCase):
         for i in range(4):
             elevation = safe_elevation + (i + 1) * elevation_step
             pos = Position(25.0, elevation)
-            logger.info(f"Precyzyjny ruch do El={elevation:.1f}°")
+            logger.info("Precyzyjny ruch do El=%.1f°", elevation)
 
             self.controller.move_to(pos)
             self.controller.wait_for_movement()
@@ -312,7 +333,11 @@ class AntennaHardwareTests(unittest.TestCase):
             
             # Użyj średniej z pomiarów dla lepszej dokładności
             avg_elevation = sum(p.elevation for p in current_positions) / len(current_positions)
-            logger.info(f"Osiągnięto: El={avg_elevation:.2f}° (pomiary: {[f'{p.elevation:.1f}' for p in current_positions]})")
+            logger.info(
+                "Osiągnięto: El=%.2f° (pomiary: %s)",
+                avg_elevation,
+                [f'{p.elevation:.1f}' for p in current_positions],
+            )
 
             # Porównaj z oryginalną pozycją docelową z większą tolerancją
             self.assertAlmostEqual(avg_elevation, pos.elevation, delta=5.0, 
@@ -342,7 +367,9 @@ class AntennaHardwareTests(unittest.TestCase):
             target = Position(90.0, max_safe_elevation)
 
             logger.info(
-                f"Ruch do Az={target.azimuth}°, El={target.elevation}° z ograniczoną prędkością"
+                "Ruch do Az=%s°, El=%s° z ograniczoną prędkością",
+                target.azimuth,
+                target.elevation,
             )
             start_time = time.time()
 
@@ -350,7 +377,7 @@ class AntennaHardwareTests(unittest.TestCase):
             self.controller.wait_for_movement()
 
             elapsed = time.time() - start_time
-            logger.info(f"Czas ruchu: {elapsed:.1f}s")
+            logger.info("Czas ruchu: %.1fs", elapsed)
 
             # Oczekiwany minimalny czas na podstawie aktualnych limitów prędkości
             az_distance = 90.0
@@ -381,7 +408,9 @@ class AntennaHardwareTests(unittest.TestCase):
         max_safe_elevation = calibration.max_elevation - 15.0 - abs(calibration.elevation_offset)
         target = Position(180.0, max_safe_elevation)
         logger.info(
-            f"Rozpoczynanie ruchu do Az={target.azimuth}°, El={target.elevation}°"
+            "Rozpoczynanie ruchu do Az=%s°, El=%s°",
+            target.azimuth,
+            target.elevation,
         )
 
         self.controller.move_to(target)
@@ -407,7 +436,9 @@ class AntennaHardwareTests(unittest.TestCase):
         # Zapisz pozycję zatrzymania
         stop_position = self.controller.current_position
         logger.info(
-            f"Pozycja zatrzymania: Az={stop_position.azimuth:.1f}°, El={stop_position.elevation:.1f}°"
+            "Pozycja zatrzymania: Az=%.1f°, El=%.1f°",
+            stop_position.azimuth,
+            stop_position.elevation,
         )
 
         # Poczekaj 3 sekundy i sprawdź, czy pozycja się nie zmieniła
@@ -433,7 +464,8 @@ class AntennaHardwareTests(unittest.TestCase):
         # Test limitów bezpieczeństwa - używamy pozycji wyższej od limitu
         max_el_target = Position(90.0, calibration.max_elevation + 1.0)
         logger.info(
-            f"Próba ruchu powyżej limitu elewacji: El={max_el_target.elevation:.1f}°"
+            "Próba ruchu powyżej limitu elewacji: El=%.1f°",
+            max_el_target.elevation,
         )
 
         with self.assertRaises(SafetyError):
@@ -445,7 +477,9 @@ class AntennaHardwareTests(unittest.TestCase):
                 350.0, calibration.min_elevation + 10.0
             )  # Normalny azymut z bezpieczną elewacją
             logger.info(
-                f"Ruch do prawidłowej pozycji Az={normal_az_target.azimuth:.1f}°, El={normal_az_target.elevation:.1f}°"
+                "Ruch do prawidłowej pozycji Az=%.1f°, El=%.1f°",
+                normal_az_target.azimuth,
+                normal_az_target.elevation,
             )
 
             self.controller.move_to(normal_az_target)
@@ -453,7 +487,11 @@ class AntennaHardwareTests(unittest.TestCase):
 
             # Sprawdzamy, czy pozycja została osiągnięta
             current = self.controller.get_current_position(apply_reverse_calibration=True)
-            logger.info(f"Osiągnięta pozycja: Az={current.azimuth:.1f}°, El={current.elevation:.1f}°")
+            logger.info(
+                "Osiągnięta pozycja: Az=%.1f°, El=%.1f°",
+                current.azimuth,
+                current.elevation,
+            )
 
             # Sprawdź pozycję z uwzględnieniem kalibracji (porównanie z oryginalną pozycją docelową)
             self.assertGreaterEqual(current.azimuth, calibration.min_azimuth)
@@ -475,7 +513,8 @@ class AntennaHardwareTests(unittest.TestCase):
 
         if not sun_position.is_visible or sun_position.elevation < 10.0:
             logger.warning(
-                f"Słońce nie jest wystarczająco wysoko ({sun_position.elevation:.1f}°) - pomijam test"
+                "Słońce nie jest wystarczająco wysoko (%.1f°) - pomijam test",
+                sun_position.elevation,
             )
             self.skipTest("Słońce nie jest wystarczająco wysoko")
 
@@ -499,7 +538,9 @@ class AntennaHardwareTests(unittest.TestCase):
                 break
 
             logger.info(
-                f"Pozycja Słońca: Az={sun_pos.azimuth:.2f}°, El={sun_pos.elevation:.2f}°"
+                "Pozycja Słońca: Az=%.2f°, El=%.2f°",
+                sun_pos.azimuth,
+                sun_pos.elevation,
             )
 
             try:
@@ -521,7 +562,9 @@ class AntennaHardwareTests(unittest.TestCase):
                         az_error = 360 - az_error
 
                     logger.info(
-                        f"Dokładność śledzenia: dAz={az_error:.2f}°, dEl={el_error:.2f}°"
+                        "Dokładność śledzenia: dAz=%.2f°, dEl=%.2f°",
+                        az_error,
+                        el_error,
                     )
 
                     # Sprawdzenie z uwzględnieniem kalibracji
@@ -537,7 +580,9 @@ class AntennaHardwareTests(unittest.TestCase):
                         az_error = 360 - az_error
 
                     logger.info(
-                        f"Dokładność śledzenia (po kalibracji): dAz={az_error:.2f}°, dEl={el_error:.2f}°"
+                        "Dokładność śledzenia (po kalibracji): dAz=%.2f°, dEl=%.2f°",
+                        az_error,
+                        el_error,
                     )
 
                     # Sprawdzenie z większą tolerancją ze względu na kalibrację
@@ -554,11 +599,11 @@ class AntennaHardwareTests(unittest.TestCase):
                     time.sleep(remaining)
 
             except Exception as e:
-                logger.error(f"Błąd podczas śledzenia Słońca: {e}")
+                logger.error("Błąd podczas śledzenia Słońca: %s", e)
                 self.fail(f"Wyjątek podczas śledzenia Słońca: {e}")
 
         elapsed = time.time() - start_time
-        logger.info(f"Śledzenie Słońca zakończone po {elapsed:.1f}s")
+        logger.info("Śledzenie Słońca zakończone po %.1fs", elapsed)
 
     def test_09_repeated_positioning(self):
         """Test powtarzalności pozycjonowania"""
@@ -574,7 +619,7 @@ class AntennaHardwareTests(unittest.TestCase):
         achieved_positions = []
 
         for i in range(repetitions):
-            logger.info(f"Cykl {i+1}/{repetitions}: Ruch do pozycji referencyjnej")
+            logger.info("Cykl %s/%s: Ruch do pozycji referencyjnej", i+1, repetitions)
 
             # Najpierw przesuwamy się do innej pozycji, aby test był miarodajny
             intermediate_pos = Position(0.0, calibration.min_elevation + 5.0)
@@ -588,7 +633,9 @@ class AntennaHardwareTests(unittest.TestCase):
             # Zapisujemy osiągniętą pozycję
             current = self.controller.current_position
             logger.info(
-                f"Osiągnięto: Az={current.azimuth:.3f}°, El={current.elevation:.3f}°"
+                "Osiągnięto: Az=%.3f°, El=%.3f°",
+                current.azimuth,
+                current.elevation,
             )
 
             achieved_positions.append((current.azimuth, current.elevation))
@@ -606,9 +653,11 @@ class AntennaHardwareTests(unittest.TestCase):
         az_std_dev = az_variance**0.5
         el_std_dev = el_variance**0.5
 
-        logger.info(f"Średnia pozycja: Az={az_mean:.3f}°, El={el_mean:.3f}°")
+        logger.info("Średnia pozycja: Az=%.3f°, El=%.3f°", az_mean, el_mean)
         logger.info(
-            f"Odchylenie standardowe: Az={az_std_dev:.3f}°, El={el_std_dev:.3f}°"
+            "Odchylenie standardowe: Az=%.3f°, El=%.3f°",
+            az_std_dev,
+            el_std_dev,
         )
 
         # Sprawdź powtarzalność (powinna być lepsza niż 1°)
@@ -622,7 +671,11 @@ class AntennaHardwareTests(unittest.TestCase):
         az_error = abs(az_mean - expected_position.azimuth)
         el_error = abs(el_mean - expected_position.elevation)
 
-        logger.info(f"Średni błąd (po kalibracji): Az={az_error:.3f}°, El={el_error:.3f}°")
+        logger.info(
+            "Średni błąd (po kalibracji): Az=%.3f°, El=%.3f°",
+            az_error,
+            el_error,
+        )
 
         # Błąd systematyczny powinien być mniejszy niż 5° (zwiększona tolerancja)
         self.assertLess(az_error, 5.0, "Zbyt duży błąd systematyczny azymutu")
@@ -647,16 +700,24 @@ class AntennaHardwareTests(unittest.TestCase):
             Position(0.0, safe_elevation_low),
         ]
 
-        logger.info(f"Rozpoczęcie {num_cycles} cykli po {len(test_positions)} pozycji")
+        logger.info(
+            "Rozpoczęcie %s cykli po %s pozycji",
+            num_cycles,
+            len(test_positions),
+        )
         start_time = time.time()
 
         try:
             for cycle in range(num_cycles):
-                logger.info(f"Cykl {cycle+1}/{num_cycles}")
+                logger.info("Cykl %s/%s", cycle+1, num_cycles)
 
                 for i, pos in enumerate(test_positions):
                     logger.info(
-                        f"  Pozycja {i+1}/{len(test_positions)}: Az={pos.azimuth}°, El={pos.elevation}°"
+                        "  Pozycja %s/%s: Az=%s°, El=%s°",
+                        i+1,
+                        len(test_positions),
+                        pos.azimuth,
+                        pos.elevation,
                     )
 
                     self.controller.move_to(pos)
@@ -671,9 +732,9 @@ class AntennaHardwareTests(unittest.TestCase):
             total_moves = num_cycles * len(test_positions)
             avg_time = elapsed / total_moves
 
-            logger.info(f"Test zakończony: {total_moves} ruchów w {elapsed:.1f}s")
-            logger.info(f"Średni czas na ruch: {avg_time:.1f}s")
+            logger.info("Test zakończony: %s ruchów w %.1fs", total_moves, elapsed)
+            logger.info("Średni czas na ruch: %.1fs", avg_time)
 
         except Exception as e:
-            logger.error(f"Błąd podczas testu obciążeniowego: {e}")
+            logger.error("Błąd podczas testu obciążeniowego: %s", e)
             self.fail(f"Test obciążeniowy nie powiódł się: {e}")